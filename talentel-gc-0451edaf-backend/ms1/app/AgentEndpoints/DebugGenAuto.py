@@ -15,6 +15,24 @@ from ..Agents.DebugGen.ProjectCreationWorkflow import write_project_files, CodeA
 from ..config.database import get_db
 from ..models.models import DebugExercise, Topic, TechStack
 
+def _store_debug_exercise(db: Session, tech_stack: str, topics: list, duration: int, path_id: str):
+    tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
+    topic_ids = [
+        tid for (tid,) in db.query(Topic.topic_id).filter(
+            Topic.name.in_(topics),
+            Topic.tech_stack_id == tech_stack_id
+        ).all()
+    ]
+    logging.info(f"[{path_id}] Saving DebugExercise: tech_stack_id={tech_stack_id}, topic_ids={topic_ids}, duration={duration}, path_id={path_id}")
+    debug_exercise = DebugExercise(
+        tech_stack_id=tech_stack_id,
+        topic_ids=topic_ids,
+        duration=duration,
+        path_id=path_id,
+    )
+    db.add(debug_exercise)
+    db.commit()
+
 async def run_debug_gen_auto(
     db: Session,
     tech_stack: str,
@@ -80,22 +98,8 @@ async def run_debug_gen_auto(
         # 6. Bug injection workflow
         created = await bug_injection_workflow(model_client, unique_id, final_topics, difficulty)
         if created:
-            tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
-            topic_ids = [
-                tid for (tid,) in db.query(Topic.topic_id).filter(
-                    Topic.name.in_(final_topics),
-                    Topic.tech_stack_id == tech_stack_id
-                ).all()
-            ]
-            logging.info(f"[{unique_id}] Saving DebugExercise: tech_stack_id={tech_stack_id}, topic_ids={topic_ids}, duration={duration}, path_id={unique_id}")
-            debug_exercise = DebugExercise(
-                tech_stack_id=tech_stack_id,
-                topic_ids=topic_ids,
-                duration=duration,
-                path_id=unique_id,
-            )
-            db.add(debug_exercise)
-            db.commit()
+            # Off the event loop, like the rest of the database work of the generation
+            await asyncio.to_thread(_store_debug_exercise, db, tech_stack, final_topics, duration, unique_id)
             logging.info(f"[{unique_id}] DebugExercise saved successfully.")
         else:
             logging.warning(f"[{unique_id}] Bug injection workflow did not create exercise.")
@@ -10,19 +10,19 @@ from pathlib import Path
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from fastapi import APIRouter, WebSocket, Depends
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
  
 from ..services.auth_service import JWT_SECRET
 from ..Agents.DebugGen.BugInjectionWorkflow import bug_injection_workflow
 from ..Agents.DebugGen.ProjectCreationWorkflow import write_project_files, CodeAgent, StructureAgent, BRDAgent
-from ..config.database import get_db
+from ..config.database import AsyncSessionLocal
 from ..models.models import DebugExercise, Topic, TechStack, Test
  
 router = APIRouter()
  
  
 async def bug_injection_and_db_save(
-        db, model_client, unique_id, final_topics, tech_stack,
+        model_client, unique_id, final_topics, tech_stack,
         difficulty, project_dir, duration, user_feedback, test_id=None
 ):
     try:
@@ -59,13 +59,12 @@ async def bug_injection_and_db_save(
         # 4. Bug injection workflow
         created = await bug_injection_workflow(model_client, unique_id, final_topics, difficulty)
         if created:
-            tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
-            topic_ids = [
-                tid for (tid,) in db.query(Topic.topic_id).filter(
+            async with AsyncSessionLocal() as db:
+                tech_stack_id = await db.scalar(select(TechStack.id).where(TechStack.name == tech_stack))
+                topic_ids = (await db.scalars(select(Topic.topic_id).where(
                     Topic.name.in_(final_topics),
                     Topic.tech_stack_id==tech_stack_id
-                ).all()
-            ]
+                ))).all()
             logging.info(f"[{unique_id}] Saving DebugExercise: tech_stack_id={tech_stack_id}, topic_ids={topic_ids}, duration={duration}, path_id={unique_id}")
             logging.info(f"[{unique_id}] DebugExercise saved successfully.")
         else:
@@ -75,7 +74,7 @@ async def bug_injection_and_db_save(
         logging.error(traceback.format_exc())
  
 @router.websocket("/ws/debug-gen-ws")
-async def debug_gen_ws(websocket: WebSocket, db: Session = Depends(get_db)):
+async def debug_gen_ws(websocket: WebSocket):
     await websocket.accept()
     try:
         token = websocket.query_params.get("token")
@@ -221,24 +220,23 @@ async def debug_gen_ws(websocket: WebSocket, db: Session = Depends(get_db)):
                     })
                     logging.info(f"[{unique_id}] Accepted response sent to client.")
 
-                    tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
-                    topic_ids = [
-                        tid for (tid,) in db.query(Topic.topic_id).filter(
+                    async with AsyncSessionLocal() as db:
+                        tech_stack_id = await db.scalar(select(TechStack.id).where(TechStack.name == tech_stack))
+                        topic_ids = list((await db.scalars(select(Topic.topic_id).where(
                             Topic.name.in_(final_topics),
                             Topic.tech_stack_id==tech_stack_id
-                        ).all()
-                    ]
+                        ))).all())
 
-                    print("dataaa",tech_stack_id,topic_ids)
+                        print("dataaa",tech_stack_id,topic_ids)
 
-                    debug_exercise = DebugExercise(
-                        tech_stack_id=tech_stack_id,
-                        topic_ids=topic_ids,
-                        duration=duration,
-                        path_id=unique_id,
-                    )
-                    db.add(debug_exercise)
-                    db.commit()
+                        debug_exercise = DebugExercise(
+                            tech_stack_id=tech_stack_id,
+                            topic_ids=topic_ids,
+                            duration=duration,
+                            path_id=unique_id,
+                        )
+                        db.add(debug_exercise)
+                        await db.commit()
                     print("idddd",debug_exercise.id)
 
                     await websocket.send_json({
@@ -248,7 +246,7 @@ async def debug_gen_ws(websocket: WebSocket, db: Session = Depends(get_db)):
 
                     asyncio.create_task(
                         bug_injection_and_db_save(
-                            db, model_client, unique_id, final_topics, tech_stack,
+                            model_client, unique_id, final_topics, tech_stack,
                             difficulty, project_dir, duration, user_feedback,test_id
                         )
                     )
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from fastapi import APIRouter, Body, Depends, HTTPException
@@ -13,6 +14,25 @@ from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
 router = APIRouter()
 
+def _store_handson(db: Session, tech_stack: str, topics: list, duration: int, path_id: str) -> int:
+    tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
+    topic_ids = [
+        tid for (tid,) in db.query(Topic.topic_id).filter(
+            Topic.name.in_(topics),
+            Topic.tech_stack_id == tech_stack_id
+        ).all()
+    ]
+    db_handson = HandsOn(
+        tech_stack_id=tech_stack_id,
+        topic_ids=topic_ids,
+        duration=duration,
+        path_id=path_id
+    )
+    db.add(db_handson)
+    db.commit()
+    db.refresh(db_handson)
+    return db_handson.id
+
 async def run_handson_gen_auto(
     db: Session,
     tech_stack: str,
@@ -59,27 +79,12 @@ async def run_handson_gen_auto(
             file_path = Path(project_dir) / filename
             FileSystemTool.write_file(file_path, code)
 
-        # Store metadata in DB
-        tech_stack_id = db.query(TechStack.id).filter(TechStack.name == tech_stack).scalar()
-        topic_ids = [
-            tid for (tid,) in db.query(Topic.topic_id).filter(
-                Topic.name.in_(topics),
-                Topic.tech_stack_id == tech_stack_id
-            ).all()
-        ]
-        db_handson = HandsOn(
-            tech_stack_id=tech_stack_id,
-            topic_ids=topic_ids,
-            duration=duration,
-            path_id=unique_id
-        )
-        db.add(db_handson)
-        db.commit()
-        db.refresh(db_handson)
+        # Store metadata in DB, off the event loop
+        handson_id = await asyncio.to_thread(_store_handson, db, tech_stack, topics, duration, unique_id)
 
         return {
             "success": True,
-            "handson_id": db_handson.id,
+            "handson_id": handson_id,
             "tech_stack": tech_stack,
             "topics": topics,
             "duration": duration,
@@ -93,7 +98,7 @@ async def run_handson_gen_auto(
         }
     except Exception as e:
         logging.error(f"Error in auto-generate workflow: {e}")
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         return {
             "success": False,
             "handson_id": None,
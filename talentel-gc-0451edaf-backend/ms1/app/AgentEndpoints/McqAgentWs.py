@@ -3,11 +3,16 @@ import logging
 import asyncio
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Dict, List, Union
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
-from ..models.models import Quiz
+from ..models.models import Quiz, RoleEnum
 from ..Agents.McqAgent import QuizGenerationSystem
 from ..schemas.schemas import QuizCreate
+from ..services.quiz_delivery_service import get_quiz_delivery_cache
+from ..services.quiz_scoring_service import get_answer_key_cache, rescore_quiz
+from ..services.rbac_service import require_roles
 from ..config.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -34,11 +39,26 @@ def store_quiz(quiz: QuizCreate, db: Session = Depends(get_db)):
         db.add(db_quiz)
         db.commit()
         db.refresh(db_quiz)
+        get_quiz_delivery_cache().put(db_quiz)
+        get_answer_key_cache().put(db_quiz)
         return {"success": True, "quiz_id": db_quiz.id}
     except Exception as e:
         logger.error(f"Error storing quiz: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to store quiz")
 
+class AnswerKeyCorrection(BaseModel):
+    answers: Dict[str, Union[str, List[str]]]  # question id -> corrected correctAnswer
+
+@router.post("/mcq/{quiz_id}/rescore")
+def rescore_quiz_results(
+    quiz_id: int,
+    correction: AnswerKeyCorrection,
+    db: Session = Depends(get_db),
+    curr_user=Depends(require_roles(RoleEnum.CapabilityLeader, RoleEnum.ProductManager))
+):
+    """Corrects the quiz's answer key and re-scores every stored result against it in one batch."""
+    return rescore_quiz(db, quiz_id, correction.answers)
+
 @router.websocket("/ws/mcq-review")
 async def mcq_review(websocket: WebSocket):
     await websocket.accept()
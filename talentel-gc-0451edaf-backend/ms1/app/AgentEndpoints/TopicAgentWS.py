@@ -2,15 +2,18 @@ import os
 import logging
 import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from ..models.models import TechStack, Topic, RoleEnum, Employee, DifficultyLevel, Collaborator
-from ..config.database import get_db
+from ..models.models import TechStack, Topic, RoleEnum, DifficultyLevel
+from ..config.database import get_db, SessionLocal
 from ..Agents.TopicGenAgent import TopicGenerationSystem  # Your multi-agent system
 from ..schemas.topic_schema import TopicsCreateRequest
 from ..services.auth_service import JWT_SECRET
-from ..services.rbac_service import require_roles, RBACService
+from ..services.identity_cache import get_identity_cache
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import require_roles, Principal, get_principal
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,13 +22,11 @@ router = APIRouter()
 def store_tech_stack(
     tech_stack: TopicsCreateRequest,
     db: Session = Depends(get_db),
-    curr_user = Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     try:
-        print(curr_user)
-        
         # 1. Check if tech stack already exists by name
-        print(f"[store_tech_stack] curr_user: {curr_user}")
+        print(f"[store_tech_stack] principal: {principal.email}")
         print(f"[store_tech_stack] incoming tech_stack: {tech_stack}")
         db_tech_stack = db.query(TechStack).filter(TechStack.name == tech_stack.name).first()
         if not db_tech_stack:
@@ -33,7 +34,7 @@ def store_tech_stack(
             db_tech_stack = TechStack(
                 name=tech_stack.name,
                 description=tech_stack.description,
-                created_by=curr_user.get("user_id")
+                created_by=principal.user_id
             )
             db.add(db_tech_stack)
             db.commit()
@@ -70,11 +71,17 @@ def store_tech_stack(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to store tech stack: {str(e)}")
 
+def _resolve_topic_agent_user(email: str):
+    """(identity, collaborator permissions) of email, or (None, None) for an unknown user."""
+    with SessionLocal() as db:
+        identity = get_identity_cache().get(db, email)
+        if identity is None:
+            return None, None
+        return identity, get_permission_service().get(db, identity.user_id)
+
+
 @router.websocket("/ws/topic-generation")
-async def topic_generation_review(
-        websocket: WebSocket,
-        db: Session = Depends(get_db)
-):
+async def topic_generation_review(websocket: WebSocket):
     await websocket.accept()
     token = websocket.query_params.get("token")
     if not token:
@@ -96,22 +103,21 @@ async def topic_generation_review(
         await websocket.close()
         return
 
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
+    # Resolved through the identity and permission caches, off the event loop on a miss
+    identity, permissions = await run_in_threadpool(_resolve_topic_agent_user, email)
+    if identity is None:
         await websocket.send_json({"type": "error", "content": "User not found"})
         await websocket.close()
         return
 
     # Check if user is Capability Leader or Collaborator
-    is_capability_leader = str(user.role.value) == RoleEnum.CapabilityLeader.value or str(user.role) == RoleEnum.CapabilityLeader.name
-    is_collaborator = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).first() is not None
-
-    if not is_capability_leader and not is_collaborator:
+    is_capability_leader = identity.role == RoleEnum.CapabilityLeader.value
+    if not is_capability_leader and not permissions.is_collaborator:
         await websocket.send_json({"type": "error", "content": "Unauthorized"})
         await websocket.close()
         return
 
-    user_id = user.user_id
+    user_id = identity.user_id
 
     try:
         # Step 1: Receive tech stack input
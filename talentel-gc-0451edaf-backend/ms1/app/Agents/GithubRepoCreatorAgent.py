@@ -7,6 +7,7 @@ import requests
 import json
 import os
 from typing import Dict, Any
+from ..utils.github_client import GITHUB_API_URL, get_github_client
 
 # Model client setup
 model_client = AzureOpenAIChatCompletionClient(
@@ -23,18 +24,14 @@ class GitHubRepoCreator:
     def __init__(self, github_token: str):
         self.github_token = github_token
         self.base_url = f"https://api.github.com/orgs/{owner}/repos"
-        self.headers = {
-            "Authorization": f"token {github_token}",
-            "Accept": "application/vnd.github.v3+json",
-            "Content-Type": "application/json"
-        }
+        self.client = get_github_client(github_token)
 
     def create_repository(self, repo_data: Dict[str, Any]) -> Dict[str, Any]:
         url = self.base_url
 
         try:
             print("[DEBUG] Payload sent to GitHub API:", json.dumps(repo_data, indent=2))
-            response = requests.post(url, headers=self.headers, json=repo_data)
+            response = self.client.post(url, json=repo_data)
             print("[DEBUG] GitHub API response status:", response.status_code)
             print("[DEBUG] GitHub API response content:", response.text)
             response.raise_for_status()
@@ -63,7 +60,7 @@ class GitHubRepoCreator:
         payload = {"permission": permission}
         try:
             print(f"[DEBUG] Adding collaborator '{collaborator_username}' to repo '{repo_name}' with permission '{permission}'")
-            response = requests.put(url, headers=self.headers, json=payload)
+            response = self.client.put(url, json=payload)
             print("[DEBUG] Collaborator API response status:", response.status_code)
             print("[DEBUG] Collaborator API response content:", response.text)
             response.raise_for_status()
@@ -94,6 +91,114 @@ class GitHubRepoCreator:
                 "response": response.text if 'response' in locals() else None
             }
 
+    def get_repository(self, repo_name: str) -> Dict[str, Any]:
+        """Return repository metadata, or success False if it does not exist or is not accessible."""
+        url = f"https://api.github.com/repos/{owner}/{repo_name}"
+        try:
+            response = self.client.get(url)
+            if response.status_code == 200:
+                return {"success": True, "data": response.json()}
+            return {
+                "success": False,
+                "error": f"status {response.status_code}",
+                "message": f"Repository '{repo_name}' not accessible: {response.status_code}",
+                "response": response.text
+            }
+        except requests.exceptions.RequestException as e:
+            return {"success": False, "error": str(e), "message": f"Failed to get repository: {str(e)}"}
+
+    def mark_as_template(self, repo_name: str) -> Dict[str, Any]:
+        """Flag an existing repository as a template repository."""
+        url = f"https://api.github.com/repos/{owner}/{repo_name}"
+        try:
+            response = self.client.patch(url, json={"is_template": True})
+            print("[DEBUG] Mark template API response status:", response.status_code)
+            response.raise_for_status()
+            return {"success": True, "data": response.json(), "message": f"Repository '{repo_name}' is now a template"}
+        except requests.exceptions.RequestException as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to mark repository as template: {str(e)}",
+                "response": response.text if 'response' in locals() else None
+            }
+
+    def create_from_template(self, template_repo: str, repo_name: str, description: str = "") -> Dict[str, Any]:
+        """
+        Create a private repository from a template repository in a single API call.
+        :param template_repo: Name of the template repository in the org
+        :param repo_name: Name of the repository to create
+        """
+        url = f"https://api.github.com/repos/{owner}/{template_repo}/generate"
+        payload = {
+            "owner": owner,
+            "name": repo_name,
+            "description": description,
+            "private": True,
+            "include_all_branches": False
+        }
+        try:
+            print(f"[DEBUG] Generating repo '{repo_name}' from template '{template_repo}'")
+            response = self.client.post(url, json=payload)
+            print("[DEBUG] Generate API response status:", response.status_code)
+            response.raise_for_status()
+            return {
+                "success": True,
+                "data": response.json(),
+                "message": f"Repository '{repo_name}' created from template '{template_repo}'"
+            }
+        except requests.exceptions.RequestException as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to create repository from template: {str(e)}",
+                "response": response.text if 'response' in locals() else None
+            }
+
+    def rename_repository(self, repo_name: str, new_name: str, description: str = "") -> Dict[str, Any]:
+        """Rename an existing repository in the org and update its description."""
+        url = f"https://api.github.com/repos/{owner}/{repo_name}"
+        try:
+            print(f"[DEBUG] Renaming repo '{repo_name}' to '{new_name}'")
+            response = self.client.patch(url, json={"name": new_name, "description": description})
+            print("[DEBUG] Rename API response status:", response.status_code)
+            response.raise_for_status()
+            return {"success": True, "data": response.json(), "message": f"Repository '{repo_name}' renamed to '{new_name}'"}
+        except requests.exceptions.RequestException as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to rename repository: {str(e)}",
+                "response": response.text if 'response' in locals() else None
+            }
+
+    def list_repository_names(self, prefix: str = "") -> Dict[str, Any]:
+        """
+        List the names of the org repositories starting with prefix. The search API narrows
+        the listing to repos with the prefix in their name server-side, instead of paging
+        through every repo of the org; it returns at most 1000 matches.
+        """
+        url = f"{GITHUB_API_URL.rstrip('/')}/search/repositories"
+        # Search matches whole words of the name, so the separator a prefix ends with is dropped
+        query = f"org:{owner} {prefix.rstrip('-_.')} in:name" if prefix else f"org:{owner}"
+        names = []
+        page = 1
+        try:
+            while True:
+                response = self.client.get(url, params={"q": query, "per_page": 100, "page": page})
+                response.raise_for_status()
+                result = response.json()
+                if result.get("incomplete_results"):
+                    print(f"[WARN] GitHub search for '{query}' returned incomplete results")
+                items = result.get("items", [])
+                names.extend(repo["name"] for repo in items if repo["name"].startswith(prefix))
+                if len(items) < 100 or page * 100 >= min(result.get("total_count", 0), 1000):
+                    break
+                page += 1
+            return {"success": True, "data": names}
+        except requests.exceptions.RequestException as e:
+            return {"success": False, "error": str(e), "message": f"Failed to list repositories: {str(e)}"}
+
 def get_user_input_and_approval():
     """Get all user input and approval in one step."""
     
@@ -378,5 +483,38 @@ def create_repo_api(repo_name: str, description: str = "", gitignore: str = "",
             "message": f"Failed to create repository: {str(e)}"
         }
 
+def create_repo_from_template_api(template_repo: str, repo_name: str, description: str = "") -> Dict[str, Any]:
+    """API function for creating a repository from a template repository, same result shape as create_repo_api."""
+
+    GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+    if not GITHUB_TOKEN:
+        return {"success": False, "error": "GitHub token not configured"}
+
+    try:
+        github_creator = GitHubRepoCreator(GITHUB_TOKEN)
+        repo_info = github_creator.create_from_template(template_repo, repo_name, description)
+        if repo_info["success"]:
+            repo_data = repo_info["data"]
+            return {
+                "success": True,
+                "repository_url": repo_data.get("html_url"),
+                "clone_url": repo_data.get("clone_url"),
+                "message": "Repository created from template successfully"
+            }
+        else:
+            return {
+                "success": False,
+                "error": repo_info.get("error"),
+                "message": repo_info.get("message"),
+                "response": repo_info.get("response")
+            }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": f"Failed to create repository from template: {str(e)}"
+        }
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import NullPool
 import os
 from dotenv import load_dotenv
 
+from .db_pool import pool_settings, instrumented_pool_class, register_pool
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -17,17 +22,51 @@ if not DATABASE_URL:
         DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     except Exception as e:
         print("Unable to get the DB credentials")
-print(DATABASE_URL)
-
-print(DATABASE_URL)
+print(f"[INFO] Using database {make_url(DATABASE_URL).render_as_string(hide_password=True)}")
 
-engine = create_engine(DATABASE_URL)
+# Request handlers and background work (scheduler, assignment jobs, generation tasks) use
+# separate pools, so a burst of background sessions cannot starve interactive requests
+engine = create_engine(
+    DATABASE_URL, poolclass=instrumented_pool_class("interactive"),
+    **pool_settings("DB", default_size=10, default_overflow=10)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+background_engine = create_engine(
+    DATABASE_URL, poolclass=instrumented_pool_class("background"),
+    **pool_settings("DB_BACKGROUND", default_size=5, default_overflow=5)
+)
+BackgroundSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=background_engine)
 Base = declarative_base()
 
+# async def handlers use the asyncpg engine so queries do not block the event loop
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=instrumented_pool_class("async_interactive", asyncio=True),
+    **pool_settings("DB_ASYNC", default_size=10, default_overflow=10)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Coroutines run outside the server's loop (scheduler jobs under asyncio.run) must not reuse
+# pooled asyncpg connections, which are bound to the loop that opened them
+background_async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+BackgroundAsyncSessionLocal = async_sessionmaker(background_async_engine, autoflush=False, expire_on_commit=False)
+
+register_pool("interactive", engine)
+register_pool("background", background_engine)
+register_pool("async_interactive", async_engine)
+register_pool("async_background", background_async_engine)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
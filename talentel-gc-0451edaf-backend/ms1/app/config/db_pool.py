@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def pool_settings(prefix: str, default_size: int, default_overflow: int) -> Dict[str, Any]:
+    """
+    create_engine pool arguments read from <prefix>_POOL_SIZE, <prefix>_MAX_OVERFLOW,
+    <prefix>_POOL_TIMEOUT, <prefix>_POOL_RECYCLE and <prefix>_POOL_PRE_PING.
+    """
+    return {
+        "pool_size": int(os.getenv(f"{prefix}_POOL_SIZE", str(default_size))),
+        "max_overflow": int(os.getenv(f"{prefix}_MAX_OVERFLOW", str(default_overflow))),
+        "pool_timeout": float(os.getenv(f"{prefix}_POOL_TIMEOUT", "30")),
+        # Azure Postgres drops idle connections, so recycle well before its idle timeout
+        "pool_recycle": int(os.getenv(f"{prefix}_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv(f"{prefix}_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+class PoolMetrics:
+    """Checkout counts, checkout wait times and peak usage of one pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_in_use = 0
+
+    def record(self, wait_seconds: float, in_use: int, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": self.total_wait_seconds / attempts if attempts else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "peak_in_use": self.peak_in_use,
+            }
+
+
+class _TimedCheckout:
+    metrics: PoolMetrics
+
+    def connect(self):
+        started = time.monotonic()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record(time.monotonic() - started, self.checkedout(), timed_out=True)
+            raise
+        self.metrics.record(time.monotonic() - started, self.checkedout())
+        return connection
+
+
+_pools: Dict[str, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def instrumented_pool_class(name: str, asyncio: bool = False):
+    """
+    A QueuePool subclass that records checkout waits under name. The metrics live on the
+    class, so they survive the pool being recreated (e.g. by engine.dispose()).
+    """
+    base = AsyncAdaptedQueuePool if asyncio else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckout, base), {"metrics": PoolMetrics(name)})
+
+
+def register_pool(name: str, engine):
+    with _pools_lock:
+        _pools[name] = engine
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Live pool occupancy plus checkout metrics of every registered engine."""
+    with _pools_lock:
+        engines = dict(_pools)
+    stats = {}
+    for name, engine in engines.items():
+        pool = getattr(engine, "sync_engine", engine).pool
+        entry = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "timeout_seconds": pool.timeout(),
+            })
+        if isinstance(pool, _TimedCheckout):
+            entry.update(pool.metrics.snapshot())
+        stats[name] = entry
+    return stats
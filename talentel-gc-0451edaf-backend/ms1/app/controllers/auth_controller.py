@@ -4,7 +4,7 @@ from ..services.auth_service import AuthService
 from ..models.models import Employee, RoleEnum
 from ..schemas.schemas import EmployeeCreate, EmployeeLogin, EmployeeOut
 from ..services.auth_service import AuthService
-from ..services.rbac_service import RBACService
+from ..services.rbac_service import RBACService, Principal, get_principal
 from ..config.database import get_db
 from sqlalchemy.orm import Session
 
@@ -33,8 +33,8 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 #     return db_user
 
 @router.get("/getCurrentUser", response_model=EmployeeOut)
-def get_me(user=Depends(RBACService.get_current_user), db: Session = Depends(get_db)):
-    db_user = db.query(Employee).filter(Employee.email == user["sub"]).first()
+def get_me(principal: Principal = Depends(get_principal), db: Session = Depends(get_db)):
+    db_user = db.get(Employee, principal.user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -3,9 +3,10 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session, joinedload
 from ..config.database import get_db
 from ..models.models import RoleEnum, Employee, Collaborator
-from ..services.rbac_service import RBACService, require_roles
-from typing import List
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import Principal, get_principal, require_principal_roles
+from typing import List, Optional
+from fastapi.security import HTTPBearer
 
 from ..schemas.schemas import CollaboratorOut
 
@@ -16,11 +17,9 @@ bearer_scheme=HTTPBearer()
 @router.get("/me/permissions", response_model=dict)
 def get_user_permissions(
     db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    principal: Principal = Depends(get_principal)
 ):
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    role = payload.get("role")
+    role = principal.role
 
     # Default permissions
     permissions = {
@@ -39,21 +38,10 @@ def get_user_permissions(
         permissions["topics"] = True
         return permissions
 
-    # Check if user is a collaborator
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    # Aggregate permissions across all Collaborator records for this user
-    collab_records = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).all()
-    if collab_records:
-        permissions["isCollaborator"] = True
-        # If any record has topics=True, grant topics permission
-        permissions["topics"] = any(getattr(c, "topics", False) for c in collab_records)
-        # For test_assign and test_create, you may want similar aggregation or keep as is
-        permissions["test_assign"] = any(getattr(c, "test_assign", False) for c in collab_records)
-        permissions["test_create"] = any(getattr(c, "test_create", False) for c in collab_records)
-        # Add more permissions as needed
+    # Permissions aggregated across all Collaborator records for this user
+    collaborator_permissions = get_permission_service().get(db, principal.user_id)
+    permissions["isCollaborator"] = collaborator_permissions.is_collaborator
+    permissions.update(collaborator_permissions.aggregate)
 
     return permissions
 
@@ -61,18 +49,12 @@ def get_user_permissions(
 @router.get("/get-collaborators", response_model=List[CollaboratorOut])
 def get_all_collaborators(
         db: Session = Depends(get_db),
-        curr_user = Depends(require_roles(RoleEnum.CapabilityLeader)),
+        principal: Principal = Depends(require_principal_roles(RoleEnum.CapabilityLeader)),
 ):
     try:
-        user = db.query(Employee).filter(
-            Employee.email == curr_user.get('sub')
-        ).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="Forbidden")
-
         # Get all collaborator records for this user
         collab_records = db.query(Collaborator).filter(
-            Collaborator.cl_id == user.user_id
+            Collaborator.cl_id == principal.user_id
         ).all()
 
         # For each collaborator record, get the employee info and permissions
@@ -100,6 +82,8 @@ def get_all_collaborators(
 
 class AddCollaborator(BaseModel):
     collaborator_email: str
+    # Without one the grants apply to every tech stack the collaborator already has
+    tech_stack_id: Optional[int] = None
     topics: bool = False
     test_create: bool = False
     test_assign: bool = False
@@ -109,37 +93,38 @@ class AddCollaborator(BaseModel):
 def upsert_collaborator(
     request: AddCollaborator,
     db: Session = Depends(get_db),
-    curr_user=Depends(require_roles(RoleEnum.CapabilityLeader))
+    principal: Principal = Depends(require_principal_roles(RoleEnum.CapabilityLeader))
 ):
     try:
-        user = db.query(Employee).filter(
-            Employee.email == curr_user.get('sub')
-        ).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="Forbidden")
-
         collaborator = db.query(Employee).filter(
             Employee.email == request.collaborator_email
         ).first()
         if not collaborator:
             raise HTTPException(status_code=404, detail="Employee not found")
 
-        collab_record = db.query(Collaborator).filter(
+        query = db.query(Collaborator).filter(
             Collaborator.collaborator_id == collaborator.user_id,
-            Collaborator.cl_id == user.user_id
-        ).first()
-
-        if collab_record:
-            collab_record.topics = request.topics
-            collab_record.test_create = request.test_create
-            collab_record.test_assign = request.test_assign
+            Collaborator.cl_id == principal.user_id
+        )
+        if request.tech_stack_id is not None:
+            query = query.filter(Collaborator.tech_stack_id == request.tech_stack_id)
+        collab_records = query.order_by(Collaborator.id).all()
+
+        if collab_records:
+            for collab_record in collab_records:
+                collab_record.topics = request.topics
+                collab_record.test_create = request.test_create
+                collab_record.test_assign = request.test_assign
             db.commit()
-            db.refresh(collab_record)
-            return collab_record
+            db.refresh(collab_records[0])
+            return collab_records[0]
         else:
+            if request.tech_stack_id is None:
+                raise HTTPException(status_code=400, detail="tech_stack_id is required to add a collaborator")
             new_collaborator = Collaborator(
                 collaborator_id=collaborator.user_id,
-                cl_id=user.user_id,
+                cl_id=principal.user_id,
+                tech_stack_id=request.tech_stack_id,
                 topics=request.topics,
                 test_create=request.test_create,
                 test_assign=request.test_assign,
@@ -158,30 +143,30 @@ def upsert_collaborator(
 @router.delete("/delete-collaborator")
 def delete_collaborator(
     collaborator_email: str,
+    tech_stack_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    curr_user=Depends(require_roles(RoleEnum.CapabilityLeader))
+    principal: Principal = Depends(require_principal_roles(RoleEnum.CapabilityLeader))
 ):
     try:
-        user = db.query(Employee).filter(
-            Employee.email == curr_user.get('sub')
-        ).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="Forbidden")
-
         collaborator = db.query(Employee).filter(
             Employee.email == collaborator_email
         ).first()
         if not collaborator:
             raise HTTPException(status_code=404, detail="Collaborator employee not found")
 
-        collab_record = db.query(Collaborator).filter(
+        # Without a tech stack every relationship with the collaborator is removed
+        query = db.query(Collaborator).filter(
             Collaborator.collaborator_id == collaborator.user_id,
-            Collaborator.cl_id == user.user_id
-        ).first()
-        if not collab_record:
+            Collaborator.cl_id == principal.user_id
+        )
+        if tech_stack_id is not None:
+            query = query.filter(Collaborator.tech_stack_id == tech_stack_id)
+        collab_records = query.all()
+        if not collab_records:
             raise HTTPException(status_code=404, detail="Collaborator relationship not found")
 
-        db.delete(collab_record)
+        for collab_record in collab_records:
+            db.delete(collab_record)
         db.commit()
         return {"detail": "Collaborator deleted successfully"}
 
@@ -193,20 +178,10 @@ def delete_collaborator(
 @router.get("/is-collaborator")
 def is_collaborator(
         db: Session = Depends(get_db),
-        curr_user = Depends(RBACService.get_current_user)
+        principal: Principal = Depends(get_principal)
 ):
     try:
-        user = db.query(Employee).filter(
-            Employee.email == curr_user.get('sub')
-        ).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="Forbidden")
-        collaborators = db.query(Collaborator).filter(
-            Collaborator.collaborator_id == user.user_id,
-        ).first()
-        if not collaborators:
-            return False
-        return True
+        return get_permission_service().get(db, principal.user_id).is_collaborator
     except Exception as err:
         print(err)
         raise HTTPException(status_code=500, detail=str(err))
\ No newline at end of file
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from ..models.models import Employee, DebugExercise, DebugResult, TestAssign, Test
+from ..models.models import DebugExercise, DebugResult, TestAssign, Test
 from ..config.database import get_db
-from ..services.rbac_service import RBACService
+from ..services.rbac_service import Principal, get_principal
 import datetime
 import asyncio
 from ..Agents.DebugEvalauteAgent import evaluate_debug_answers
@@ -12,13 +12,10 @@ router = APIRouter(prefix="/debug-test", tags=["debug-test"])
 def start_debug_test(
     debug_test_id: int,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
     assignment = db.query(TestAssign).join(Test).filter(
-        TestAssign.user_id == employee.user_id,
+        TestAssign.user_id == principal.user_id,
         Test.debug_test_id == debug_test_id
     ).first()
     if not assignment:
@@ -52,12 +49,8 @@ def submit_debug_test(
     submission: dict,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
     debug_test_id = submission.get("debug_test_id")
     answers = submission.get("answers")
     start_time = submission.get("start_time")
@@ -67,7 +60,7 @@ def submit_debug_test(
 
     submitted_at = datetime.datetime.utcnow()
     result = DebugResult(
-        user_id=employee.user_id,
+        user_id=principal.user_id,
         debug_id=debug_test_id,
         score=0,
         answers=answers,
@@ -108,14 +101,10 @@ def process_debug_feedback(db, result_id):
 def get_debug_score(
     debug_test_id: int,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
     result = db.query(DebugResult).filter(
-        # DebugResult.user_id == employee.user_id,
+        # DebugResult.user_id == principal.user_id,
         DebugResult.debug_id == debug_test_id
     ).order_by(DebugResult.result_id.desc()).first()
 
@@ -1,42 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer
 
-from ..core.rbac import get_current_user
-
-from ..services.rbac_service import RBACService
-from ..models.models import Employee, Collaborator, EmployeeSkill, RoleEnum, TechStack
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import Principal, get_principal
+from ..models.models import Employee, EmployeeSkill, RoleEnum, TechStack
 from ..schemas.employee_schema import EmployeeFilter, EmployeeOut
 from ..config.database import get_db
-from ..services.employee_service import list_employees as list_employees_service, get_employee_tech_stack
+from ..services.employee_service import (
+    list_employees as list_employees_service, get_employee_tech_stacks, EMPLOYEE_SORT_COLUMNS
+)
+from ..utils.pagination import COUNT_MODES
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
 
 def require_employee_permission(
     db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    principal: Principal = Depends(get_principal)
 ):
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    role = payload.get("role")
-
     # Use .value for all enums
-    if role in [
-        RoleEnum.CapabilityLeader.value,
-        RoleEnum.ProductManager.value,
-        RoleEnum.DeliveryLeader.value,
-        RoleEnum.DeliveryManager.value
-    ]:
-        return payload
-
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Employee not found")
+    if principal.has_role(
+        RoleEnum.CapabilityLeader,
+        RoleEnum.ProductManager,
+        RoleEnum.DeliveryLeader,
+        RoleEnum.DeliveryManager
+    ):
+        return principal
 
-    collab = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).first()
-    if collab and getattr(collab, "test_assign", False):
-        return payload
+    if get_permission_service().get(db, principal.user_id).allows("test_assign"):
+        return principal
 
     raise HTTPException(
         status_code=403,
@@ -51,10 +44,19 @@ def list_employees(
 ):
     if filters is None:
         filters = EmployeeFilter()
-    total, employees = list_employees_service(db=db, filters=filters)
+    result = list_employees_service(
+        db=db,
+        band=filters.band,
+        skills=",".join(filters.skills) if filters.skills else None,
+        designation=filters.role,
+        search=filters.search,
+        page=filters.page,
+        page_size=filters.page_size
+    )
     return {
-        "total": total,
-        "employees": [EmployeeOut.from_orm(emp) for emp in employees]
+        "total": result["total"],
+        "next_cursor": result["next_cursor"],
+        "employees": [EmployeeOut.from_orm(emp) for emp in result["items"]]
     }
 
 @router.get("/employees", response_model=dict)
@@ -67,10 +69,13 @@ def list_employees_get(
     search: str = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str = Query(None, description="next_cursor of the previous page; replaces page"),
+    sort_by: str = Query("user_id", enum=EMPLOYEE_SORT_COLUMNS),
+    count: str = Query("exact", enum=COUNT_MODES, description="approx uses planner estimates on large tables"),
     db: Session = Depends(get_db),
     user_payload = Depends(require_employee_permission)
 ):
-    total, employees = list_employees_service(
+    result = list_employees_service(
         db=db,
         band=band,
         skills=skills,
@@ -79,12 +84,17 @@ def list_employees_get(
         skill_level=skill_level,
         search=search,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        sort_by=sort_by,
+        count=count
     )
+    employees = result["items"]
     employee_list = []
+    tech_stacks = get_employee_tech_stacks(db, [emp.user_id for emp in employees])
     for emp in employees:
         emp_out = EmployeeOut.from_orm(emp).dict()
-        tech_stack_data = get_employee_tech_stack(db, emp.user_id)
+        tech_stack_data = tech_stacks.get(emp.user_id)
         if tech_stack_data and len(tech_stack_data) > 0:
             emp_out["tech_stack"] = tech_stack_data
         elif emp.tech_stack and isinstance(emp.tech_stack, dict) and len(emp.tech_stack) > 0:
@@ -99,23 +109,19 @@ def list_employees_get(
         emp_out["python_skill_level"] = python_level
         employee_list.append(emp_out)
     return {
-        "total": total,
+        "total": result["total"],
+        "total_is_estimate": result["total_is_estimate"],
+        "next_cursor": result["next_cursor"],
         "employees": employee_list
     }
 
 @router.get("/employee/profile", response_model=dict)
 def get_employee_profile(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     # Fetch employee basic info
-    user_id = current_user.get("user_id") or current_user.get("id")
-    employee = None
-    if user_id:
-        employee = db.query(Employee).filter(Employee.user_id == user_id).first()
-    if not employee and "sub" in current_user:
-        # Try lookup by email if user_id is missing
-        employee = db.query(Employee).filter(Employee.email == current_user["sub"]).first()
+    employee = db.get(Employee, principal.user_id)
     if not employee:
         return {"error": "Employee not found"}
 
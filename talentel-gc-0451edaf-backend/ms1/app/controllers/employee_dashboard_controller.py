@@ -2,14 +2,20 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
  
+import asyncio
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Text, and_, cast, exists, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.models import (
-    StatusType, TestAssign, Test, Employee, Quiz, QuizResult, DebugExercise, DebugResult,HandsOnResult
+    StatusType, TestAssign, Test, Quiz, QuizResult, DebugExercise, DebugResult,HandsOnResult
 )
-from ..services.rbac_service import RBACService
-from ..config.database import get_db
+from ..services.quiz_delivery_service import get_quiz_delivery_cache
+from ..services.quiz_scoring_service import get_answer_key_cache
+from ..services.rbac_service import Principal, get_principal
+from ..config.database import get_db, get_async_db, BackgroundSessionLocal
+from ..utils.http_cache import etag_matches, strong_etag
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import pytz
@@ -44,6 +50,28 @@ class AssingedTest(BaseModel):
     handson_id: Optional[int] = None
     created_by : Optional[int] = None
 
+class ComponentSummary(BaseModel):
+    id: int
+    attempted: bool = False
+    submitted: bool = False
+    result_id: Optional[int] = None
+    score: Optional[int] = None
+    submitted_at: Optional[datetime.datetime] = None
+    feedback_ready: bool = False
+    duration: Optional[str] = None
+
+class TestSummary(BaseModel):
+    test_id: int
+    test_name: str
+    status: StatusType
+    due_date: Optional[datetime.datetime] = None
+    debug_url: str
+    handson_url: str
+    created_by: Optional[int] = None
+    quiz: Optional[ComponentSummary] = None
+    debug: Optional[ComponentSummary] = None
+    handson: Optional[ComponentSummary] = None
+
 class TestStartOut(BaseModel):
     test_id: int
     test_name: str
@@ -56,72 +84,160 @@ class SubmitResultIn(BaseModel):
     answers: Dict[str, str]
     start_time: datetime.datetime
  
+def _assignments_query(db: Session, user_id: int, status: Optional[StatusType] = None):
+    """Assignments of a user joined with their test and quiz duration, oldest first."""
+    query = db.query(
+        TestAssign.test_id,
+        TestAssign.status,
+        TestAssign.due_date,
+        TestAssign.debug_github_url,
+        TestAssign.handson_github_url,
+        Test.test_name,
+        Test.created_by,
+        Test.quiz_id,
+        Test.debug_test_id,
+        Test.handson_id,
+        Quiz.duration.label("quiz_duration"),
+    ).join(
+        Test, Test.id == TestAssign.test_id
+    ).outerjoin(
+        Quiz, Quiz.id == Test.quiz_id
+    ).filter(
+        TestAssign.user_id == user_id
+    )
+    if status:
+        query = query.filter(TestAssign.status == status)
+    return query.order_by(TestAssign.assign_id)
+
+
+def _latest_results(db: Session, model, key_column, user_id: int, keys):
+    """The newest result of a user per exercise id in keys, as {exercise_id: row}, in one query."""
+    keys = {key for key in keys if key is not None}
+    if not keys:
+        return {}
+    ranked = db.query(
+        key_column.label("key"),
+        model.result_id,
+        model.score,
+        model.is_submitted,
+        (model.submitted_at if hasattr(model, "submitted_at") else literal(None)).label("submitted_at"),
+        and_(model.feedback_data.isnot(None), cast(model.feedback_data, Text) != "null").label("feedback_ready"),
+        func.row_number().over(partition_by=key_column, order_by=model.result_id.desc()).label("rank"),
+    ).filter(
+        model.user_id == user_id,
+        key_column.in_(keys)
+    ).subquery()
+    return {row.key: row for row in db.query(ranked).filter(ranked.c.rank == 1)}
+
+
+def _component_summary(component_id, result, duration=None):
+    if component_id is None:
+        return None
+    if result is None:
+        return ComponentSummary(id=component_id, duration=duration)
+    return ComponentSummary(
+        id=component_id,
+        attempted=True,
+        submitted=bool(result.is_submitted),
+        result_id=result.result_id,
+        score=result.score,
+        submitted_at=result.submitted_at,
+        feedback_ready=bool(result.feedback_ready),
+        duration=duration,
+    )
+
+
 @router.get("/assigned-tests", response_model=list[AssingedTest])
 def get_assigned_tests(
+    status: Optional[StatusType] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    print("assigned tests")
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    assignments = db.query(TestAssign).filter(TestAssign.user_id == employee.user_id).all()
+    # Assignments, their test, quiz duration and attempt state in one round trip
+    quiz_attempted = exists().where(
+        QuizResult.user_id == TestAssign.user_id,
+        QuizResult.quiz_id == Test.quiz_id
+    )
+    query = _assignments_query(db, principal.user_id, status).add_columns(
+        quiz_attempted.label("quiz_attempted")
+    )
+    # Without page_size every assignment is returned, as before pagination existed
+    if page_size:
+        query = query.offset((page - 1) * page_size).limit(page_size)
+
     tests = []
-    for assignment in assignments:
-        print(assignment.debug_github_url,"asssing")
-
-        # Quiz details
-        test = db.query(Test).filter(Test.id == assignment.test_id).first()
-        quiz_id = test.quiz_id
-
-        quiz_name = None
-        quiz_duration_str = None
-        quiz_attempted = None
-        attempted = False
-        if quiz_id:
-            quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-            if quiz:
-                quiz_name = quiz.name if hasattr(quiz, "name") else None
-                quiz_duration_str = f"{quiz.duration}:00"
-            result = db.query(QuizResult).filter(
-                QuizResult.user_id == employee.user_id,
-                QuizResult.quiz_id == quiz_id
-            ).first()
-            attempted = result is not None
-            quiz_attempted = attempted
-
-        print("test",test)
+    for row in query.all():
+        attempted = bool(row.quiz_id and row.quiz_attempted)
         tests.append(
             AssingedTest(
-                test_id=assignment.test_id,
-                test_name=test.test_name,
-                due_date = assignment.due_date,
-                debug_url = assignment.debug_github_url or "",
-                handson_url = assignment.handson_github_url or "",
+                test_id=row.test_id,
+                test_name=row.test_name,
+                due_date = row.due_date,
+                debug_url = row.debug_github_url or "",
+                handson_url = row.handson_github_url or "",
                 attempted=attempted,
-                created_by = test.created_by,
-
-                quiz_id=quiz_id,
-                quiz_name=quiz_name,
-                quiz_duration=quiz_duration_str,
-                quiz_attempted=quiz_attempted,
-                debug_test_id=getattr(test, "debug_test_id", None),
-                handson_id=getattr(test, "handson_id", None),
+                created_by = row.created_by,
+
+                quiz_id=row.quiz_id,
+                quiz_name=None,
+                quiz_duration=f"{row.quiz_duration}:00" if row.quiz_duration is not None else None,
+                quiz_attempted=attempted if row.quiz_id else None,
+                debug_test_id=row.debug_test_id,
+                handson_id=row.handson_id,
             )
         )
     return tests
  
+@router.get("/summary", response_model=list[TestSummary])
+def get_dashboard_summary(
+    status: Optional[StatusType] = Query(None),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_principal)
+):
+    """
+    Every assigned test with quiz/debug/hands-on attempt and submission state, latest
+    scores and feedback readiness, in a constant number of queries.
+    """
+
+    assignments = _assignments_query(db, principal.user_id, status).all()
+    quiz_results = _latest_results(db, QuizResult, QuizResult.quiz_id, principal.user_id,
+                                   [row.quiz_id for row in assignments])
+    debug_results = _latest_results(db, DebugResult, DebugResult.debug_id, principal.user_id,
+                                    [row.debug_test_id for row in assignments])
+    handson_results = _latest_results(db, HandsOnResult, HandsOnResult.handson_id, principal.user_id,
+                                      [row.handson_id for row in assignments])
+
+    return [
+        TestSummary(
+            test_id=row.test_id,
+            test_name=row.test_name,
+            status=row.status,
+            due_date=row.due_date,
+            debug_url=row.debug_github_url or "",
+            handson_url=row.handson_github_url or "",
+            created_by=row.created_by,
+            quiz=_component_summary(
+                row.quiz_id, quiz_results.get(row.quiz_id),
+                duration=f"{row.quiz_duration}:00" if row.quiz_duration is not None else None
+            ),
+            debug=_component_summary(row.debug_test_id, debug_results.get(row.debug_test_id)),
+            handson=_component_summary(row.handson_id, handson_results.get(row.handson_id)),
+        )
+        for row in assignments
+    ]
+ 
 @router.get("/start-test/{test_id}", response_model=TestStartOut)
 def start_test(
     test_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
     assignment = db.query(TestAssign).filter(
-        # TestAssign.user_id == employee.user_id,
+        # TestAssign.user_id == principal.user_id,
         TestAssign.test_id == test_id
     ).first()
     if not assignment:
@@ -130,51 +246,25 @@ def start_test(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
  
-    # Fetch test data (from quizzes if quiz_id is present)
+    # Questions come from the cached delivery view of the quiz, without the answer key
     test_data = {}
     quiz_duration = None
-    if test.quiz_id:
-        quiz = db.query(Quiz).filter(Quiz.id == test.quiz_id).first()
-        if quiz:
-            quiz_duration = quiz.duration*60  # duration in seconds
-            # Ensure each question has an 'options' array for MCQs
-            test_data = {}
-            for qid, qdata in quiz.questions[0].items():
-                # If options already exist, use them; else, create MCQ options from correct answer and distractors
-                options = qdata.get("options")
-                if not options:
-                    correct = qdata.get("correctAnswer", "")
-                    # Example distractors for Python MCQ
-                    distractors = []
-                    if "class" in qdata.get("question", "").lower():
-                        distractors = [
-                            "A variable",
-                            "A function",
-                            "A module"
-                        ]
-                    elif "REST" in qdata.get("question", "").lower():
-                        distractors = [
-                            "Random Event Source Table",
-                            "Remote Execution Service",
-                            "Relational Entity Set Type"
-                        ]
-                    # Ensure correct answer is included and options are shuffled
-                    options = [correct] + distractors
-                # Set type to 'multiple_choice' if options exist
-                qtype = "multiple_choice" if options else "text"
-                test_data[qid] = {
-                    **qdata,
-                    "options": options,
-                    "type": qtype
-                }
+    view = get_quiz_delivery_cache().get(db, test.quiz_id) if test.quiz_id else None
+    if view:
+        quiz_duration = view.duration*60  # duration in seconds
+        test_data = view.questions
  
     # Format duration as MM:SS
     duration_sec = quiz_duration if quiz_duration is not None else test.duration
     minutes = duration_sec // 60
     seconds = duration_sec % 60
     formatted_duration = f"{minutes}:{seconds:02d}"
-    
-    print(test.created_by,"crea")
+
+    etag = strong_etag(test.id, test.test_name, test.created_by, formatted_duration, view.etag if view else None)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
     return {
         "test_id": test.id,
         "test_name": test.test_name,
@@ -187,13 +277,10 @@ def start_test(
 def submit_test(
     submission: SubmitResultIn,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
     assignment = db.query(TestAssign).filter(
-        TestAssign.user_id == employee.user_id,
+        TestAssign.user_id == principal.user_id,
         TestAssign.test_id == submission.test_id
     ).first()
     if not assignment:
@@ -202,26 +289,12 @@ def submit_test(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
  
-    # Timer enforcement
-    quiz_duration = None
-    if test.quiz_id:
-        quiz = db.query(Quiz).filter(Quiz.id == test.quiz_id).first()
-        if quiz:
-            quiz_duration = quiz.duration  # duration in seconds
- 
     # Timer enforcement removed (no TestSession tracking)
  
-    # Scoring logic (for quizzes)
-    correct_answers = {}
-    if test.quiz_id:
-        quiz = db.query(Quiz).filter(Quiz.id == test.quiz_id).first()
-        if quiz:
-            correct_answers = {q: v["correctAnswer"] for q, v in quiz.questions[0].items()}
-    score = sum(
-        1 for q, ans in submission.answers.items()
-        if correct_answers.get(q) == ans
-    )
-    total_questions = len(correct_answers)
+    # Scoring logic (for quizzes), against the cached answer key
+    answer_key = get_answer_key_cache().get(db, test.quiz_id) if test.quiz_id else None
+    score = answer_key.score(submission.answers) if answer_key else 0
+    total_questions = answer_key.total if answer_key else 0
  
     # Store result (in quiz_results)
    
@@ -234,7 +307,7 @@ def submit_test(
     local_start_time = utc_dt.astimezone(local_tz).replace(tzinfo=None)
  
     new_result = QuizResult(
-        user_id=employee.user_id,
+        user_id=principal.user_id,
         quiz_id=test.quiz_id,
         score=score,
         start_time=local_start_time,
@@ -260,12 +333,9 @@ def submit_test(
 def get_score(
     test_id: int,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     print("Called")
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
     test = db.query(Test).filter(Test.id == test_id).first()
     print("1",test)
     if not test or not test.quiz_id:
@@ -277,7 +347,7 @@ def get_score(
         if quiz:
             quiz_duration = quiz.duration  # duration in seconds
     result = db.query(QuizResult).filter(
-        # QuizResult.user_id == employee.user_id,
+        # QuizResult.user_id == principal.user_id,
         QuizResult.quiz_id == test.quiz_id
     ).order_by(QuizResult.result_id.desc()).first()
     print("qw")
@@ -303,49 +373,51 @@ from ..utils.email import send_feedback_email
 def get_test_submit_status(
     test_id: int,
     db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
 
     result = db.query(QuizResult).filter(
-        QuizResult.user_id == employee.user_id,
+        QuizResult.user_id == principal.user_id,
         QuizResult.quiz_id == test_id
     ).first()
     quiz_isSubmitted = result.is_submitted if result else False
 
     result = db.query(DebugResult).filter(
-        DebugResult.user_id == employee.user_id,
+        DebugResult.user_id == principal.user_id,
         DebugResult.debug_id == test_id
     ).first()
     debug_isSubmitted = result.is_submitted if result else False
 
     result = db.query(HandsOnResult).filter(
-        HandsOnResult.user_id == employee.user_id,
+        HandsOnResult.user_id == principal.user_id,
         HandsOnResult.handson_id == test_id
     ).first()
     handson_isSubmitted = result.is_submitted if result else False
 
     return {"debug_isSubmitted":debug_isSubmitted,"handson_isSubmitted":handson_isSubmitted,"quiz_isSubmitted":quiz_isSubmitted}
 
+def _send_feedback_email(user_id, quiz_id):
+    db = BackgroundSessionLocal()
+    try:
+        send_feedback_email(db, user_id, quiz_id)
+    finally:
+        db.close()
+
+
 @router.get("/feedback/{result_id}")
 async def get_feedback_for_result(
     result_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(RBACService.get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_principal)
 ):
     from ..Agents.FeedbackAgent.FeedbackAgent import generate_feedback
     import json
 
-    employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    result = db.query(QuizResult).filter(
+    result = await db.scalar(select(QuizResult).where(
         QuizResult.result_id == result_id,
-        # QuizResult.user_id == employee.user_id
-    ).first()
+        # QuizResult.user_id == principal.user_id
+    ))
     if not result:
         raise HTTPException(status_code=404, detail="Result not found")
 
@@ -353,7 +425,7 @@ async def get_feedback_for_result(
     if result.feedback_data:
         return result.feedback_data
 
-    quiz = db.query(Quiz).filter(Quiz.id == result.quiz_id).first()
+    quiz = await db.scalar(select(Quiz).where(Quiz.id == result.quiz_id))
     questions = quiz.questions if quiz else {}
 
     quiz_data = {
@@ -371,8 +443,9 @@ async def get_feedback_for_result(
 
     # Store feedback in QuizResult
     result.feedback_data = json.loads(feedback_json)
-    db.commit()
+    await db.commit()
 
-    send_feedback_email(db, result.user_id, result.quiz_id)
+    # SMTP and the email lookups block, so they run off the event loop
+    await asyncio.to_thread(_send_feedback_email, result.user_id, result.quiz_id)
 
     return json.loads(feedback_json)
@@ -9,8 +9,10 @@ router = APIRouter()
 @router.get("/evaluate/all")
 async def evaluate_all():
     try:
-        asyncio.create_task(evaluate_unevaluated_handson_assignments())
-        asyncio.create_task(evaluate_unevaluated_debug_assignments())
+        # The evaluators clone repos and query synchronously, so like the scheduler's jobs
+        # they run on a loop of their own instead of the server's
+        asyncio.create_task(asyncio.to_thread(asyncio.run, evaluate_unevaluated_handson_assignments()))
+        asyncio.create_task(asyncio.to_thread(asyncio.run, evaluate_unevaluated_debug_assignments()))
         return {
             "success": True,
             "details": "Evaluation Started",
@@ -1,13 +1,15 @@
 import asyncio
 import os
 from datetime import datetime
-from ..services.evaluator_service import evaluate_debug, evaluate_handson
+from ..services.evaluator_service import evaluate_debug, evaluate_handson, get_debug_manifest_paths
 from fastapi import FastAPI, Depends, HTTPException, APIRouter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..utils.GithubRepoFetcher import GitHubRepoFetcher
-from ..services.rbac_service import RBACService
-from ..config.database import get_db
-from ..models.models import DebugExercise, DebugResult, HandsOnResult, HandsOn, Employee, TestAssign, Test
+from ..services.rbac_service import Principal, get_principal
+from ..config.database import get_db, get_async_db
+from ..models.models import DebugExercise, DebugResult, HandsOnResult, HandsOn, TestAssign, Test
 
 router = APIRouter()
 
@@ -49,41 +51,37 @@ def get_user_feedback_handson(
 
 @router.post("/evaluate/debug/{test_id}")
 async def evaluate_feedback(
-        test_id: int, user_payload = Depends(RBACService.get_current_user),
-        db: Session = Depends(get_db)
+        test_id: int, principal: Principal = Depends(get_principal),
+        db: AsyncSession = Depends(get_async_db)
 ):
     try:
         print("start debug")
-        user = db.query(Employee).filter(Employee.email == user_payload.get('sub')).first()
-        if not user:
-            raise HTTPException(404, detail="User not found")
-
-        test = db.query(Test).filter(Test.id == test_id).first()
+        test = await db.scalar(select(Test).where(Test.id == test_id))
         if not test:
             raise HTTPException(404, detail="Test not found")
         
         debug_id = test.debug_test_id
 
-        debug_test = db.query(DebugExercise).filter(
+        debug_test = await db.scalar(select(DebugExercise).where(
             DebugExercise.id == debug_id
-        ).first()
+        ))
         if not debug_test:
             raise HTTPException(404, detail="Debug exercise not found")
-        debug_res = db.query(DebugResult).filter(
+        debug_res = await db.scalar(select(DebugResult).where(
             DebugResult.debug_id == debug_id,
-            DebugResult.user_id == user.user_id
-        ).first()
+            DebugResult.user_id == principal.user_id
+        ))
         if debug_res:
             raise HTTPException(404, detail="Debug Result already exists")
-        test = db.query(Test.id).filter(
+        test = (await db.execute(select(Test.id).where(
             Test.debug_test_id == debug_id,
-        ).first()
+        ))).first()
         if not test:
             raise HTTPException(404, detail="Test not found")
-        assigned = db.query(TestAssign).filter(
-            TestAssign.user_id == user.user_id,
+        assigned = await db.scalar(select(TestAssign).where(
+            TestAssign.user_id == principal.user_id,
             TestAssign.test_id == test.id
-        ).first()
+        ))
         if not assigned:
             raise HTTPException(404, detail="Assignment not found")
         if not assigned.debug_github_url:
@@ -93,13 +91,15 @@ async def evaluate_feedback(
         repo_path = repo_url.split("github.com/")[1].replace(".git", "")
         repo_full_name = repo_path
         branch = "main"
-        target_dir = f"/tmp/{repo_full_name.replace('/', '_')}_{assigned.assign_id}"
-        fetch_result = fetcher.fetch_repo_at_commit(
+        # Cloning blocks, so it runs off the event loop
+        fetch_result = await asyncio.to_thread(
+            fetcher.fetch_repo_at_commit,
             repo_url=repo_url,
             repo_full_name=repo_full_name,
             branch=branch,
             timestamp=datetime.utcnow().isoformat() + "Z",
             assign_id=assigned.assign_id,
+            paths=get_debug_manifest_paths(debug_test.path_id),
         )
         if fetch_result.get("success"):
             asyncio.create_task(evaluate_debug(fetch_result["local_path"], debug_test.path_id, user_id=assigned.user_id))
@@ -116,16 +116,12 @@ async def evaluate_feedback(
 @router.post("/evaluate/handson/{test_id}")
 async def evaluate_handson_feedback(
         test_id: int,
-        user_payload=Depends(RBACService.get_current_user),
-        db: Session = Depends(get_db)
+        principal: Principal = Depends(get_principal),
+        db: AsyncSession = Depends(get_async_db)
 ):
     print("receieved")
     try:
-        user = db.query(Employee).filter(Employee.email == user_payload.get('sub')).first()
-        if not user:
-            raise HTTPException(404, detail="User not found")
-
-        test = db.query(Test).filter(Test.id == test_id).first()
+        test = await db.scalar(select(Test).where(Test.id == test_id))
         if not test:
             raise HTTPException(404, detail="Test not found")
 
@@ -134,32 +130,32 @@ async def evaluate_handson_feedback(
         handson_id = test.handson_id
         print(handson_id,"fa")
 
-        handson_test = db.query(HandsOn).filter(
+        handson_test = await db.scalar(select(HandsOn).where(
             HandsOn.id == handson_id
-        ).first()
+        ))
         if not handson_test:
             raise HTTPException(404, detail="HandsOn exercise not found")
         print(handson_test,"test han",)
-        print("iddds",handson_id,user.user_id)
-        handson_res = db.query(HandsOnResult).filter(
+        print("iddds",handson_id,principal.user_id)
+        handson_res = await db.scalar(select(HandsOnResult).where(
             HandsOnResult.handson_id == handson_id,
-            HandsOnResult.user_id == user.user_id
-        ).first()
+            HandsOnResult.user_id == principal.user_id
+        ))
         if handson_res:
             raise HTTPException(404, detail="HandsOn Result already exists")
         print(handson_res,"res hand")
 
-        test = db.query(Test.id).filter(
+        test = (await db.execute(select(Test.id).where(
             Test.handson_id == handson_id,
-        ).first()
+        ))).first()
         print(test)
         if not test:
             raise HTTPException(404, detail="Test not found")
 
-        assigned = db.query(TestAssign).filter(
-            TestAssign.user_id == user.user_id,
+        assigned = await db.scalar(select(TestAssign).where(
+            TestAssign.user_id == principal.user_id,
             TestAssign.test_id == test.id
-        ).first()
+        ))
         if not assigned or not assigned.handson_github_url:
             raise HTTPException(404, detail="Assignment not found")
 
@@ -168,9 +164,10 @@ async def evaluate_handson_feedback(
         repo_path = repo_url.split("github.com/")[1].replace(".git", "")
         repo_full_name = repo_path
         branch = "main"
-        target_dir = f"/tmp/{repo_full_name.replace('/', '_')}_{assigned.assign_id}"
 
-        fetch_result = fetcher.fetch_repo_at_commit(
+        # Cloning blocks, so it runs off the event loop
+        fetch_result = await asyncio.to_thread(
+            fetcher.fetch_repo_at_commit,
             repo_url=repo_url,
             repo_full_name=repo_full_name,
             branch=branch,
@@ -2,13 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from ..config.database import get_db
-from ..models.models import Employee, DebugExercise, DebugResult, HandsOnResult, TestAssign, Test
-from ..services.rbac_service import RBACService
+from ..models.models import DebugExercise, DebugResult, HandsOnResult, TestAssign, Test
+from ..services.rbac_service import Principal, get_principal
 import logging
 router = APIRouter(tags=["hands_on"])
 
 @router.get("/handson-result/{handson_id}")
-def get_handson_result(handson_id: int, db: Session = Depends(get_db),user=Depends(RBACService.get_current_user)):
+def get_handson_result(handson_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_principal)):
     """
     Returns the hands-on result for a given test_id in the handson.json structure.
     """
@@ -16,12 +16,8 @@ def get_handson_result(handson_id: int, db: Session = Depends(get_db),user=Depen
     try:
         print(handson_id,"handson result")
 
-        employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-        if not employee:
-            raise HTTPException(status_code=404, detail="Employee not found")
-
         handson_result = db.query(HandsOnResult).filter(
-            # DebugResult.user_id == employee.user_id,
+            # DebugResult.user_id == principal.user_id,
             HandsOnResult.handson_id == handson_id
         ).first()
         
@@ -36,33 +32,28 @@ def get_handson_result(handson_id: int, db: Session = Depends(get_db),user=Depen
         raise HTTPException(status_code=500, detail="Failed to fetch handson result")
 
 @router.put("/handson-result/{handson_id}/complete")
-def mark_handson_completed(handson_id: int, db: Session = Depends(get_db), user=Depends(RBACService.get_current_user)):
+def mark_handson_completed(handson_id: int, db: Session = Depends(get_db), principal: Principal = Depends(get_principal)):
     """
     Marks the hands-on result as completed (is_submitted=True) for the current user and handson_id.
     """
     try:
-        employee = db.query(Employee).filter(Employee.email == user["sub"]).first()
-        if not employee:
-            logging.error(f"Employee not found for email: {user['sub']}")
-            raise HTTPException(status_code=404, detail="Employee not found")
-
-        print(handson_id,employee.user_id,"handson compelete")
+        print(handson_id,principal.user_id,"handson compelete")
         handson_result = db.query(HandsOnResult).filter(
-            HandsOnResult.user_id == employee.user_id,
+            HandsOnResult.user_id == principal.user_id,
             HandsOnResult.handson_id == handson_id
         ).first()
 
         if not handson_result:
-            logging.error(f"HandsOnResult not found for user_id={employee.user_id}, handson_id={handson_id}")
+            logging.error(f"HandsOnResult not found for user_id={principal.user_id}, handson_id={handson_id}")
             raise HTTPException(status_code=404, detail="HandsOnResult not found")
 
         if handson_result.is_submitted:
-            logging.info(f"HandsOnResult already marked as completed for user_id={employee.user_id}, handson_id={handson_id}")
+            logging.info(f"HandsOnResult already marked as completed for user_id={principal.user_id}, handson_id={handson_id}")
             return {"message": "Handson already marked as completed"}
 
         handson_result.is_submitted = True
         db.commit()
-        logging.info(f"Marked handson as completed for user_id={employee.user_id}, handson_id={handson_id}")
+        logging.info(f"Marked handson as completed for user_id={principal.user_id}, handson_id={handson_id}")
         return {"message": "Handson marked as completed"}
 
     except Exception as e:
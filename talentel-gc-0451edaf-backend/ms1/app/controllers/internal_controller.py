@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+
+from ..config.db_pool import get_pool_stats
+from ..models.models import RoleEnum
+from ..services.catalog_cache import get_catalog_cache
+from ..services.identity_cache import get_identity_cache
+from ..services.permission_service import get_permission_service
+from ..services.quiz_delivery_service import get_quiz_delivery_cache
+from ..services.quiz_scoring_service import get_answer_key_cache
+from ..services.rbac_service import require_roles
+from ..utils.github_client import get_github_stats
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/db-pool")
+def db_pool_stats(curr_user=Depends(require_roles(RoleEnum.CapabilityLeader))):
+    """Occupancy and checkout wait metrics of the interactive and background connection pools."""
+    return get_pool_stats()
+
+
+@router.get("/github-stats")
+def github_stats(curr_user=Depends(require_roles(RoleEnum.CapabilityLeader))):
+    """Per-endpoint GitHub API call counts, latencies and the last seen rate limits."""
+    return get_github_stats()
+
+
+@router.get("/caches")
+def cache_stats(curr_user=Depends(require_roles(RoleEnum.CapabilityLeader))):
+    """Size and hit counts of the in-process caches."""
+    return {
+        "quiz_delivery": get_quiz_delivery_cache().get_stats(),
+        "answer_keys": get_answer_key_cache().get_stats(),
+        "identities": get_identity_cache().get_stats(),
+        "permissions": get_permission_service().get_stats(),
+        "catalog": get_catalog_cache().get_stats(),
+    }
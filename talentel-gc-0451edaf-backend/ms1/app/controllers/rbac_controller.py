@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from ..services.rbac_service import RBACService, get_capability_leader_if_not_self
+from ..services.rbac_service import RBACService, Principal, get_capability_leader_if_not_self, get_principal
 from ..models.models import RoleEnum
 
 router = APIRouter(prefix="/rbac", tags=["rbac"])
@@ -16,10 +16,10 @@ def protected_route(credentials: HTTPAuthorizationCredentials = Depends(bearer_s
 
 @router.get("/get-cl")
 def get_capability_leader(
-        curr_user = Depends(RBACService.get_current_user),
+        principal: Principal = Depends(get_principal),
         cl = Depends(get_capability_leader_if_not_self)
 ):
     return {
-        "curr_user": curr_user,
+        "curr_user": principal.claims,
         "capability_leader": cl
     }
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..config.database import get_db
+from ..services.search_service import SEARCH_TARGETS, typeahead_search
+from .employee_controller import require_employee_permission
+
+router = APIRouter()
+
+
+@router.get("/search/typeahead", response_model=dict)
+def typeahead(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: str = Query("all", enum=["all", *SEARCH_TARGETS]),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    user_payload = Depends(require_employee_permission)
+):
+    kinds = list(SEARCH_TARGETS) if kind == "all" else [kind]
+    return typeahead_search(db, q, kinds, limit)
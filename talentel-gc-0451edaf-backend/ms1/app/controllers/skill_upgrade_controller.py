@@ -1,35 +1,41 @@
 import asyncio
 
-from ..config.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.database import get_async_db
 from ..services.skill_upgrade_service import *
-from ..services.rbac_service import RBACService
+from ..services.rbac_service import Principal, get_principal
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from ..models.models import Employee, EmployeeSkill, SkillUpgrade, TestAssign, Test, QuizResult, DebugResult, HandsOnResult, DifficultyLevel
+from ..models.models import EmployeeSkill, SkillUpgrade, TestAssign, Test, QuizResult, DebugResult, HandsOnResult, DifficultyLevel
 from ..schemas.test_schema import TestOut, SkillUpgradeRequest
 from fastapi import Request
 
 router = APIRouter()
 
+# The event loop only keeps weak references to tasks, so running generations are held here
+_generation_tasks = set()
+
 @router.post('/skill-upgrade')
 async def skill_upgrade(
     request: SkillUpgradeRequest,
-    db: Session = Depends(get_db),
-    curr_user = Depends(RBACService.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_principal),
     background_tasks: BackgroundTasks = None
 ):
     try:
-        user = db.query(Employee).filter(Employee.email == curr_user.get('sub')).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Employee not found")
-        tech_stack_db = db.query(TechStack).filter(TechStack.name == request.tech_stack).first()
+        tech_stack_db = await db.scalar(select(TechStack).where(TechStack.name == request.tech_stack))
         if not tech_stack_db:
             raise HTTPException(status_code=404, detail="Tech stack not found")
 
-        test = asyncio.create_task(create_skill_upgrade_test(
-            db=db, tech_stack_name=request.tech_stack,
-            user_id=user.user_id, level=request.level,
+        # The request session is closed once this returns, so generation opens its own
+        task = asyncio.create_task(run_skill_upgrade_generation(
+            tech_stack_name=request.tech_stack,
+            user_id=principal.user_id, level=request.level,
             background_tasks=background_tasks
         ))
+        _generation_tasks.add(task)
+        task.add_done_callback(_generation_tasks.discard)
         # Convert SQLAlchemy model to Pydantic schema
         return {"status": "Generating"}
     except HTTPException as e:
@@ -41,27 +47,22 @@ async def skill_upgrade(
 @router.post('/skill-upgrade/complete')
 async def complete_skill_upgrade(
     test_id: int,
-    db: Session = Depends(get_db),
-    curr_user=Depends(RBACService.get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_principal)
 ):
     try:
         import logging
         logger = logging.getLogger("skill_upgrade_complete")
 
-        user = db.query(Employee).filter(Employee.email == curr_user.get('sub')).first()
-        if not user:
-            logger.error("Employee not found for email: %s", curr_user.get('sub'))
-            raise HTTPException(status_code=404, detail="Employee not found")
-
-        test_assign = db.query(TestAssign).filter(
-            TestAssign.user_id == user.user_id,
+        test_assign = await db.scalar(select(TestAssign).where(
+            TestAssign.user_id == principal.user_id,
             TestAssign.test_id == test_id
-        ).first()
+        ))
         if not test_assign:
-            logger.error("Test assignment not found for user_id: %s, test_id: %s", user.user_id, test_id)
+            logger.error("Test assignment not found for user_id: %s, test_id: %s", principal.user_id, test_id)
             raise HTTPException(status_code=404, detail="Test assignment not found for user")
 
-        test = db.query(Test).filter(Test.id == test_id).first()
+        test = await db.scalar(select(Test).where(Test.id == test_id))
         if not test:
             logger.error("Test not found for test_id: %s", test_id)
             raise HTTPException(status_code=404, detail="Test not found")
@@ -75,26 +76,26 @@ async def complete_skill_upgrade(
         handson_score = None
 
         if quiz_id:
-            quiz_result = db.query(QuizResult).filter(
-                QuizResult.user_id == user.user_id,
+            quiz_result = await db.scalar(select(QuizResult).where(
+                QuizResult.user_id == principal.user_id,
                 QuizResult.quiz_id == quiz_id
-            ).order_by(QuizResult.submitted_at.desc()).first()
+            ).order_by(QuizResult.submitted_at.desc()).limit(1))
             if quiz_result:
                 quiz_score = quiz_result.score
 
         if debug_id:
-            debug_result = db.query(DebugResult).filter(
-                DebugResult.user_id == user.user_id,
+            debug_result = await db.scalar(select(DebugResult).where(
+                DebugResult.user_id == principal.user_id,
                 DebugResult.debug_id == debug_id
-            ).order_by(DebugResult.result_id.desc()).first()
+            ).order_by(DebugResult.result_id.desc()).limit(1))
             if debug_result:
                 debug_score = debug_result.score
 
         if handson_id:
-            handson_result = db.query(HandsOnResult).filter(
-                HandsOnResult.user_id == user.user_id,
+            handson_result = await db.scalar(select(HandsOnResult).where(
+                HandsOnResult.user_id == principal.user_id,
                 HandsOnResult.handson_id == handson_id
-            ).order_by(HandsOnResult.result_id.desc()).first()
+            ).order_by(HandsOnResult.result_id.desc()).limit(1))
             if handson_result:
                 handson_score = handson_result.score
 
@@ -108,39 +109,39 @@ async def complete_skill_upgrade(
         total_score = quiz_score * 5 + debug_score + handson_score
         final_score = total_score / 3
 
-        skill_upgrade = db.query(SkillUpgrade).filter(
-            SkillUpgrade.employee_id == user.user_id,
+        skill_upgrade = await db.scalar(select(SkillUpgrade).where(
+            SkillUpgrade.employee_id == principal.user_id,
             SkillUpgrade.assigned_test_id == test_id
-        ).first()
+        ))
         tech_stack_id = skill_upgrade.tech_stack_id if skill_upgrade else None
         target_level = skill_upgrade.target_level if skill_upgrade else None
         if not tech_stack_id:
-            logger.error("Tech stack ID not found in SkillUpgrade for employee_id: %s, test_id: %s", user.user_id, test_id)
+            logger.error("Tech stack ID not found in SkillUpgrade for employee_id: %s, test_id: %s", principal.user_id, test_id)
             raise HTTPException(status_code=400, detail="Tech stack ID not found for test")
         if not target_level:
-            logger.error("Target level not found in SkillUpgrade for employee_id: %s, test_id: %s", user.user_id, test_id)
+            logger.error("Target level not found in SkillUpgrade for employee_id: %s, test_id: %s", principal.user_id, test_id)
             raise HTTPException(status_code=400, detail="Target level not found for skill upgrade")
 
         if final_score >= 80:
-            emp_skill = db.query(EmployeeSkill).filter(
-                EmployeeSkill.employee_id == user.user_id,
+            emp_skill = await db.scalar(select(EmployeeSkill).where(
+                EmployeeSkill.employee_id == principal.user_id,
                 EmployeeSkill.tech_stack_id == tech_stack_id
-            ).first()
+            ))
             if emp_skill:
                 emp_skill.current_level = target_level
             else:
                 emp_skill = EmployeeSkill(
-                    employee_id=user.user_id,
+                    employee_id=principal.user_id,
                     tech_stack_id=tech_stack_id,
                     current_level=target_level
                 )
                 db.add(emp_skill)
-            db.commit()
+            await db.commit()
             return {
                 "success": True,
                 "message": "Skill upgrade completed and added to profile.",
                 "final_score": final_score,
-                "employee_id": user.user_id,
+                "employee_id": principal.user_id,
                 "tech_stack_id": tech_stack_id,
                 "current_level": target_level.value if hasattr(target_level, "value") else str(target_level)
             }
@@ -157,20 +158,15 @@ async def complete_skill_upgrade(
 
 @router.get('/get-skills')
 async def get_curr_user_skills(
-        db: Session = Depends(get_db),
-        curr_user=Depends(RBACService.get_current_user)
+        db: AsyncSession = Depends(get_async_db),
+        principal: Principal = Depends(get_principal)
 ):
     try:
-        user = db.query(Employee).filter(Employee.email == curr_user.get('sub')).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Employee not found")
-        user_skills = db.query(EmployeeSkill).filter(
-            EmployeeSkill.employee_id == user.user_id
-        )
-        ts_ids = [s.tech_stack_id for s in user_skills]
-        tech_stacks = db.query(TechStack).filter(
-            TechStack.id.in_(ts_ids)
-        ).all()
+        tech_stacks = (await db.scalars(
+            select(TechStack).where(TechStack.id.in_(
+                select(EmployeeSkill.tech_stack_id).where(EmployeeSkill.employee_id == principal.user_id)
+            ))
+        )).all()
         result = [
             {
                 "tech_stack_id": ts.id,
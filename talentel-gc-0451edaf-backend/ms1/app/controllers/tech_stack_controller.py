@@ -1,48 +1,60 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from ..config.database import get_db
-from ..services.tech_stack_service import get_all_techstacks, get_techstack_by_name, get_topics_of_techstack, save_selected_topics, update_selected_topics
-from typing import Dict, Any
-from ..models.models import Employee
+from ..models.models import DifficultyLevel
+from ..services.catalog_cache import get_catalog_cache
+from ..services.tech_stack_service import save_selected_topics, update_selected_topics
+from typing import Dict, Any, Optional
 from ..schemas.schemas import TechStackRequest
-from ..services.rbac_service import RBACService
+from ..services.rbac_service import Principal, get_principal
 from ..utils.email import send_tech_stack_request_email
+from ..utils.http_cache import not_modified
 
 
 router = APIRouter()
 
 @router.get('/tech-stacks')
-def get_tech_stacks(db:Session = Depends(get_db)):
-    tech_stacks = get_all_techstacks(db=db)
-    return tech_stacks
+def get_tech_stacks(request: Request, response: Response, db: Session = Depends(get_db)):
+    catalog = get_catalog_cache().get(db)
+    cached = not_modified(request, response, catalog.etag_for("tech-stacks"))
+    if cached:
+        return cached
+    return catalog.tech_stacks
 
 
 @router.get('/tech-stacks/{tech_stack_name}')
 def get_tech_stack_by_name(
-        tech_stack_name: str, db: Session = Depends(get_db)
+        tech_stack_name: str, request: Request, response: Response, db: Session = Depends(get_db)
 ):
-    tech_stack = get_techstack_by_name(name=tech_stack_name, db=db)
-    return tech_stack
+    catalog = get_catalog_cache().get(db)
+    cached = not_modified(request, response, catalog.etag_for("tech-stack", tech_stack_name))
+    if cached:
+        return cached
+    return catalog.stack_by_name(tech_stack_name)
 
 @router.get('/topics/{tech_stack_name}')
 def get_topics_by_techstack_name(
         tech_stack_name: str,
-        difficulty: str = None,
+        request: Request,
+        response: Response,
+        difficulty: Optional[DifficultyLevel] = None,
         db: Session = Depends(get_db),
 ):
-    print(f'Fetching topics for: {tech_stack_name}')
-    topics = get_topics_of_techstack(
-        techstack_name=tech_stack_name,
-        difficulty_level=difficulty,
-        db=db
-    )
-    return topics
+    catalog = get_catalog_cache().get(db)
+    tech_stack = catalog.stack_by_name(tech_stack_name)
+    if not tech_stack:
+        raise HTTPException(status_code=404, detail="Tech stack not found")
+    difficulty_value = difficulty.value if difficulty else None
+    cached = not_modified(request, response, catalog.etag_for("topics", tech_stack_name, difficulty_value))
+    if cached:
+        return cached
+    return catalog.topics_of_stack(tech_stack["id"], difficulty_value)
 
 @router.post('/topics/save-selected')
 def save_selected_topics_endpoint(
     topics_data: Dict[str, Any],
     db: Session = Depends(get_db),
-    curr_user = Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     """
     Save selected topics to the database.
@@ -58,13 +70,8 @@ def save_selected_topics_endpoint(
     }
     """
     try:
-        print(topics_data, curr_user)
-        curr_user_id = db.query(Employee.user_id).filter(
-            Employee.email==curr_user.get('sub')
-        ).scalar()
-        if not curr_user_id:
-            raise HTTPException(404, detail="User not found")
-        result = save_selected_topics(db=db, topics_data=topics_data, user_id=curr_user_id)
+        print(topics_data, principal.email)
+        result = save_selected_topics(db=db, topics_data=topics_data, user_id=principal.user_id)
         return result
     except HTTPException as e:
         raise e
@@ -75,7 +82,7 @@ def save_selected_topics_endpoint(
 def update_selected_topics_endpoint(
     topics_data: Dict[str, Any],
     db: Session = Depends(get_db),
-    curr_user = Depends(RBACService.get_current_user)
+    principal: Principal = Depends(get_principal)
 ):
     """
     Update topics for a tech stack: remove all existing topics for the tech stack, then add the new list of topics.
@@ -91,12 +98,7 @@ def update_selected_topics_endpoint(
     }
     """
     try:
-        curr_user_id = db.query(Employee.user_id).filter(
-            Employee.email==curr_user.get('sub')
-        ).scalar()
-        if not curr_user_id:
-            raise HTTPException(404, detail="User not found")
-        result = update_selected_topics(db=db, topics_data=topics_data, user_id=curr_user_id)
+        result = update_selected_topics(db=db, topics_data=topics_data, user_id=principal.user_id)
         return result
     except HTTPException as e:
         raise e
@@ -109,19 +111,14 @@ def update_selected_topics_endpoint(
 def create_tech_stack_request(
         tech_stack_payload: TechStackRequest,
         db: Session = Depends(get_db),
-        curr_user = Depends(RBACService.get_current_user),
+        principal: Principal = Depends(get_principal),
 ):
 
-    user = db.query(Employee).filter_by(email=curr_user.get('sub')).first()
-    if not user:
-        raise HTTPException(status_code=401, detail='Not Allowed')
-
-    existing_tech_stack = get_techstack_by_name(db=db, name=tech_stack_payload.name)
-    if existing_tech_stack:
+    if get_catalog_cache().get(db).stack_by_name(tech_stack_payload.name):
         raise HTTPException(status_code=400, detail='TechStack already exists')
 
     send = send_tech_stack_request_email(
-        db=db, tech_stack=tech_stack_payload, user=curr_user,
+        db=db, tech_stack=tech_stack_payload, user=principal,
         description=tech_stack_payload.description,
     )
     if not send:
@@ -1,13 +1,23 @@
 import string
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from ..schemas.test_schema import AssignTestRequest, TestFilter, TestOut
-from ..services.test_assign import list_tests as list_tests_service, assign_test as assign_test_service
+from ..services.test_assign import (
+    list_tests as list_tests_service,
+    assign_test as assign_test_service,
+    start_assign_test_job,
+    run_assign_test_job,
+    get_assign_test_job,
+    TEST_SORT_COLUMNS,
+)
 from ..config.database import get_db
-from ..models.models import Employee, Collaborator, RoleEnum
-from ..services.rbac_service import RBACService
+from ..models.models import RoleEnum
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import Principal, get_principal
+from ..utils.pagination import COUNT_MODES
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
@@ -17,29 +27,20 @@ bearer_scheme = HTTPBearer()
 
 def require_test_assign_permission(
     db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    principal: Principal = Depends(get_principal)
 ):
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    role = payload.get("role")
-
     # Default access for CapabilityLeader, ProductManager, DeliveryLeader, DeliveryManager
-    if role in [
-        RoleEnum.CapabilityLeader.value,
-        RoleEnum.ProductManager.value,
-        RoleEnum.DeliveryLeader.value,
-        RoleEnum.DeliveryManager.value
-    ]:
-        return payload
-
-    # For other users, check Collaborator table for permission
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Employee not found")
+    if principal.has_role(
+        RoleEnum.CapabilityLeader,
+        RoleEnum.ProductManager,
+        RoleEnum.DeliveryLeader,
+        RoleEnum.DeliveryManager
+    ):
+        return principal
 
-    collab = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).first()
-    if collab and getattr(collab, "test_assign", False):
-        return payload
+    # For other users, check their collaborator permissions
+    if get_permission_service().get(db, principal.user_id).allows("test_assign"):
+        return principal
 
     raise HTTPException(
         status_code=403,
@@ -51,32 +52,54 @@ def list_tests(
     page: int = 1,
     page_size: int = 10,
     search: str='',
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    sort_by: str = Query("id", enum=TEST_SORT_COLUMNS),
+    count: str = Query("exact", enum=COUNT_MODES, description="approx uses planner estimates on large tables"),
     db: Session = Depends(get_db),
     user_payload=Depends(require_test_assign_permission)
 ):
     filters = {
         "search":search,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "cursor": cursor,
+        "sort_by": sort_by,
+        "count": count
     }
-    total, tests = list_tests_service(db=db, filters=filters)
+    result = list_tests_service(db=db, filters=filters)
     return {
-        "total": total,
-        "tests": [TestOut.from_orm(test) for test in tests]
+        "total": result["total"],
+        "total_is_estimate": result["total_is_estimate"],
+        "next_cursor": result["next_cursor"],
+        "tests": [TestOut.from_orm(test) for test in result["items"]]
     }
 
 @router.post("/tests/assign-test", response_model=dict)
 def assign_test(
     request: AssignTestRequest,
+    background_tasks: BackgroundTasks,
+    wait: bool = False,
     db: Session = Depends(get_db),
-    user_payload=Depends(require_test_assign_permission)
+    principal: Principal = Depends(require_test_assign_permission)
 ):
+    """
+    Starts provisioning the test for all users in the background and returns a job id
+    to poll on /tests/assign-test/jobs/{job_id}. With wait=true the users are assigned
+    synchronously and the created assignments are returned, as before.
+    """
     try:
-        email = user_payload["sub"]
-        user = db.query(Employee).filter(Employee.email == email).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Employee not found")
-        assigned_by = user.user_id
+        assigned_by = principal.user_id
+
+        if not wait:
+            job_id = start_assign_test_job(request, assigned_by)
+            background_tasks.add_task(run_assign_test_job, job_id, request, assigned_by)
+            return {
+                "message": "Test assignment started",
+                "job_id": job_id,
+                "test_id": request.test_id,
+                "due_date": request.due_date,
+                "assigned": len(set(request.user_ids))
+            }
 
         assignments = assign_test_service(db=db, request=request, assigned_by=assigned_by)
         return {
@@ -99,3 +122,13 @@ def assign_test(
     except Exception as e:
         print("assign-test error:", str(e))
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/tests/assign-test/jobs/{job_id}", response_model=dict)
+def get_assign_test_job_status(
+    job_id: str,
+    user_payload=Depends(require_test_assign_permission)
+):
+    job = get_assign_test_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Assignment job not found")
+    return job
@@ -1,49 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from typing import Optional
 from ..schemas.test_schema import TestCreate, TestOut
-from ..services.test_service import create_test, update_test
-from ..services.rbac_service import require_roles,RBACService
-from ..models.models import RoleEnum,Employee, Collaborator, Test
+from ..services.test_service import ATTEMPT_SORT_COLUMNS, create_test, test_attempts_query, update_test
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import require_roles, Principal, get_principal
+from ..models.models import RoleEnum, Test
 from ..config.database import get_db
+from ..utils.pagination import decode_cursor, encode_cursor
 from sqlalchemy import text
 
 router = APIRouter(tags=["tests"])
 bearer_scheme = HTTPBearer()
 
 def require_test_permission(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session,
+    principal: Principal,
     permission_field: str = "test_create"
 ):
     """
     Checks if the user has permission to perform test actions.
     - CapabilityLeader and ProductManager have default access.
-    - Other users must have the relevant permission in the Collaborator table.
+    - Other users must hold the relevant collaborator permission on some tech stack.
     """
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    role = payload.get("role")
-    print(f"DEBUG require_test_permission: payload={payload}, role={role}")
-
     # Default access for CapabilityLeader, ProductManager, DeliveryLeader, DeliveryManager
-    if role in [
-        RoleEnum.CapabilityLeader.value,
-        RoleEnum.ProductManager.value,
-        RoleEnum.DeliveryLeader.value,
-        RoleEnum.DeliveryManager.value
-    ]:
-        return payload
-
-    # For other users, check Collaborator table for permission
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    collab = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).first()
-    if collab and getattr(collab, permission_field, False):
-        return payload
+    if principal.has_role(
+        RoleEnum.CapabilityLeader,
+        RoleEnum.ProductManager,
+        RoleEnum.DeliveryLeader,
+        RoleEnum.DeliveryManager
+    ):
+        return principal
+
+    # For other users, check their collaborator permissions
+    if get_permission_service().get(db, principal.user_id).allows(permission_field):
+        return principal
 
     raise HTTPException(
         status_code=403,
@@ -54,144 +46,86 @@ def require_test_permission(
 def create_test_endpoint(
     test_data: TestCreate,
     db: Session = Depends(get_db),
-    user_payload=Depends(
-        lambda db=Depends(get_db), credentials=Depends(bearer_scheme):
-            require_test_permission(db, credentials, "test_create")
+    principal=Depends(
+        lambda db=Depends(get_db), principal=Depends(get_principal):
+            require_test_permission(db, principal, "test_create")
     )
 ):
-    return create_test(db, user_payload, test_data)
+    return create_test(db, principal, test_data)
 
 @router.put("/tests/{test_id}/", response_model=TestOut)
 def update_test_endpoint(
     test_id: int,
     test_data: TestCreate,
     db: Session = Depends(get_db),
-    user_payload=Depends(
-        lambda db=Depends(get_db), credentials=Depends(bearer_scheme):
-            require_test_permission(db, credentials, "test_assign")
+    principal=Depends(
+        lambda db=Depends(get_db), principal=Depends(get_principal):
+            require_test_permission(db, principal, "test_assign")
     )
 ):
-    return update_test(db, test_id, user_payload, test_data)
+    return update_test(db, test_id, principal, test_data)
 
 @router.get("/tests/createdBySelf")
-def get_tests_created_by_self(db: Session = Depends(get_db), user_payload=Depends(RBACService.get_current_user)):
+def get_tests_created_by_self(db: Session = Depends(get_db), principal: Principal = Depends(get_principal)):
     """
     Returns tests created by the current user.
     """
-    # email = user_payload["sub"]
-    # print(email,"Dsaasf")
-    print(user_payload,"adsfd")
-    user = db.query(Employee).filter(Employee.email == user_payload.get('sub')).first()
-    user_id = user.user_id
     tests = db.execute(
         text("""
         SELECT id, test_name, description, duration, created_at
         FROM tests
         WHERE created_by = :user_id
         """),
-        {"user_id": user.user_id}
+        {"user_id": principal.user_id}
     ).fetchall()
     return {"tests": [dict(row._mapping) for row in tests]}
 
 @router.get("/tests/{test_id}/attempts")
-def get_test_attempts(test_id: int, db: Session = Depends(get_db)):
+def get_test_attempts(
+    test_id: int,
+    sort_by: str = Query("user_id", enum=list(ATTEMPT_SORT_COLUMNS)),
+    order: str = Query("asc", enum=["asc", "desc"]),
+    page_size: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Returns employees who have attempted the given test and their scores.
-    Supports both quiz and debug tests.
+    Returns employees who have attempted the given test and their latest quiz, debug and
+    hands-on scores, aggregated in one query. Pass page_size for keyset pagination (follow
+    next_cursor); sorting by a score puts missing scores below zero.
     """
-    # Try to find quiz attempts
-    test = db.execute(
-        text("""
-        SELECT id, quiz_id, debug_test_id,handson_id
-        FROM tests
-        WHERE id = :test_id
-        """),
-        {"test_id": test_id}
-    ).fetchall()
-    print(test)
-
-    quiz_results = db.execute(
-        text("""
-        SELECT qr.result_id,e.user_id, e.name, qr.score, qr.quiz_id as test_id
-        FROM employees e
-        JOIN quiz_results qr ON e.user_id = qr.user_id
-        WHERE qr.quiz_id = :test_id
-        """),
-        {"test_id": test[0][1]}
-    ).fetchall()
-
-    # Try to find debug attempts
-    debug_results = db.execute(
-        text("""
-        SELECT dr.result_id,e.user_id, e.name, dr.score, dr.debug_id as test_id
-        FROM employees e
-        JOIN debug_results dr ON e.user_id = dr.user_id
-        WHERE dr.debug_id = :test_id
-        """),
-        {"test_id": test[0][2]}
-    ).fetchall()
-
-    handson_results = db.execute(
-        text("""
-        SELECT dr.result_id,e.user_id, e.name, dr.score, dr.handson_id as test_id
-        FROM employees e
-        JOIN hands_on_results dr ON e.user_id = dr.user_id
-        WHERE dr.handson_id = :test_id
-        """),
-        {"test_id": test[0][3]}
-    ).fetchall()
-    user_attempts = {}
+    test = db.query(Test.quiz_id, Test.debug_test_id, Test.handson_id).filter(Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
 
-    # Process quiz results
-    for row in quiz_results:
-        user_attempts[row.user_id] = {
+    after = decode_cursor(cursor, 2)
+    query = test_attempts_query(test, sort_by, order, after)
+    if query is None:
+        return {"attempts": [], "total": 0, "next_cursor": None}
+    if page_size:
+        query = query.limit(page_size + 1)
+    page = db.execute(query).all()
+
+    next_cursor = None
+    if page_size and len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = encode_cursor([page[-1].sort_key, page[-1].user_id])
+    total = page[0].total if page else (0 if after is None else None)
+    attempts = [
+        {
             "user_id": row.user_id,
             "name": row.name,
-            "test_id":row.result_id,
-            "quiz_marks": row.score,
-            "quiz_id": row.test_id,
-            "debug_marks": None,
-            "debug_id": None
+            "test_id": row.quiz_result_id or row.debug_result_id or row.handson_result_id,
+            "quiz_marks": row.quiz_marks,
+            "quiz_id": test.quiz_id if row.quiz_result_id else None,
+            "debug_marks": row.debug_marks,
+            "debug_id": test.debug_test_id if row.debug_result_id else None,
+            "handson_marks": row.handson_marks,
+            "handson_id": test.handson_id if row.handson_result_id else None,
         }
-
-    # Process debug results
-    for row in debug_results:
-        if row.user_id in user_attempts:
-            user_attempts[row.user_id]["debug_marks"] = row.score
-            user_attempts[row.user_id]["debug_id"] = row.test_id
-        else:
-            user_attempts[row.user_id] = {
-                "user_id": row.user_id,
-                "name": row.name,
-                "test_id":row.result_id,
-                "quiz_marks": None,
-                "quiz_id": None,
-                "debug_marks": row.score,
-                "debug_id": row.test_id
-            }
-
-    # Process handson results
-    for row in handson_results:
-        if row.user_id in user_attempts:
-            user_attempts[row.user_id]["handson_marks"] = row.score
-            user_attempts[row.user_id]["handson_id"] = row.test_id
-        else:
-            user_attempts[row.user_id] = {
-                "user_id": row.user_id,
-                "name": row.name,
-                "test_id": row.result_id,
-                "quiz_marks": None,
-                "quiz_id": None,
-                "debug_marks": None,
-                "debug_id": None,
-                "handson_marks": row.score,
-                "handson_id": row.test_id
-            }
-
-    # Convert to list
-    attempts = list(user_attempts.values())
-    print(attempts,"att")
-    return {"attempts": attempts}
+        for row in page
+    ]
+    return {"attempts": attempts, "total": total, "next_cursor": next_cursor}
 
 @router.get("/tests/{test_id}/debug-id")
 def get_debug_id_for_test(test_id: int, db: Session = Depends(get_db)):
@@ -2,7 +2,7 @@ import os
 from typing import List, Dict, Any
 
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.params import Body
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -13,10 +13,13 @@ from ..services.tech_stack_service import save_selected_topics
 from ..models.models import RoleEnum, Employee, Collaborator, Topic, TechStack, Suggestion
 from ..config.database import get_db
 from ..Agents.TopicsFromPD import ProjectTechStackTopicAgent
+from ..utils.http_cache import not_modified
 
 
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from ..services.rbac_service import RBACService
+from fastapi.security import HTTPBearer
+from ..services.catalog_cache import get_catalog_cache
+from ..services.permission_service import get_permission_service
+from ..services.rbac_service import Principal, get_principal
 from ..models.models import Collaborator
 
 router = APIRouter(tags=["topics"])
@@ -24,25 +27,15 @@ bearer_scheme = HTTPBearer()
 
 def require_topic_permission(
     db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    principal: Principal = Depends(get_principal)
 ):
-    # Decode JWT and get user info
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    role = payload.get("role")
-
     # Check if user is CapabilityLeader
-    if role == RoleEnum.CapabilityLeader.value:
-        return payload
+    if principal.has_role(RoleEnum.CapabilityLeader):
+        return principal
 
     # Check if user is a Collaborator with topics permission
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    collab = db.query(Collaborator).filter(Collaborator.collaborator_id == user.user_id).first()
-    if collab and collab.topics:
-        return payload
+    if get_permission_service().get(db, principal.user_id).allows("topics"):
+        return principal
 
     raise HTTPException(status_code=403, detail="No permission to create topics")
 
@@ -50,37 +43,34 @@ def require_topic_permission(
 def api_create_topic(
     topic_data: TopicCreate,
     db: Session = Depends(get_db),
-    user_payload=Depends(require_topic_permission)
+    principal=Depends(require_topic_permission)
 ):
     # CapabilityLeader or Collaborator with topics permission can create topics
-    return create_topic(db, user_payload, topic_data)
+    return create_topic(db, principal, topic_data)
 
 @router.get("/topics/by-leader-with-stack/{leader_id}", response_model=List[Dict[str, Any]])
 def get_topics_with_stack_by_leader(
     leader_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    # Get all tech stacks for the leader
-    tech_stacks = db.query(TechStack).filter(TechStack.created_by == leader_id).all()
-    tech_stack_ids = [ts.id for ts in tech_stacks]
-
-    if not tech_stack_ids:
-        return []
-
-    # Get all topics for those tech stacks
-    topics = db.query(Topic).filter(Topic.tech_stack_id.in_(tech_stack_ids)).all()
+    catalog = get_catalog_cache().get(db)
+    cached = not_modified(request, response, catalog.etag_for("by-leader-with-stack", leader_id))
+    if cached:
+        return cached
 
-    # Build response: topic info + tech stack info
+    # Topic info + tech stack info for every tech stack of the leader
     result = []
-    for topic in topics:
-        stack = next((ts for ts in tech_stacks if ts.id == topic.tech_stack_id), None)
+    for topic in catalog.topics_of_stacks(catalog.stack_ids_of_leader(leader_id)):
+        stack = catalog.stacks_by_id[topic["tech_stack_id"]]
         result.append({
-            "topic_id": topic.topic_id,
-            "topic_name": topic.name,
-            "difficulty": topic.difficulty,
-            "tech_stack_id": topic.tech_stack_id,
-            "tech_stack_name": stack.name if stack else None,
-            "tech_stack_created_by": stack.created_by if stack else None,
+            "topic_id": topic["topic_id"],
+            "topic_name": topic["name"],
+            "difficulty": topic["difficulty"],
+            "tech_stack_id": topic["tech_stack_id"],
+            "tech_stack_name": stack["name"],
+            "tech_stack_created_by": stack["created_by"],
         })
     return result
 
@@ -103,42 +93,34 @@ def get_topic_by_id_endpoint(
 @router.get("/topics/by-leader/{leader_id}", response_model=List[TopicOut])
 def get_topics_by_leader(
     leader_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    # 1. Get all tech_stack IDs created by this leader
-    tech_stacks = db.query(TechStack).filter(TechStack.created_by == leader_id).all()
-    tech_stack_ids = [ts.id for ts in tech_stacks]
-
-    if not tech_stack_ids:
-        return []  # No tech stacks, so no topics
-
-    # 2. Get all topics for those tech stacks
-    topics = db.query(Topic).filter(Topic.tech_stack_id.in_(tech_stack_ids)).all()
-    return topics
+    catalog = get_catalog_cache().get(db)
+    cached = not_modified(request, response, catalog.etag_for("by-leader", leader_id))
+    if cached:
+        return cached
+    return catalog.topics_of_stacks(catalog.stack_ids_of_leader(leader_id))
 
 @router.get("/topics/by-collaborator/{collaborator_id}", response_model=List[TopicOut])
 def get_topics_by_collaborator(
     collaborator_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     tech_stack_id: int = None
 ):
-    # Get all collaborator records for this collaborator_id
-    query = db.query(Collaborator).filter(Collaborator.collaborator_id == collaborator_id)
-    if tech_stack_id:
-        query = query.filter(Collaborator.tech_stack_id == tech_stack_id)
-    collabs = query.all()
-    if not collabs:
-        return []
-    # If tech_stack_id is provided, return topics for that stack only
-    if tech_stack_id:
-        topics = db.query(Topic).filter(Topic.tech_stack_id == tech_stack_id).all()
-        return topics
-    # Otherwise, return topics for all assigned tech stacks
-    topics = []
-    for collab in collabs:
-        if collab.tech_stack_id:
-            topics += db.query(Topic).filter(Topic.tech_stack_id == collab.tech_stack_id).all()
-    return topics
+    # Tech stacks of the collaborator's records, from the cached permission matrix
+    tech_stack_ids = [
+        stack_id for stack_id in get_permission_service().get(db, collaborator_id).by_tech_stack
+        if stack_id and (not tech_stack_id or stack_id == tech_stack_id)
+    ]
+    catalog = get_catalog_cache().get(db)
+    cached = not_modified(request, response, catalog.etag_for("by-collaborator", tech_stack_ids))
+    if cached:
+        return cached
+    return catalog.topics_of_stacks(tech_stack_ids)
 
 @router.get("/tech-stacks/by-collaborator/{collaborator_id}", response_model=List[Dict[str, Any]])
 def get_tech_stacks_by_collaborator(
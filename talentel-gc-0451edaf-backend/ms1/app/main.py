@@ -7,7 +7,7 @@ from .AgentEndpoints.EpicAgentWs import router as agent_chat_router
 from .AgentEndpoints.McqAgentWs import router as mcq_agent_router
 from .AgentEndpoints.TopicAgentWS import router as topic_agent_router
 from .AgentEndpoints.GithubRepoCreatorAgentWs import router as github_router
-from .config.database import SessionLocal, engine
+from .config.database import SessionLocal
 from .controllers.auth_controller import router as auth_router
 from .controllers.employee_controller import router as employee_router
 from .controllers.rbac_controller import router as rbac_router
@@ -17,14 +17,19 @@ from .controllers.test_controller import router as test_router
 from .controllers.topics_controller import router as topic_router
 from .controllers.evaluation_controller import router as evaluation_router
 from .controllers.collaborators_controller import router as collaborators_router
+from .controllers.internal_controller import router as internal_router
+from .controllers.search_controller import router as search_router
 from .models.models import *
 from apscheduler.schedulers.background import BackgroundScheduler
 import asyncio
 from .utils.evaluation_scheduler import evaluate_unevaluated_debug_assignments, evaluate_unevaluated_handson_assignments
+from .services.permission_service import get_permission_service
+from .services.repo_pool_service import REPO_POOL_ENABLED, get_repo_pool
+from .utils.workspace_manager import get_workspace_manager
 
 bearer_scheme = HTTPBearer()
 
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic (alembic upgrade head), not created at import
 app = FastAPI()
 
 scheduler = BackgroundScheduler()
@@ -34,6 +39,16 @@ def schedule_async_job(coro):
     asyncio.run(coro)
 
 
+@app.on_event("startup")
+def sweep_evaluation_workspaces():
+    get_workspace_manager().sweep_orphans()
+
+
+@app.on_event("startup")
+def start_permission_listener():
+    get_permission_service().start_listener()
+
+
 @app.on_event("startup")
 def start_scheduler():
     scheduler.add_job(
@@ -46,6 +61,12 @@ def start_scheduler():
         trigger="interval",
         seconds=3600, id="handson_evaluator",
     )
+    if REPO_POOL_ENABLED:
+        scheduler.add_job(
+            lambda: get_repo_pool().refill(),
+            trigger="interval",
+            seconds=60, id="repo_pool_refill",
+        )
     scheduler.start()
 
 
@@ -54,6 +75,11 @@ def stop_scheduler():
     scheduler.shutdown()
 
 
+@app.on_event("shutdown")
+def stop_permission_listener():
+    get_permission_service().stop_listener()
+
+
 # CORS configuration to allow frontend requests
 app.add_middleware(
     CORSMiddleware,
@@ -103,6 +129,7 @@ app.include_router(evaluation_router)
 app.include_router(debug_exercise_router)
 app.include_router(topic_agent_router)
 app.include_router(employee_router)
+app.include_router(search_router)
 app.include_router(test_assign_router)
 app.include_router(skill_upgrade_router)
 app.include_router(debug_gen_router)
@@ -115,4 +142,5 @@ app.include_router(github_router)
 
 from .controllers.database_admin_controller import router as database_admin_router
 
-app.include_router(database_admin_router)
\ No newline at end of file
+app.include_router(database_admin_router)
+app.include_router(internal_router)
\ No newline at end of file
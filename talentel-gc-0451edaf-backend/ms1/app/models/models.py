@@ -1,8 +1,9 @@
 from sqlalchemy import (
     Column, Integer, String, Date, DateTime, Text, ForeignKey, Enum, UniqueConstraint,
-    JSON, ARRAY, CheckConstraint, func, Boolean, UUID
+    JSON, ARRAY, CheckConstraint, func, Boolean, UUID, Index
 )
  
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from ..config.database import Base
 import enum
@@ -55,7 +56,7 @@ class Employee(Base):
     hashed_password = Column(String(128), nullable=False)
     role = Column(Enum(RoleEnum), nullable=False)
     band = Column(Enum(BandType), nullable=False)
-    tech_stack = Column(JSON)
+    tech_stack = Column(JSONB)  # {"python": "basic", ...}
     manager_id = Column(Integer, ForeignKey('employees.user_id'))
     manager = relationship('Employee', remote_side=[user_id], backref='reports')
  
@@ -63,6 +64,15 @@ class Employee(Base):
     collaborations = relationship('Collaborator', foreign_keys='Collaborator.cl_id', back_populates='owner')
     collaborated_with = relationship('Collaborator', foreign_keys='Collaborator.collaborator_id',
                                      back_populates='collaborator')
+    __table_args__ = (
+        # Serves the skill filters' key-existence (?&), containment (@>) and jsonpath (@?) tests
+        Index('ix_employees_tech_stack', 'tech_stack', postgresql_using='gin'),
+        # Keyset pagination of the employee listing by name
+        Index('ix_employees_name_user_id', 'name', 'user_id'),
+        # Typeahead search; created only where the pg_trgm extension is available
+        Index('ix_employees_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_employees_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+    )
 
 class TechStack(Base):
     __tablename__ = 'tech_stack'
@@ -82,6 +92,7 @@ class Topic(Base):
     tech_stack_id = Column(Integer, ForeignKey('tech_stack.id', ondelete='CASCADE'), nullable=False)
     __table_args__ = (
         UniqueConstraint('name', 'tech_stack_id', 'difficulty', name='uniq_topic_per_stack'),
+        Index('ix_topics_tech_stack_id', 'tech_stack_id'),
     )
  
 class Quiz(Base):
@@ -134,6 +145,9 @@ class Test(Base):
     handson_id = Column(Integer, ForeignKey('hands_on.id', ondelete='SET NULL'))
     __table_args__ = (
         CheckConstraint('quiz_id IS NOT NULL OR debug_test_id IS NOT NULL OR handson_id IS NOT NULL', name='test_has_component'),  # Added CheckConstraint
+        Index('ix_tests_created_by', 'created_by'),
+        Index('ix_tests_test_name_trgm', 'test_name', postgresql_using='gin',
+              postgresql_ops={'test_name': 'gin_trgm_ops'}),
     )
 
 class Collaborator(Base):
@@ -150,6 +164,9 @@ class Collaborator(Base):
     owner = relationship('Employee', foreign_keys=[cl_id], back_populates='collaborations')
     collaborator = relationship('Employee', foreign_keys=[collaborator_id], back_populates='collaborated_with')
     tech_stack = relationship('TechStack', back_populates='collaborators', foreign_keys=[tech_stack_id])
+    __table_args__ = (
+        Index('ix_collaborators_collaborator_id', 'collaborator_id'),
+    )
 
 
 class TestAssign(Base):
@@ -166,7 +183,8 @@ class TestAssign(Base):
     debug_github_url = Column(String(200), nullable=True)
     handson_github_url = Column(String(200), nullable=True)
     __table_args__ = (
-        UniqueConstraint('user_id', 'test_id', name='uniq_user_test_assign'),  # Added UniqueConstraint
+        UniqueConstraint('user_id', 'test_id', name='uniq_user_test_assign'),  # Added UniqueConstraint, also serves user_id lookups
+        Index('ix_test_assign_test_id', 'test_id'),
     )
     test = relationship('Test', backref='assignments')
 
@@ -183,6 +201,8 @@ class QuizResult(Base):
     is_submitted = Column(Boolean, default=False)
     __table_args__ = (
         CheckConstraint('score >= 0 AND score <= 100', name='valid_score'),  # Added CheckConstraint
+        Index('ix_quiz_results_user_quiz', 'user_id', 'quiz_id'),
+        Index('ix_quiz_results_quiz_user', 'quiz_id', 'user_id'),
     )
 
 class DebugResult(Base):
@@ -195,6 +215,7 @@ class DebugResult(Base):
     is_submitted = Column(Boolean, default=False) 
     __table_args__ = (
         CheckConstraint('score >= 0 AND score <= 100', name='valid_score'),  # Added CheckConstraint
+        Index('ix_debug_results_debug_user', 'debug_id', 'user_id'),
     )
 
 class HandsOnResult(Base):  # Added HandsOnResult table
@@ -207,6 +228,7 @@ class HandsOnResult(Base):  # Added HandsOnResult table
     is_submitted = Column(Boolean, default=False)
     __table_args__ = (
         CheckConstraint('score >= 0 AND score <= 100', name='valid_score'),  # Added CheckConstraint
+        Index('ix_hands_on_results_handson_user', 'handson_id', 'user_id'),
     )
 
 class EmployeeSkill(Base):
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..models.models import TechStack, Topic
+from ..utils.http_cache import strong_etag
+
+# Safety net for changes made by other workers, which only invalidate their own copy
+CATALOG_CACHE_TTL_SECONDS = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+
+CATALOG_MODELS = (TechStack, Topic)
+
+
+class CatalogSnapshot:
+    """
+    Every tech stack and topic as response-ready dicts, indexed by id, name, leader
+    (created_by) and per tech stack by difficulty. The etag is derived from the content,
+    so workers holding the same catalog hand out the same validators.
+    """
+
+    def __init__(self, version: int, stacks: List[Any], topics: List[Any], loaded_at: float):
+        self.version = version
+        self.loaded_at = loaded_at
+        self.tech_stacks = [
+            {"id": s.id, "name": s.name, "created_by": s.created_by, "created_at": s.created_at} for s in stacks
+        ]
+        self.topics = [
+            {
+                "topic_id": t.topic_id,
+                "name": t.name,
+                "difficulty": t.difficulty.value,
+                "tech_stack_id": t.tech_stack_id,
+            }
+            for t in topics
+        ]
+        self.stacks_by_id = {stack["id"]: stack for stack in self.tech_stacks}
+        self.stacks_by_name = {stack["name"]: stack for stack in self.tech_stacks}
+        self.stack_ids_by_leader: Dict[int, List[int]] = defaultdict(list)
+        for stack in self.tech_stacks:
+            self.stack_ids_by_leader[stack["created_by"]].append(stack["id"])
+        self.topics_by_id = {topic["topic_id"]: topic for topic in self.topics}
+        self.topics_by_stack: Dict[int, List[dict]] = defaultdict(list)
+        self.topics_by_stack_difficulty: Dict[tuple, List[dict]] = defaultdict(list)
+        for topic in self.topics:
+            self.topics_by_stack[topic["tech_stack_id"]].append(topic)
+            self.topics_by_stack_difficulty[(topic["tech_stack_id"], topic["difficulty"])].append(topic)
+        self.etag = strong_etag(self.tech_stacks, self.topics)
+
+    def etag_for(self, *parts: Any) -> str:
+        """Validator of a response built from this catalog for the request described by parts."""
+        return strong_etag(self.etag, *parts)
+
+    def stack_by_name(self, name: str) -> Optional[dict]:
+        return self.stacks_by_name.get(name)
+
+    def topics_of_stack(self, tech_stack_id: int, difficulty: Optional[str] = None) -> List[dict]:
+        if difficulty is None:
+            return self.topics_by_stack.get(tech_stack_id, [])
+        return self.topics_by_stack_difficulty.get((tech_stack_id, difficulty), [])
+
+    def topics_of_stacks(self, tech_stack_ids) -> List[dict]:
+        return [topic for stack_id in tech_stack_ids for topic in self.topics_by_stack.get(stack_id, [])]
+
+    def stack_ids_of_leader(self, leader_id: int) -> List[int]:
+        return self.stack_ids_by_leader.get(leader_id, [])
+
+
+class CatalogCache:
+    """
+    The tech stack and topic catalog, loaded in two queries and kept until a committed
+    change to either table bumps the version, or for at most ttl seconds. A load that
+    raced such a change is served but not kept.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._hits = 0
+        self._loads = 0
+        self._lock = threading.Lock()
+        # Lets one request reload the catalog while concurrent ones wait for it
+        self._load_lock = threading.Lock()
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot
+        return None
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        with self._lock:
+            snapshot = self._current()
+            if snapshot is not None:
+                self._hits += 1
+                return snapshot
+        with self._load_lock:
+            with self._lock:
+                snapshot = self._current()
+                if snapshot is not None:
+                    self._hits += 1
+                    return snapshot
+                self._loads += 1
+                version = self._version
+            stacks = db.query(TechStack.id, TechStack.name, TechStack.created_by, TechStack.created_at).order_by(TechStack.id).all()
+            topics = db.query(Topic.topic_id, Topic.name, Topic.difficulty, Topic.tech_stack_id).order_by(Topic.topic_id).all()
+            snapshot = CatalogSnapshot(version, stacks, topics, time.monotonic())
+            with self._lock:
+                if self._version == version:
+                    self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        """Bumps the catalog version, dropping the current snapshot."""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "version": self._version,
+                "tech_stacks": len(snapshot.tech_stacks) if snapshot else 0,
+                "topics": len(snapshot.topics) if snapshot else 0,
+                "hits": self._hits,
+                "loads": self._loads,
+            }
+
+
+_catalog_cache: Optional[CatalogCache] = None
+_catalog_cache_guard = threading.Lock()
+
+
+def get_catalog_cache() -> CatalogCache:
+    global _catalog_cache
+    with _catalog_cache_guard:
+        if _catalog_cache is None:
+            _catalog_cache = CatalogCache(CATALOG_CACHE_TTL_SECONDS)
+        return _catalog_cache
+
+
+def _mark_catalog_changed(session: Optional[Session]):
+    if session is not None:
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(TechStack, "after_insert")
+@event.listens_for(TechStack, "after_update")
+@event.listens_for(TechStack, "after_delete")
+@event.listens_for(Topic, "after_insert")
+@event.listens_for(Topic, "after_update")
+@event.listens_for(Topic, "after_delete")
+def _catalog_row_changed(mapper, connection, target):
+    _mark_catalog_changed(object_session(target))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _catalog_statement_executed(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements, which skip the mapper events
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ in CATALOG_MODELS for mapper in orm_execute_state.all_mappers):
+        _mark_catalog_changed(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_catalog(session):
+    if session.info.pop("catalog_changed", False):
+        get_catalog_cache().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_catalog(session):
+    session.info.pop("catalog_changed", None)
@@ -1,12 +1,14 @@
+from sqlalchemy import select
+
 from ..models.models import DebugExercise, DebugResult, HandsOn, HandsOnResult
-from ..config.database import get_db
+from ..config.database import AsyncSessionLocal
 
-async def save_debug_results(path_id, user_id, results):
+async def save_debug_results(path_id, user_id, results, session_factory=AsyncSessionLocal):
     db = None
     try:
-        db = next(get_db())  # Get the session from the generator
+        db = session_factory()
 
-        debug_exercise = db.query(DebugExercise).filter(DebugExercise.path_id == path_id).first()
+        debug_exercise = await db.scalar(select(DebugExercise).where(DebugExercise.path_id == path_id))
         if not debug_exercise:
             raise Exception(f"No debug exercise found for path_id {path_id}")
 
@@ -26,8 +28,8 @@ async def save_debug_results(path_id, user_id, results):
         )
 
         db.add(debug_result)
-        db.commit()
-        db.refresh(debug_result)
+        await db.commit()
+        await db.refresh(debug_result)
         print(f"Saved debug results: {debug_result.result_id}")
         return debug_result
 
@@ -37,16 +39,16 @@ async def save_debug_results(path_id, user_id, results):
 
     finally:
         if db:
-            db.close()
+            await db.close()
 
 
-async def save_handson_results(path_id, user_id, results):
+async def save_handson_results(path_id, user_id, results, session_factory=AsyncSessionLocal):
     db = None
     try:
-        db = next(get_db())  # Get the session from the generator
+        db = session_factory()
 
         # Correct model and filter
-        handson_exercise = db.query(HandsOn).filter(HandsOn.path_id == path_id).first()
+        handson_exercise = await db.scalar(select(HandsOn).where(HandsOn.path_id == path_id))
         if not handson_exercise:
             raise Exception(f"No hands-on exercise found for path_id {path_id}")
 
@@ -68,8 +70,8 @@ async def save_handson_results(path_id, user_id, results):
         )
 
         db.add(handson_result)
-        db.commit()
-        db.refresh(handson_result)
+        await db.commit()
+        await db.refresh(handson_result)
         print(f"Saved hands-on results: {handson_result.result_id}")
         return handson_result
 
@@ -79,4 +81,4 @@ async def save_handson_results(path_id, user_id, results):
 
     finally:
         if db:
-            db.close()
\ No newline at end of file
+            await db.close()
\ No newline at end of file
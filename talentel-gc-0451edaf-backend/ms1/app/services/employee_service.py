@@ -1,3 +1,5 @@
+import json
+
 from sqlalchemy import or_
 from sqlalchemy.orm import Session, joinedload
 
@@ -5,7 +7,31 @@ from ..schemas.employee_schema import EmployeeFilter, EmployeeOut
 from ..models.models import Employee, EmployeeSkill, TechStack
 
 from sqlalchemy import and_, cast
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH, array
+from ..utils.pagination import paginate
+
+EMPLOYEE_SORT_COLUMNS = ["user_id", "name", "email"]
+
+def skill_filters(skills=None, skill_name=None, skill_level=None):
+    """
+    Criteria on Employee.tech_stack ({"python": "basic", ...}, keys and levels lowercase)
+    as JSONB key-existence and containment predicates that the GIN index can serve.
+    """
+    criteria = []
+    if skills:
+        # skills is a comma-separated string
+        skill_list = [s.strip().lower() for s in skills.split(",") if s.strip()]
+        if skill_list:
+            criteria.append(Employee.tech_stack.has_all(array(skill_list)))
+    if skill_name and skill_level:
+        # tech_stack->>skill_name == skill_level
+        criteria.append(Employee.tech_stack.contains({skill_name.lower(): skill_level.lower()}))
+    elif skill_level:
+        # Any tech stack at this level. The enum returns uppercase values (e.g. "BASIC")
+        # while employee data stores them lowercase (e.g. "basic").
+        level_path = f"$.* ? (@ == {json.dumps(skill_level.lower())})"
+        criteria.append(Employee.tech_stack.op("@?")(cast(level_path, JSONPATH)))
+    return criteria
 
 def list_employees(
     db: Session,
@@ -17,8 +43,14 @@ def list_employees(
     search=None,
     page=1,
     page_size=10,
-    
+    cursor=None,
+    sort_by="user_id",
+    count="exact",
 ):
+    """
+    A page of employees matching the filters, ordered by (sort_by, user_id); see
+    utils.pagination.paginate for cursor, count and the returned dict.
+    """
     query = db.query(Employee)
     from ..models.models import BandType
     valid_bands = {b.value for b in BandType}
@@ -26,42 +58,33 @@ def list_employees(
         query = query.filter(Employee.band == band)
     if designation and designation != "string":
         query = query.filter(Employee.role == designation)
-    if skills:
-        # skills is a comma-separated string
-        skill_list = [s.strip() for s in skills.split(",") if s.strip()]
-        from sqlalchemy import Text
-        for skill in skill_list:
-            # Fallback: string search for key in JSON (works for JSON column)
-            query = query.filter(Employee.tech_stack.cast(Text).ilike(f'%"{skill}":%'))
-    if skill_name and skill_level:
-        # Filter where tech_stack->>skill_name == skill_level (Postgres JSON column)
-        query = query.filter(Employee.tech_stack.op('->>')(skill_name) == skill_level)
-    elif skill_level:
-        # Filter by skill level across all tech stacks in the JSON column
-        # Convert skill_level to lowercase to match the data format in tech_stack JSON
-        # Employee data stores skill levels as lowercase (e.g., "basic", "advanced")
-        # but the enum returns uppercase values (e.g., "BASIC", "ADVANCED")
-        from sqlalchemy import Text
-        skill_level_lower = skill_level.lower()
-        query = query.filter(Employee.tech_stack.cast(Text).ilike(f'%"{skill_level_lower}"%'))
+    query = query.filter(*skill_filters(skills, skill_name, skill_level))
     if search:
         search_pattern = f"%{search}%"
         query = query.filter(or_(Employee.name.ilike(search_pattern), Employee.email.ilike(search_pattern)))
-    total = query.count()
-    employees = query.offset((page-1)*page_size).limit(page_size).all()
-    return total, employees
+    order_by = [Employee.user_id] if sort_by == "user_id" else [getattr(Employee, sort_by), Employee.user_id]
+    return paginate(db, query, order_by, page=page, page_size=page_size, cursor=cursor, count=count)
 
 def get_employee_tech_stack(db: Session, employee_id: int) -> dict:
     """
     Get employee's tech stack data from EmployeeSkill table
     Returns a dictionary with tech stack names as keys and skill levels as values
     """
-    employee_skills = db.query(EmployeeSkill, TechStack).join(
+    return get_employee_tech_stacks(db, [employee_id]).get(employee_id, {})
+
+def get_employee_tech_stacks(db: Session, employee_ids) -> dict:
+    """
+    Tech stack data of several employees from the EmployeeSkill table in one query,
+    as {employee_id: {tech stack name: skill level}} (employees without skills are absent)
+    """
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return {}
+    rows = db.query(EmployeeSkill.employee_id, EmployeeSkill.current_level, TechStack.name).join(
         TechStack, EmployeeSkill.tech_stack_id == TechStack.id
-    ).filter(EmployeeSkill.employee_id == employee_id).all()
-    
-    tech_stack_dict = {}
-    for emp_skill, tech_stack in employee_skills:
-        tech_stack_dict[tech_stack.name.lower()] = emp_skill.current_level.value.lower()
-    
-    return tech_stack_dict
+    ).filter(EmployeeSkill.employee_id.in_(employee_ids)).all()
+
+    tech_stacks = {}
+    for employee_id, current_level, tech_stack_name in rows:
+        tech_stacks.setdefault(employee_id, {})[tech_stack_name.lower()] = current_level.value.lower()
+    return tech_stacks
@@ -1,36 +1,28 @@
-import shutil
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from ..Agents.DebugGen.DebugEvaluatorWorkflow import agentic_debug_evaluation_workflow
 from ..Agents.HandsONEvaluator import agentic_assignment_evaluation_workflow
 from .debug_gen_service import save_debug_results, save_handson_results
+from ..config.database import AsyncSessionLocal
+from ..utils.workspace_manager import get_workspace_manager
+import json
 import os
-import stat
-import time
 
-def on_rm_error(func, path, exc_info):
+def get_debug_manifest_paths(unique_id):
+    """
+    Returns the files referenced by the bug manifest of a debug exercise, which are the
+    only files debug evaluation reads from the user's repo. None if there is no manifest.
+    """
+    buggy_proj_dir = os.getenv("BUGGY_PROJ_DIR", "BugInjectedProject")
+    manifest = os.path.join(buggy_proj_dir, unique_id, 'project', 'bug_manifest.json')
     try:
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
+        with open(manifest) as f:
+            bug_manifest = json.load(f)
+        return sorted({bug['file'] for bug in bug_manifest.values() if bug.get('file')})
     except Exception as e:
-        print(f"[ERROR] Could not forcibly remove {path}: {e}")
+        print(f"[WARN] Could not read bug manifest {manifest}: {e}")
+        return None
 
-def safe_cleanup(target_dir):
-    if os.path.exists(target_dir):
-        print(f"[DEBUG] Attempting to clean up: {target_dir}")
-        try:
-            shutil.rmtree(target_dir, onerror=on_rm_error)
-            print(f"[INFO] Successfully cleaned up: {target_dir}")
-        except Exception as cleanup_err:
-            print(f"[WARN] Could not clean up target dir: {cleanup_err}")
-            print(f"[DEBUG] Directory contents after failed cleanup: {os.listdir(target_dir)}")
-            time.sleep(1)
-            # Optionally, try again
-            try:
-                shutil.rmtree(target_dir, onerror=on_rm_error)
-            except Exception as e:
-                print(f"[ERROR] Second cleanup attempt failed: {e}")
-
-async def evaluate_debug(user_path, unique_id, user_id):
+async def evaluate_debug(user_path, unique_id, user_id, session_factory=AsyncSessionLocal):
     try:
         gen_proj_dir = os.getenv("GEN_PROJ_DIR", "GeneratedProject")
         buggy_proj_dir = os.getenv("BUGGY_PROJ_DIR", "BugInjectedProject")
@@ -49,19 +41,18 @@ async def evaluate_debug(user_path, unique_id, user_id):
             model_client=model_client,
             user_dir=user_path
         )
-        await save_debug_results(path_id=unique_id, user_id=user_id, results=results)
+        await save_debug_results(path_id=unique_id, user_id=user_id, results=results, session_factory=session_factory)
 
     except Exception as e:
         print(e)
     finally:
         try:
-            safe_cleanup(user_path)
-            print(f"[INFO] Cleaned up directory: {user_path}")
+            get_workspace_manager().release(user_path)
         except Exception as cleanup_err:
             print(f"[ERROR] Failed to clean up (es) {user_path}: {cleanup_err}")
 
 
-async def evaluate_handson(user_path, unique_id, user_id):
+async def evaluate_handson(user_path, unique_id, user_id, session_factory=AsyncSessionLocal):
     try:
         handson_proj_dir = os.getenv("HANDSON_PROJ_DIR", "HandsonProject")
 
@@ -80,13 +71,12 @@ async def evaluate_handson(user_path, unique_id, user_id):
             codebase_dir=user_path
         )
 
-        await save_handson_results(path_id=unique_id, user_id=user_id, results=results)
+        await save_handson_results(path_id=unique_id, user_id=user_id, results=results, session_factory=session_factory)
 
     except Exception as e:
         print(e)
     finally:
         try:
-            safe_cleanup(user_path)
-            print(f"[INFO] Cleaned up directory: {user_path}")
+            get_workspace_manager().release(user_path)
         except Exception as cleanup_err:
             print(f"[ERROR] Failed to clean up (es) {user_path}: {cleanup_err}")
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..models.models import Employee
+
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "60"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "4096"))
+
+
+class Identity(NamedTuple):
+    user_id: int
+    email: str
+    name: str
+    role: str
+    manager_id: Optional[int]
+
+
+class IdentityCache:
+    """
+    Employee identities keyed by email, each kept for ttl seconds in an LRU of at most
+    max_entries. Updating or deleting an Employee through the ORM drops its entry; a
+    generation counter keeps a load that raced such a change from being cached. Bulk
+    UPDATEs bypass the ORM and are picked up when the entry expires.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, email: Optional[str]) -> Optional[Identity]:
+        """The identity of the employee with email, loading it on a miss; None if there is none."""
+        if not email:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(email)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            generation = self._generation
+        row = db.query(
+            Employee.user_id, Employee.email, Employee.name, Employee.role, Employee.manager_id
+        ).filter(Employee.email == email).first()
+        if not row:
+            return None
+        identity = Identity(row.user_id, row.email, row.name, getattr(row.role, "value", row.role), row.manager_id)
+        with self._lock:
+            if self._generation == generation:
+                self._entries[email] = (now + self.ttl, identity)
+                self._entries.move_to_end(email)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(email, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+_identity_cache: Optional[IdentityCache] = None
+_identity_cache_guard = threading.Lock()
+
+
+def get_identity_cache() -> IdentityCache:
+    global _identity_cache
+    with _identity_cache_guard:
+        if _identity_cache is None:
+            _identity_cache = IdentityCache(IDENTITY_CACHE_TTL_SECONDS, IDENTITY_CACHE_SIZE)
+        return _identity_cache
+
+
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def _invalidate_changed_employee(mapper, connection, target):
+    # The old address too when the email itself changed
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    cache = get_identity_cache()
+    for email in emails:
+        cache.invalidate(email)
+    # Invalidate again once committed, in case a reader cached the old row in between
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_employee_emails", set()).update(emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_employees(session):
+    emails = session.info.pop("changed_employee_emails", ())
+    if emails:
+        cache = get_identity_cache()
+        for email in emails:
+            cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_employees(session):
+    session.info.pop("changed_employee_emails", None)
@@ -0,0 +1,198 @@
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.pool import NullPool
+
+from ..config.database import DATABASE_URL
+from ..models.models import Collaborator
+
+PERMISSION_FIELDS = ("topics", "test_create", "test_assign")
+PERMISSION_CACHE_SIZE = int(os.getenv("PERMISSION_CACHE_SIZE", "10000"))
+# Safety net for changes no signal reported (e.g. while the listener was reconnecting)
+PERMISSION_CACHE_TTL_SECONDS = int(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "300"))
+PERMISSION_SIGNAL_ENABLED = os.getenv("PERMISSION_SIGNAL_ENABLED", "true").lower() == "true"
+# Channel the collaborators trigger (migration 0007) notifies with the affected user_id
+PERMISSION_CHANNEL = "collaborator_permissions"
+
+
+class Permissions:
+    """
+    A user's collaborator grants, per tech stack and aggregated over all of them (a grant
+    on any stack counts), and the capability leader of their earliest collaborator record.
+    """
+    __slots__ = ("user_id", "by_tech_stack", "aggregate", "is_collaborator", "capability_leader_id", "loaded_at")
+
+    def __init__(self, user_id: int, records: Iterable[Any], loaded_at: float):
+        self.user_id = user_id
+        self.by_tech_stack: Dict[int, Dict[str, bool]] = {}
+        self.aggregate = dict.fromkeys(PERMISSION_FIELDS, False)
+        self.capability_leader_id: Optional[int] = None
+        for record in records:
+            if self.capability_leader_id is None:
+                self.capability_leader_id = record.cl_id
+            grants = self.by_tech_stack.setdefault(record.tech_stack_id, dict.fromkeys(PERMISSION_FIELDS, False))
+            for field in PERMISSION_FIELDS:
+                if getattr(record, field):
+                    grants[field] = True
+                    self.aggregate[field] = True
+        self.is_collaborator = bool(self.by_tech_stack)
+        self.loaded_at = loaded_at
+
+    def allows(self, permission: str, tech_stack_id: Optional[int] = None) -> bool:
+        """Whether the user holds permission on tech_stack_id, or on any tech stack without one."""
+        grants = self.aggregate if tech_stack_id is None else self.by_tech_stack.get(tech_stack_id)
+        return bool(grants and grants[permission])
+
+
+class PermissionService:
+    """
+    Collaborator permissions by user_id in an LRU of at most max_entries, reloaded after
+    ttl seconds. ORM changes to collaborators invalidate the local entry on commit; other
+    workers learn about every change from the collaborators trigger through LISTEN.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Permissions]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._signals = 0
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def get(self, db: Session, user_id: int) -> Permissions:
+        now = time.monotonic()
+        with self._lock:
+            permissions = self._entries.get(user_id)
+            if permissions is not None and now - permissions.loaded_at < self.ttl:
+                self._entries.move_to_end(user_id)
+                self._hits += 1
+                return permissions
+            self._misses += 1
+            generation = self._generation
+        records = db.query(
+            Collaborator.cl_id, Collaborator.tech_stack_id,
+            Collaborator.topics, Collaborator.test_create, Collaborator.test_assign
+        ).filter(Collaborator.collaborator_id == user_id).order_by(Collaborator.id).all()
+        permissions = Permissions(user_id, records, now)
+        with self._lock:
+            if self._generation == generation:
+                self._entries[user_id] = permissions
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return permissions
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drops the permissions of user_id, or of everyone without one."""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def _on_signal(self, payload: str):
+        self._signals += 1
+        try:
+            self.invalidate(int(payload))
+        except ValueError:
+            self.invalidate()
+
+    def start_listener(self):
+        """Follows the change signal in a daemon thread (PostgreSQL only)."""
+        if not PERMISSION_SIGNAL_ENABLED or not DATABASE_URL.startswith("postgresql"):
+            return
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="permission-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._stop.set()
+
+    def _listen(self):
+        # A dedicated unpooled connection, idle in LISTEN for the life of the worker
+        engine = create_engine(DATABASE_URL, poolclass=NullPool)
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                connection = engine.raw_connection()
+                try:
+                    dbapi_connection = connection.driver_connection
+                    dbapi_connection.autocommit = True
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {PERMISSION_CHANNEL}")
+                    # Changes made while not listening were missed
+                    self.invalidate()
+                    print(f"[INFO] Listening for collaborator permission changes on {PERMISSION_CHANNEL}")
+                    backoff = 1
+                    while not self._stop.is_set():
+                        if select.select([dbapi_connection], [], [], 5)[0]:
+                            dbapi_connection.poll()
+                            while dbapi_connection.notifies:
+                                self._on_signal(dbapi_connection.notifies.pop(0).payload)
+                finally:
+                    connection.close()
+            except Exception as e:
+                print(f"[WARN] Permission change listener lost its connection: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+        engine.dispose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "signals": self._signals,
+                "listening": self._listener is not None and self._listener.is_alive(),
+            }
+
+
+_permission_service: Optional[PermissionService] = None
+_permission_service_guard = threading.Lock()
+
+
+def get_permission_service() -> PermissionService:
+    global _permission_service
+    with _permission_service_guard:
+        if _permission_service is None:
+            _permission_service = PermissionService(PERMISSION_CACHE_SIZE, PERMISSION_CACHE_TTL_SECONDS)
+        return _permission_service
+
+
+@event.listens_for(Collaborator, "after_insert")
+@event.listens_for(Collaborator, "after_update")
+@event.listens_for(Collaborator, "after_delete")
+def _invalidate_changed_collaborator(mapper, connection, target):
+    # The previous collaborator too when a record was moved to someone else
+    user_ids = {target.collaborator_id, *inspect(target).attrs.collaborator_id.history.deleted}
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_collaborator_ids", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_collaborators(session):
+    user_ids = session.info.pop("changed_collaborator_ids", ())
+    if user_ids:
+        service = get_permission_service()
+        for user_id in user_ids:
+            service.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_collaborators(session):
+    session.info.pop("changed_collaborator_ids", None)
@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..models.models import Quiz
+
+# Every QuizCache, so a quiz change invalidates all views derived from it
+_quiz_caches: List["QuizCache"] = []
+
+
+class QuizCache:
+    """
+    In-process LRU of values derived from a quiz (build(quiz_id, duration, questions)),
+    keyed by quiz_id and bounded by entry count and by the values' size attribute.
+    Updating or deleting a Quiz through the ORM invalidates its entry in every cache;
+    a per-quiz generation keeps a load that raced an invalidation from being cached.
+    """
+
+    def __init__(self, build: Callable[[int, int, Any], Any], max_entries: int, max_bytes: int):
+        self.build = build
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, Any]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        _quiz_caches.append(self)
+
+    def get(self, db: Session, quiz_id: int) -> Optional[Any]:
+        """The cached value for quiz_id, building it on a miss; None if the quiz does not exist."""
+        with self._lock:
+            value = self._entries.get(quiz_id)
+            if value is not None:
+                self._entries.move_to_end(quiz_id)
+                self._hits += 1
+                return value
+            self._misses += 1
+            generation = self._generations.get(quiz_id, 0)
+        row = db.query(Quiz.duration, Quiz.questions).filter(Quiz.id == quiz_id).first()
+        if not row:
+            return None
+        value = self.build(quiz_id, row.duration, row.questions)
+        self._store(quiz_id, value, generation)
+        return value
+
+    def put(self, quiz: Quiz) -> Any:
+        """Precomputes the value of a freshly stored quiz."""
+        with self._lock:
+            generation = self._generations.get(quiz.id, 0)
+        value = self.build(quiz.id, quiz.duration, quiz.questions)
+        self._store(quiz.id, value, generation)
+        return value
+
+    def _store(self, quiz_id: int, value: Any, generation: int):
+        with self._lock:
+            if self._generations.get(quiz_id, 0) != generation or value.size > self.max_bytes:
+                return
+            old = self._entries.pop(quiz_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[quiz_id] = value
+            self._bytes += value.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def invalidate(self, quiz_id: int):
+        with self._lock:
+            self._generations[quiz_id] = self._generations.get(quiz_id, 0) + 1
+            old = self._entries.pop(quiz_id, None)
+            if old is not None:
+                self._bytes -= old.size
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+def invalidate_quiz(quiz_id: int):
+    for cache in _quiz_caches:
+        cache.invalidate(quiz_id)
+
+
+@event.listens_for(Quiz, "after_update")
+@event.listens_for(Quiz, "after_delete")
+def _invalidate_changed_quiz(mapper, connection, target):
+    invalidate_quiz(target.id)
+    # Invalidate again once committed, in case a reader cached the old row in between
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_quiz_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_quizzes(session):
+    for quiz_id in session.info.pop("changed_quiz_ids", ()):
+        invalidate_quiz(quiz_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_quizzes(session):
+    session.info.pop("changed_quiz_ids", None)
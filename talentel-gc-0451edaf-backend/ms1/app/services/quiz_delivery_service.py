@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils.http_cache import strong_etag
+from .quiz_cache import QuizCache
+
+QUIZ_DELIVERY_CACHE_SIZE = int(os.getenv("QUIZ_DELIVERY_CACHE_SIZE", "256"))
+QUIZ_DELIVERY_CACHE_MAX_BYTES = int(os.getenv("QUIZ_DELIVERY_CACHE_MAX_MB", "32")) * 1024 * 1024
+
+# Fields of a stored question that give the answer away
+ANSWER_KEY_FIELDS = ("correctAnswer", "correct_answer", "answer", "explanation")
+
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+def natural_key(qid: str):
+    """Orders q2 before q10."""
+    return [int(part) if part.isdigit() else part for part in _DIGITS_RE.split(str(qid))]
+
+
+def _normalize_options(options: Any) -> Dict[str, str]:
+    if isinstance(options, dict):
+        ordered = sorted(options.items(), key=lambda item: natural_key(item[0]))
+        return {str(key): str(value).strip() for key, value in ordered}
+    if isinstance(options, (list, tuple)):
+        # Keys match what the client derives from a list (its indexes)
+        return {str(i): str(value).strip() for i, value in enumerate(options)}
+    return {}
+
+
+def stored_questions(questions: Any) -> Dict[str, Any]:
+    """The question dict of Quiz.questions, which is stored wrapped in a one-element list."""
+    stored = questions[0] if isinstance(questions, list) and questions else questions
+    return stored if isinstance(stored, dict) else {}
+
+
+def build_delivery_view(questions: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    What an employee taking the quiz gets to see: questions in a stable order with
+    normalized options and without the answer key or explanations.
+    """
+    stored = stored_questions(questions)
+    view = {}
+    for qid in sorted(stored, key=natural_key):
+        qdata = stored[qid] if isinstance(stored[qid], dict) else {"question": str(stored[qid])}
+        options = _normalize_options(qdata.get("options"))
+        view[str(qid)] = {
+            **{key: value for key, value in qdata.items() if key not in ANSWER_KEY_FIELDS},
+            "options": options,
+            "type": "multiple_choice" if options else "text",
+        }
+    return view
+
+
+class QuizDeliveryView:
+    __slots__ = ("quiz_id", "duration", "questions", "etag", "size")
+
+    def __init__(self, quiz_id: int, duration: int, questions: Any):
+        self.quiz_id = quiz_id
+        self.duration = duration
+        self.questions = build_delivery_view(questions)
+        self.etag = strong_etag(quiz_id, duration, self.questions)
+        self.size = len(json.dumps(self.questions, separators=(",", ":")))
+
+
+_quiz_delivery_cache: Optional[QuizCache] = None
+_quiz_delivery_cache_guard = threading.Lock()
+
+
+def get_quiz_delivery_cache() -> QuizCache:
+    """
+    Delivery views keyed by quiz_id, bounded by QUIZ_DELIVERY_CACHE_SIZE entries and
+    QUIZ_DELIVERY_CACHE_MAX_MB of serialized questions.
+    """
+    global _quiz_delivery_cache
+    with _quiz_delivery_cache_guard:
+        if _quiz_delivery_cache is None:
+            _quiz_delivery_cache = QuizCache(QuizDeliveryView, QUIZ_DELIVERY_CACHE_SIZE, QUIZ_DELIVERY_CACHE_MAX_BYTES)
+        return _quiz_delivery_cache
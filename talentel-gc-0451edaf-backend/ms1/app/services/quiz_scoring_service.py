@@ -0,0 +1,130 @@
+import copy
+import os
+import threading
+from operator import eq
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..models.models import Quiz, QuizResult
+from .quiz_cache import QuizCache
+from .quiz_delivery_service import natural_key, stored_questions
+
+ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "1024"))
+ANSWER_KEY_CACHE_MAX_BYTES = int(os.getenv("ANSWER_KEY_CACHE_MAX_MB", "8")) * 1024 * 1024
+
+# Codes of the compact representation next to the option indexes (0..MAX_CHOICES-1).
+# They differ from each other, so a missing key never matches a missing answer.
+NO_KEY = 0xFD
+UNKNOWN_ANSWER = 0xFE
+UNANSWERED = 0xFF
+MAX_CHOICES = NO_KEY
+
+
+def _choice(value: Any):
+    """Hashable form of an answer; multi-answer keys are stored as lists."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+class AnswerKey:
+    """
+    A quiz's answer key as one byte per question (in natural question order) holding the
+    index of the correct choice. Submissions are encoded the same way and scored by a
+    single element-wise comparison of the two byte strings.
+    """
+    __slots__ = ("quiz_id", "duration", "question_index", "choice_index", "key", "size")
+
+    def __init__(self, quiz_id: int, duration: int, questions: Any):
+        stored = stored_questions(questions)
+        qids = sorted(stored, key=natural_key)
+        self.quiz_id = quiz_id
+        self.duration = duration
+        self.question_index = {str(qid): i for i, qid in enumerate(qids)}
+        self.choice_index: List[Dict[Any, int]] = []
+        key = bytearray()
+        for qid in qids:
+            qdata = stored[qid] if isinstance(stored[qid], dict) else {}
+            options = qdata.get("options")
+            # Dict options are answered by their key, legacy list options by their text
+            choices = list(options) if isinstance(options, (dict, list)) else []
+            correct = _choice(qdata.get("correctAnswer"))
+            if correct is not None and correct not in choices:
+                choices.append(correct)
+            index = {_choice(choice): i for i, choice in enumerate(choices[:MAX_CHOICES])}
+            self.choice_index.append(index)
+            key.append(index.get(correct, NO_KEY) if correct is not None else NO_KEY)
+        self.key = bytes(key)
+        # Rough footprint: the key plus ~64 bytes per indexed choice
+        self.size = len(self.key) + sum(len(index) for index in self.choice_index) * 64
+
+    @property
+    def total(self) -> int:
+        return len(self.key)
+
+    def encode(self, answers: Optional[Dict[str, Any]]) -> bytes:
+        encoded = bytearray([UNANSWERED]) * len(self.key)
+        for qid, answer in (answers or {}).items():
+            i = self.question_index.get(qid)
+            if i is not None:
+                encoded[i] = self.choice_index[i].get(_choice(answer), UNKNOWN_ANSWER)
+        return bytes(encoded)
+
+    def score(self, answers: Optional[Dict[str, Any]]) -> int:
+        return sum(map(eq, self.key, self.encode(answers)))
+
+    def score_many(self, submissions: Iterable[Optional[Dict[str, Any]]]) -> List[int]:
+        key = self.key
+        return [sum(map(eq, key, self.encode(answers))) for answers in submissions]
+
+
+_answer_key_cache: Optional[QuizCache] = None
+_answer_key_cache_guard = threading.Lock()
+
+
+def get_answer_key_cache() -> QuizCache:
+    """Answer keys keyed by quiz_id, bounded by ANSWER_KEY_CACHE_SIZE entries and ANSWER_KEY_CACHE_MAX_MB."""
+    global _answer_key_cache
+    with _answer_key_cache_guard:
+        if _answer_key_cache is None:
+            _answer_key_cache = QuizCache(AnswerKey, ANSWER_KEY_CACHE_SIZE, ANSWER_KEY_CACHE_MAX_BYTES)
+        return _answer_key_cache
+
+
+def rescore_quiz(db: Session, quiz_id: int, corrections: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Applies corrected answers (question id -> correct answer) to the quiz and re-scores
+    every stored result of it, writing the changed scores in one batched UPDATE.
+    """
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    questions = copy.deepcopy(quiz.questions)
+    stored = stored_questions(questions)
+    unknown = [qid for qid in corrections if qid not in stored]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown question ids: {', '.join(unknown)}")
+    for qid, answer in corrections.items():
+        options = stored[qid].get("options")
+        chosen = answer if isinstance(answer, list) else [answer]
+        if isinstance(options, dict) and any(choice not in options for choice in chosen):
+            raise HTTPException(status_code=400, detail=f"Answer for {qid} is not one of its options")
+        stored[qid]["correctAnswer"] = answer
+
+    # Assigning a new object marks the JSON column dirty; the update invalidates the quiz caches
+    quiz.questions = questions
+    answer_key = AnswerKey(quiz.id, quiz.duration, questions)
+    results = db.execute(
+        select(QuizResult.result_id, QuizResult.answers, QuizResult.score).where(QuizResult.quiz_id == quiz_id)
+    ).all()
+    scores = answer_key.score_many(row.answers for row in results)
+    changed = [
+        {"result_id": row.result_id, "score": score}
+        for row, score in zip(results, scores) if row.score != score
+    ]
+    if changed:
+        db.execute(update(QuizResult), changed)
+    db.commit()
+    print(f"[INFO] Re-scored quiz {quiz_id}: {len(changed)} of {len(results)} results changed")
+    return {"quiz_id": quiz_id, "total": answer_key.total, "results": len(results), "changed": len(changed)}
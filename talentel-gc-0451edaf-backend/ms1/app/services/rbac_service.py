@@ -6,7 +6,9 @@ from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
 from ..config.database import get_db
-from ..models.models import RoleEnum, Employee, Collaborator
+from ..models.models import RoleEnum, Employee
+from .identity_cache import Identity, get_identity_cache
+from .permission_service import get_permission_service
 
 bearer_scheme = HTTPBearer()
 
@@ -66,34 +68,53 @@ class RBACService:
                 detail=f"Token validation error: {str(e)}"
             )
 
-def get_capability_leader_if_not_self(
+class Principal:
+    """The authenticated employee of a request: the token's claims plus its cached identity."""
+    __slots__ = ("user_id", "email", "name", "role", "manager_id", "claims")
+
+    def __init__(self, identity: Identity, claims: dict):
+        self.user_id = identity.user_id
+        self.email = identity.email
+        self.name = identity.name
+        self.role = identity.role
+        self.manager_id = identity.manager_id
+        self.claims = claims
+
+    def has_role(self, *roles: RoleEnum) -> bool:
+        return self.role in [role.value for role in roles]
+
+
+def get_principal(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
-):
-    payload = RBACService.get_current_user(credentials)
-    email = payload.get("sub")
-    user_role = payload.get("role")
-
-    # Fetch the current user
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user:
+) -> Principal:
+    """
+    Decodes the bearer token and resolves its employee through the identity cache.
+    FastAPI resolves a dependency once per request, so permission checks and the
+    handler depending on it share a single decode and lookup.
+    """
+    claims = RBACService.get_current_user(credentials)
+    identity = get_identity_cache().get(db, claims.get("sub"))
+    if identity is None:
         raise HTTPException(status_code=404, detail="Employee not found")
+    return Principal(identity, claims)
+
 
+def get_capability_leader_if_not_self(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_principal)
+):
     # If current user is capability leader, return self
-    if user_role == RoleEnum.CapabilityLeader.value:
-        return user
+    if principal.has_role(RoleEnum.CapabilityLeader):
+        return db.get(Employee, principal.user_id)
 
     # Otherwise, find the capability leader via Collaborator relationship
-    collaborator_record = db.query(Collaborator).filter(
-        Collaborator.collaborator_id == user.user_id
-    ).first()
+    capability_leader_id = get_permission_service().get(db, principal.user_id).capability_leader_id
 
-    if not collaborator_record:
+    if capability_leader_id is None:
         raise HTTPException(status_code=404, detail="Capability leader relationship not found")
 
-    capability_leader = db.query(Employee).filter(
-        Employee.user_id == collaborator_record.cl_id
-    ).first()
+    capability_leader = db.get(Employee, capability_leader_id)
 
     if not capability_leader:
         raise HTTPException(status_code=404, detail="Capability leader not found")
@@ -103,4 +124,16 @@ def get_capability_leader_if_not_self(
 def require_roles(*roles):
     def dependency(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
         return RBACService.require_role(credentials, roles)
-    return dependency
\ No newline at end of file
+    return dependency
+
+
+def require_principal_roles(*roles):
+    """Like require_roles, but checks the employee's current role and returns the Principal."""
+    def dependency(principal: Principal = Depends(get_principal)):
+        if not principal.has_role(*roles):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this resource"
+            )
+        return principal
+    return dependency
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Optional
+
+REPO_POOL_ENABLED = os.getenv("REPO_POOL_ENABLED", "false").lower() == "true"
+REPO_POOL_PREFIX = "pool-"
+# Refill starts when the pool drops below the low watermark and stops at the high one
+REPO_POOL_LOW_WATERMARK = int(os.getenv("REPO_POOL_LOW_WATERMARK", "10"))
+REPO_POOL_HIGH_WATERMARK = int(os.getenv("REPO_POOL_HIGH_WATERMARK", "50"))
+# Upper bound on repos created per refill run, so refills never starve assignments of rate limit
+REPO_POOL_REFILL_BATCH = int(os.getenv("REPO_POOL_REFILL_BATCH", "20"))
+# A failed load of the existing pool repos is retried after this many seconds, doubling up to the max
+REPO_POOL_LOAD_RETRY_SECONDS = float(os.getenv("REPO_POOL_LOAD_RETRY_SECONDS", "30"))
+REPO_POOL_LOAD_RETRY_MAX_SECONDS = float(os.getenv("REPO_POOL_LOAD_RETRY_MAX_SECONDS", "900"))
+
+
+class RepoPool:
+    """
+    Keeps a pool of empty, auto-initialised private repos named pool-<uuid> in the org.
+    Assignment renames a pool repo instead of creating one, so its latency does not
+    depend on GitHub's create-repo latency. The pool is rebuilt from the org's pool
+    repos on first use, so repos survive restarts; a failed load is retried with backoff.
+    """
+
+    def __init__(self):
+        self._available = deque()
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._loaded = False
+        self._next_load_at = 0.0
+        self._load_retry = REPO_POOL_LOAD_RETRY_SECONDS
+        # Raised by request_capacity ahead of bulk assignments, reset after each refill
+        self._target = REPO_POOL_HIGH_WATERMARK
+
+    def _creator(self):
+        from ..Agents.GithubRepoCreatorAgent import GitHubRepoCreator
+        return GitHubRepoCreator(os.getenv("GITHUB_TOKEN"))
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded or time.monotonic() < self._next_load_at:
+                return
+            # Concurrent callers skip the load while this one runs
+            self._next_load_at = time.monotonic() + self._load_retry
+        result = self._creator().list_repository_names(prefix=REPO_POOL_PREFIX)
+        with self._lock:
+            if self._loaded:
+                return
+            if result["success"]:
+                # Refills may have added repos of their own while the pool was not loaded
+                known = set(self._available)
+                self._available.extend(name for name in result["data"] if name not in known)
+                self._loaded = True
+                print(f"[INFO] Repo pool loaded with {len(result['data'])} repos")
+            else:
+                print(f"[WARN] Could not load repo pool, retrying in {self._load_retry:.0f}s: {result['message']}")
+                self._next_load_at = time.monotonic() + self._load_retry
+                self._load_retry = min(self._load_retry * 2, REPO_POOL_LOAD_RETRY_MAX_SECONDS)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._available)
+
+    def request_capacity(self, count: int):
+        """Asks the next refill to top the pool up to at least count repos (e.g. the size of a bulk assignment)."""
+        with self._lock:
+            self._target = max(self._target, min(count, REPO_POOL_HIGH_WATERMARK * 4))
+        self.refill_in_background()
+
+    def refill(self):
+        """Creates pool repos until the target is reached, at most REPO_POOL_REFILL_BATCH per run."""
+        from ..Agents.GithubRepoCreatorAgent import create_repo_api
+
+        if not self._refill_lock.acquire(blocking=False):
+            return
+        try:
+            self._ensure_loaded()
+            with self._lock:
+                missing = self._target - len(self._available)
+            if missing <= 0:
+                return
+            created = 0
+            for _ in range(min(missing, REPO_POOL_REFILL_BATCH)):
+                pool_name = f"{REPO_POOL_PREFIX}{uuid.uuid4().hex[:12]}"
+                repo_result = create_repo_api(pool_name, description="Reserved for an upcoming assignment")
+                if not repo_result.get("success"):
+                    print(f"[ERROR] Repo pool refill failed: {repo_result.get('error')}")
+                    break
+                with self._lock:
+                    self._available.append(pool_name)
+                created += 1
+            print(f"[INFO] Repo pool refilled with {created} repos, {self.size()} available")
+            with self._lock:
+                if len(self._available) >= self._target:
+                    self._target = REPO_POOL_HIGH_WATERMARK
+        finally:
+            self._refill_lock.release()
+
+    def refill_in_background(self):
+        threading.Thread(target=self.refill, daemon=True).start()
+
+    def acquire(self, repo_name: str, description: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Renames a pool repo to repo_name. Returns the same result shape as create_repo_api,
+        or None if the pool is empty or the rename failed, in which case the caller creates
+        the repo itself.
+        """
+        self._ensure_loaded()
+        creator = self._creator()
+        while True:
+            with self._lock:
+                if not self._available:
+                    pool_name = None
+                else:
+                    pool_name = self._available.popleft()
+                low = len(self._available) < REPO_POOL_LOW_WATERMARK
+            if low:
+                self.refill_in_background()
+            if pool_name is None:
+                return None
+
+            rename_result = creator.rename_repository(pool_name, repo_name, description)
+            if rename_result["success"]:
+                repo_data = rename_result["data"]
+                return {
+                    "success": True,
+                    "repository_url": repo_data.get("html_url"),
+                    "clone_url": repo_data.get("clone_url"),
+                    "message": f"Repository taken from pool ({pool_name})"
+                }
+            # A 404 means the pool repo is gone; anything else (e.g. name taken) is not the pool's fault
+            if "404" not in str(rename_result.get("error")):
+                with self._lock:
+                    self._available.appendleft(pool_name)
+                return None
+
+
+_repo_pool: Optional[RepoPool] = None
+_repo_pool_guard = threading.Lock()
+
+
+def get_repo_pool() -> RepoPool:
+    global _repo_pool
+    with _repo_pool_guard:
+        if _repo_pool is None:
+            _repo_pool = RepoPool()
+        return _repo_pool
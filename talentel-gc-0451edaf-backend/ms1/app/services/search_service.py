@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, literal, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from ..config.database import BackgroundSessionLocal
+from ..models.models import Employee, Test
+from ..utils.trigram_index import TrigramIndex
+
+# auto: pg_trgm when the extension is installed, else the in-process index
+TYPEAHEAD_BACKEND = os.getenv("TYPEAHEAD_BACKEND", "auto")
+# Whole-request budget; each database query gets the time that is left as its statement_timeout
+TYPEAHEAD_BUDGET_MS = int(os.getenv("TYPEAHEAD_BUDGET_MS", "200"))
+TYPEAHEAD_INDEX_TTL_SECONDS = int(os.getenv("TYPEAHEAD_INDEX_TTL_SECONDS", "300"))
+
+SEARCH_TARGETS = {
+    "employees": {"id": Employee.user_id, "fields": [Employee.name, Employee.email]},
+    "tests": {"id": Test.id, "fields": [Test.test_name]},
+}
+
+_pg_trgm_available: Optional[bool] = None
+_pg_trgm_lock = threading.Lock()
+
+# kind -> (built_at, TrigramIndex)
+_memory_indexes: Dict[str, tuple] = {}
+_memory_refreshing: set = set()
+_memory_lock = threading.Lock()
+
+
+def _use_pg_trgm(db: Session) -> bool:
+    global _pg_trgm_available
+    if TYPEAHEAD_BACKEND != "auto":
+        return TYPEAHEAD_BACKEND == "pg_trgm"
+    with _pg_trgm_lock:
+        if _pg_trgm_available is None:
+            _pg_trgm_available = db.get_bind().dialect.name == "postgresql" and bool(
+                db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar()
+            )
+            if not _pg_trgm_available:
+                print("[WARN] pg_trgm is not installed; typeahead uses the in-process trigram index")
+        return _pg_trgm_available
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_sql(db: Session, kind: str, query: str, limit: int, timeout_ms: int) -> List[Dict[str, Any]]:
+    """Ranked matches from the pg_trgm GIN indexes: prefix matches, then word prefixes, then similarity."""
+    target = SEARCH_TARGETS[kind]
+    fields = target["fields"]
+    escaped = _like_escape(query)
+    starts = [field.ilike(f"{escaped}%", escape="\\") for field in fields]
+    word_starts = [field.ilike(f"% {escaped}%", escape="\\") for field in fields]
+    if len(query) < 3:
+        # Too short for whole trigrams; prefixes still map to padded trigrams in the index
+        condition = or_(*starts, *word_starts)
+    else:
+        condition = or_(
+            *[field.ilike(f"%{escaped}%", escape="\\") for field in fields],
+            *[literal(query).op("<%")(field) for field in fields],
+        )
+    tier = case((or_(*starts), 2), (or_(*word_starts), 1), else_=0)
+    similarity = func.greatest(*[func.word_similarity(query, field) for field in fields])
+    score = (tier + similarity).label("score")
+    statement = select(target["id"], *fields, score).where(condition).order_by(
+        score.desc(), func.lower(fields[0]), target["id"]
+    ).limit(limit)
+
+    db.execute(text(f"SET LOCAL statement_timeout = {max(1, int(timeout_ms))}"))
+    return [dict(row._mapping) for row in db.execute(statement)]
+
+
+def _build_memory_index(kind: str) -> TrigramIndex:
+    target = SEARCH_TARGETS[kind]
+    fields = target["fields"]
+    db = BackgroundSessionLocal()
+    try:
+        rows = db.execute(select(target["id"], *fields)).all()
+    finally:
+        db.close()
+    return TrigramIndex((row[0], {field.key: value for field, value in zip(fields, row[1:])}) for row in rows)
+
+
+def _refresh_memory_index(kind: str):
+    try:
+        index = _build_memory_index(kind)
+        with _memory_lock:
+            _memory_indexes[kind] = (time.monotonic(), index)
+        print(f"[INFO] Typeahead index for {kind} rebuilt with {len(index)} entries")
+    except Exception as e:
+        print(f"[ERROR] Could not rebuild the typeahead index for {kind}: {e}")
+    finally:
+        with _memory_lock:
+            _memory_refreshing.discard(kind)
+
+
+def _warm_memory_index(kind: str):
+    """Builds the in-process index of kind in a background thread unless it exists or is being built."""
+    with _memory_lock:
+        if kind in _memory_indexes or kind in _memory_refreshing:
+            return
+        _memory_refreshing.add(kind)
+    threading.Thread(target=_refresh_memory_index, args=(kind,), daemon=True).start()
+
+
+def _memory_index(kind: str, build: bool = True) -> Optional[TrigramIndex]:
+    """
+    The in-process index of kind. A stale one is served while a background thread rebuilds
+    it; only the very first use builds synchronously (or, when build is False, starts a
+    background build and returns None).
+    """
+    with _memory_lock:
+        entry = _memory_indexes.get(kind)
+        stale = entry is None or time.monotonic() - entry[0] > TYPEAHEAD_INDEX_TTL_SECONDS
+        start_refresh = entry is not None and stale and kind not in _memory_refreshing
+        if start_refresh:
+            _memory_refreshing.add(kind)
+    if start_refresh:
+        threading.Thread(target=_refresh_memory_index, args=(kind,), daemon=True).start()
+    if entry is not None:
+        return entry[1]
+    if not build:
+        _warm_memory_index(kind)
+        return None
+    index = _build_memory_index(kind)
+    with _memory_lock:
+        _memory_indexes.setdefault(kind, (time.monotonic(), index))
+    return index
+
+
+def _search_memory(index: TrigramIndex, kind: str, query: str, limit: int) -> List[Dict[str, Any]]:
+    id_key = SEARCH_TARGETS[kind]["id"].key
+    return [
+        {id_key: doc_id, **index.documents[doc_id], "score": round(score, 4)}
+        for score, doc_id in index.search(query, limit)
+    ]
+
+
+def typeahead_search(db: Session, query: str, kinds: List[str], limit: int = 10) -> Dict[str, Any]:
+    """
+    Ranked typeahead matches per kind within TYPEAHEAD_BUDGET_MS. With pg_trgm the
+    in-process index is only built (in the background) once a query of its kind runs out
+    of budget; until it is warm such a kind is left empty and reported in timed_out.
+    """
+    query = query.strip()
+    deadline = time.monotonic() + TYPEAHEAD_BUDGET_MS / 1000
+    use_sql = _use_pg_trgm(db)
+    result: Dict[str, Any] = {"query": query, "backend": "pg_trgm" if use_sql else "memory", "timed_out": []}
+    for kind in kinds:
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if use_sql and remaining_ms > 0:
+            try:
+                result[kind] = _search_sql(db, kind, query, limit, remaining_ms)
+                continue
+            except DBAPIError as e:
+                db.rollback()
+                # 57014: canceled by statement_timeout
+                if getattr(e.orig, "pgcode", None) != "57014":
+                    raise
+                print(f"[WARN] Typeahead query for {kind} exceeded the {TYPEAHEAD_BUDGET_MS}ms budget")
+        index = _memory_index(kind, build=not use_sql)
+        if index is None:
+            result[kind] = []
+            result["timed_out"].append(kind)
+            continue
+        result[kind] = _search_memory(index, kind, query, limit)
+    # Ends the read transaction and with it the SET LOCAL statement_timeout
+    db.rollback()
+    return result
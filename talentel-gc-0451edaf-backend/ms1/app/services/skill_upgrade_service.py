@@ -12,107 +12,140 @@ from ..AgentEndpoints.HandsONGenAuto import run_handson_gen_auto
 from ..Agents.MCQGenSystem import generate_mcq_questions
 import asyncio
 from sqlalchemy.orm import Session
+from ..config.database import BackgroundSessionLocal
+
+MAP_DIFFICULTY_LEVEL = {
+    "beginner": ['beginner'],
+    "intermediate": ['intermediate', 'beginner'],
+    "advanced": ['intermediate', 'advanced']
+}
+
+
+def _load_upgrade_topics(db: Session, tech_stack_name: str):
+    """(tech stack id, tech stack name, [(topic_id, name, difficulty value)]) of the tech stack."""
+    tech_stack = db.query(TechStack).filter(TechStack.name == tech_stack_name).first()
+    if tech_stack is None:
+        raise Exception(f"TechStack not found: {tech_stack_name}")
+    topics = db.query(Topic).filter(Topic.tech_stack_id == tech_stack.id).all()
+    return tech_stack.id, tech_stack.name, [(t.topic_id, t.name, t.difficulty.value) for t in topics]
+
+
+def _store_and_assign_upgrade_test(db: Session, tech_stack_id: int, tech_stack_name: str, topic_ids: list,
+                                   mcq_json, hands_on_id: Optional[int], user_id: int, level: str) -> Test:
+    """Stores the quiz, the test and the SkillUpgrade record and assigns the test (repos, email)."""
+    mcq = Quiz(
+        tech_stack_id=tech_stack_id,
+        topic_ids=topic_ids,
+        questions=mcq_json,
+        num_questions=20,
+        duration=15
+    )
+    db.add(mcq)
+
+    # Retrieve the latest debug exercise created for this tech_stack and topics
+    exercise = db.query(DebugExercise).filter(
+        DebugExercise.tech_stack_id == tech_stack_id
+    ).order_by(DebugExercise.id.desc()).first()
+    if not exercise:
+        raise Exception(f"No debug exercises created: {tech_stack_name}")
+
+    db.flush()  # Ensures mcq.id and exercise.id are populated
+
+    unique_suffix = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    test_name = f'Skill Upgrade Test {user_id}: {tech_stack_name}: level {level}: {unique_suffix}'
+
+    test = Test(
+        created_by=user_id,
+        test_name=test_name,
+        quiz_id=mcq.id,
+        debug_test_id=exercise.id,
+        handson_id=hands_on_id,
+        duration=35,
+        description=f'Skill Upgrade Test {user_id} of level {level} for {tech_stack_name}'
+    )
+    db.add(test)
+    db.flush()
+    db.refresh(test)
+
+    # Assign test and trigger repo creation, file upload, and email notification
+    assign_test(
+        db=db,
+        request=AssignTestRequest(
+            user_ids=[user_id],
+            test_id=test.id,
+            due_date=(datetime.now() + timedelta(days=2)).date()
+        ),
+        assigned_by=user_id
+    )
+
+    # Save SkillUpgrade record
+    from ..models.models import SkillUpgrade, DifficultyLevel, StatusType
+    skill_upgrade = SkillUpgrade(
+        employee_id=user_id,
+        tech_stack_id=tech_stack_id,
+        target_level=DifficultyLevel(level),
+        status=StatusType.assigned,
+        assigned_test_id=test.id,
+        start_time=datetime.now()
+    )
+    db.add(skill_upgrade)
+    db.commit()
+    db.refresh(skill_upgrade)
+    return test
+
 
 async def create_skill_upgrade_test(db: Session, tech_stack_name: str, user_id: int, level: str, background_tasks=None) -> Test:
+    """
+    Generates and assigns a skill upgrade test. Only the generation agents run on the
+    event loop; the database work and the provisioning in assign_test (GitHub, SMTP)
+    run in worker threads.
+    """
     try:
-        tech_stack = db.query(TechStack).filter(TechStack.name == tech_stack_name).first()
-        if tech_stack is None:
-            raise Exception(f"TechStack not found: {tech_stack_name}")
-
-        MAP_DIFFICULTY_LEVEL = {
-            "beginner": ['beginner'],
-            "intermediate": ['intermediate', 'beginner'],
-            "advanced": ['intermediate', 'advanced']
-        }
-        topics = db.query(Topic).filter(Topic.tech_stack_id == tech_stack.id).all()
-        topics_str = ','.join([t.name for t in topics if t.difficulty.value in MAP_DIFFICULTY_LEVEL[level]])
-        mcq_json = await generate_mcq_questions(tech_stack=tech_stack.name, topics=topics_str, level=level)
+        tech_stack_id, tech_stack_name, topics = await asyncio.to_thread(_load_upgrade_topics, db, tech_stack_name)
+        topics_str = ','.join([name for _, name, difficulty in topics if difficulty in MAP_DIFFICULTY_LEVEL[level]])
+        mcq_json = await generate_mcq_questions(tech_stack=tech_stack_name, topics=topics_str, level=level)
         if not mcq_json:
-            raise Exception(f"No MCQ questions created: {tech_stack.name}")
+            raise Exception(f"No MCQ questions created: {tech_stack_name}")
         # Use agent-based debug exercise generation from DebugGenAuto
         # Use agent-based hands-on generation from HandsONGenAuto
         handson_result = await run_handson_gen_auto(
             db=db,
-            tech_stack=tech_stack.name if hasattr(tech_stack, "name") else tech_stack,
-            topics=[t.name for t in topics if hasattr(t, "name")],
+            tech_stack=tech_stack_name,
+            topics=[name for _, name, _ in topics],
             duration=1
         )
         hands_on_id = handson_result.get("handson_id")
         await run_debug_gen_auto(
             db=db,
-            tech_stack=tech_stack.name,
+            tech_stack=tech_stack_name,
             topics=topics_str.split(),
             difficulty=level,
             duration=5
         )
-        topics_ids = [t.topic_id for t in topics]
-
-        mcq = Quiz(
-            tech_stack_id=tech_stack.id,
-            topic_ids=topics_ids,
-            questions=mcq_json,
-            num_questions=20,
-            duration=15
-        )
-        db.add(mcq)
-
-        # Retrieve the latest debug exercise created for this tech_stack and topics
-        exercise = db.query(DebugExercise).filter(
-            DebugExercise.tech_stack_id == tech_stack.id
-        ).order_by(DebugExercise.id.desc()).first()
-        if not exercise:
-            raise Exception(f"No debug exercises created: {tech_stack.name}")
-
-        db.flush()  # Ensures mcq.id and exercise.id are populated
-
-        unique_suffix = datetime.now().strftime("%Y%m%d%H%M%S%f")
-        test_name = f'Skill Upgrade Test {user_id}: {tech_stack.name}: level {level}: {unique_suffix}'
-
-        test = Test(
-            created_by=user_id,
-            test_name=test_name,
-            quiz_id=mcq.id,
-            debug_test_id=exercise.id,
-            handson_id=hands_on_id,
-            duration=35,
-            description=f'Skill Upgrade Test {user_id} of level {level} for {tech_stack.name}'
-        )
-        db.add(test)
-        db.flush()
-        db.refresh(test)
 
-        # Assign test and trigger repo creation, file upload, and email notification
-        assign_test(
-            db=db,
-            request=AssignTestRequest(
-                user_ids=[user_id],
-                test_id=test.id,
-                due_date=(datetime.now() + timedelta(days=2)).date()
-            ),
-            assigned_by=user_id
+        return await asyncio.to_thread(
+            _store_and_assign_upgrade_test, db, tech_stack_id, tech_stack_name,
+            [topic_id for topic_id, _, _ in topics], mcq_json, hands_on_id, user_id, level
         )
 
-        # Save SkillUpgrade record
-        from ..models.models import SkillUpgrade, DifficultyLevel, StatusType
-        skill_upgrade = SkillUpgrade(
-            employee_id=user_id,
-            tech_stack_id=tech_stack.id,
-            target_level=DifficultyLevel(level),
-            status=StatusType.assigned,
-            assigned_test_id=test.id,
-            start_time=datetime.now()
-        )
-        db.add(skill_upgrade)
-        db.commit()
-        db.refresh(skill_upgrade)
-
-        return test
-
     except Exception as e:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         print(e)
         raise Exception(f"Failed to create skill upgrade test: {e}")
 
+async def run_skill_upgrade_generation(tech_stack_name: str, user_id: int, level: str, background_tasks=None):
+    """Runs create_skill_upgrade_test as a background task with a session of its own."""
+    db = BackgroundSessionLocal()
+    try:
+        return await create_skill_upgrade_test(
+            db=db, tech_stack_name=tech_stack_name, user_id=user_id,
+            level=level, background_tasks=background_tasks
+        )
+    except Exception as e:
+        print(f"[ERROR] Skill upgrade generation failed for user {user_id}: {e}")
+    finally:
+        await asyncio.to_thread(db.close)
+
 def aggregate_and_update_employee_skills(db: Session):
     """
     For each completed SkillUpgrade, aggregate quiz, debug, and handson scores.
@@ -1,26 +1,49 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from ..models.models import TechStack, DifficultyLevel, Topic
 from fastapi import HTTPException
 
 
-def get_all_techstacks(db: Session):
-    return db.query(TechStack).all()
-
 def get_techstack_by_name(db: Session, name: str):
     return db.query(TechStack).filter(TechStack.name == name).first()
 
-def get_topics_of_techstack(db: Session, techstack_name: str, difficulty_level: Optional[DifficultyLevel]):
-    techstack = get_techstack_by_name(db=db, name=techstack_name)
-    if difficulty_level is not None:
-        return db.query(Topic).filter(Topic.difficulty == difficulty_level).all()
+def _get_or_create_techstack(db: Session, name: str, created_by, user_id) -> TechStack:
+    """The tech stack called name, added (and flushed for its id) if it does not exist yet."""
+    tech_stack = get_techstack_by_name(db=db, name=name)
+    if not tech_stack:
+        # Create new tech stack if it doesn't exist
+        tech_stack = TechStack(name=name, created_by=user_id)
+        db.add(tech_stack)
+        db.flush()
+    elif not tech_stack.created_by and created_by:
+        # If tech stack exists and created_by is missing, update it
+        tech_stack.created_by = created_by
+    return tech_stack
 
-    return db.query(Topic).filter(Topic.tech_stack_id == techstack.id).all()
+def _insert_topics(db: Session, tech_stack_id: int, selected_topics: List[Dict[str, Any]]) -> Set[Tuple[str, DifficultyLevel]]:
+    """
+    Inserts the selected topics in one INSERT ... ON CONFLICT DO NOTHING statement and
+    returns the (name, difficulty) pairs that were new; topics that already exist
+    (uniq_topic_per_stack) are left as they are.
+    """
+    rows = [
+        {"name": topic['name'], "difficulty": DifficultyLevel(topic['level']), "tech_stack_id": tech_stack_id}
+        for topic in selected_topics
+    ]
+    statement = (
+        pg_insert(Topic)
+        .values(rows)
+        .on_conflict_do_nothing(constraint='uniq_topic_per_stack')
+        .returning(Topic.name, Topic.difficulty)
+    )
+    return {(row.name, row.difficulty) for row in db.execute(statement)}
 
 def save_selected_topics(db: Session, topics_data: Dict[str, Any], user_id):
     """
     Save selected topics to the database.
-    This function creates new Topic entries for the selected topics.
+    This function creates new Topic entries for the selected topics, skipping the ones
+    the tech stack already has.
     """
     try:
         # Get or create tech stack
@@ -28,58 +51,25 @@ def save_selected_topics(db: Session, topics_data: Dict[str, Any], user_id):
         if not tech_stack_name:
             raise HTTPException(status_code=400, detail="Tech stack name is required")
         
-        tech_stack = get_techstack_by_name(db=db, name=tech_stack_name)
-        created_by = topics_data.get('created_by')
-        if not tech_stack:
-            # Create new tech stack if it doesn't exist
-            tech_stack = TechStack(name=tech_stack_name, created_by=user_id)
-            db.add(tech_stack)
-            db.commit()
-            db.refresh(tech_stack)
-        else:
-            # If tech stack exists and created_by is missing, update it
-            if not tech_stack.created_by and created_by:
-                tech_stack.created_by = created_by
-                db.commit()
+        tech_stack = _get_or_create_techstack(db, tech_stack_name, topics_data.get('created_by'), user_id)
         
         selected_topics = topics_data.get('selectedTopics', [])
         if not selected_topics:
             raise HTTPException(status_code=400, detail="No topics selected")
         
-        saved_topics = []
-        skipped_topics = []
-        
-        for topic_data in selected_topics:
-            # Check if topic already exists
-            existing_topic = db.query(Topic).filter(
-                Topic.name == topic_data['name'],
-                Topic.tech_stack_id == tech_stack.id,
-                Topic.difficulty == DifficultyLevel(topic_data['level'])
-            ).first()
-            
-            if not existing_topic:
-                # Create new topic
-                new_topic = Topic(
-                    name=topic_data['name'],
-                    difficulty=DifficultyLevel(topic_data['level']),
-                    tech_stack_id=tech_stack.id
-                )
-                db.add(new_topic)
-                saved_topics.append(new_topic)
-            else:
-                skipped_topics.append(topic_data['name'])
-        
+        inserted = _insert_topics(db, tech_stack.id, selected_topics)
+        skipped_topics = [
+            topic_data['name'] for topic_data in selected_topics
+            if (topic_data['name'], DifficultyLevel(topic_data['level'])) not in inserted
+        ]
+        tech_stack_id = tech_stack.id
         db.commit()
-        
-        # Refresh all saved topics to get their IDs
-        for topic in saved_topics:
-            db.refresh(topic)
    
         return {
             "success": True,
-            "message": f"Successfully saved {len(saved_topics)} new topics",
-            "tech_stack_id": tech_stack.id,
-            "saved_topics_count": len(saved_topics),
+            "message": f"Successfully saved {len(inserted)} new topics",
+            "tech_stack_id": tech_stack_id,
+            "saved_topics_count": len(inserted),
             "total_selected": len(selected_topics),
             "skipped_topics": skipped_topics
         }
@@ -92,55 +82,31 @@ def save_selected_topics(db: Session, topics_data: Dict[str, Any], user_id):
 def update_selected_topics(db: Session, topics_data: Dict[str, Any], user_id):
     """
     Update topics for a tech stack: remove all existing topics for the tech stack,
-    then add the new list of topics.
+    then add the new list of topics, in one transaction.
     """
     try:
         tech_stack_name = topics_data.get('topicName')
         if not tech_stack_name:
             raise HTTPException(status_code=400, detail="Tech stack name is required")
         
-        tech_stack = get_techstack_by_name(db=db, name=tech_stack_name)
-        created_by = topics_data.get('created_by')
-        if not tech_stack:
-            # Create new tech stack if it doesn't exist
-            tech_stack = TechStack(name=tech_stack_name, created_by=user_id)
-            db.add(tech_stack)
-            db.commit()
-            db.refresh(tech_stack)
-        else:
-            # If tech stack exists and created_by is missing, update it
-            if not tech_stack.created_by and created_by:
-                tech_stack.created_by = created_by
-                db.commit()
+        tech_stack = _get_or_create_techstack(db, tech_stack_name, topics_data.get('created_by'), user_id)
 
         # Delete all existing topics for this tech stack
-        db.query(Topic).filter(Topic.tech_stack_id == tech_stack.id).delete()
-        db.commit()
+        db.query(Topic).filter(Topic.tech_stack_id == tech_stack.id).delete(synchronize_session=False)
         
         selected_topics = topics_data.get('selectedTopics', [])
         if not selected_topics:
             raise HTTPException(status_code=400, detail="No topics selected")
         
-        saved_topics = []
-        for topic_data in selected_topics:
-            new_topic = Topic(
-                name=topic_data['name'],
-                difficulty=DifficultyLevel(topic_data['level']),
-                tech_stack_id=tech_stack.id
-            )
-            db.add(new_topic)
-            saved_topics.append(new_topic)
-        
+        inserted = _insert_topics(db, tech_stack.id, selected_topics)
+        tech_stack_id = tech_stack.id
         db.commit()
-        
-        for topic in saved_topics:
-            db.refresh(topic)
    
         return {
             "success": True,
             "message": f"Successfully updated topics for tech stack '{tech_stack_name}'",
-            "tech_stack_id": tech_stack.id,
-            "saved_topics_count": len(saved_topics),
+            "tech_stack_id": tech_stack_id,
+            "saved_topics_count": len(inserted),
             "total_selected": len(selected_topics)
         }
     except Exception as e:
@@ -1,53 +1,218 @@
-from sqlalchemy import or_
-from ..models.models import DebugExercise, Employee, HandsOn, Test, TestAssign, StatusType
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models.models import DebugExercise, Employee, HandsOn, MailStatus, Test, TestAssign, StatusType
 from ..schemas.test_schema import AssignTestRequest, TestFilter,TestOut
 from sqlalchemy.orm import Session
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from ..utils.pagination import paginate
+
+TEST_SORT_COLUMNS = ["id", "test_name"]
 
 def list_tests(db: Session, filters: TestFilter):
+    """
+    A page of tests ordered by (sort_by, id); filters may also carry cursor, sort_by and
+    count (see utils.pagination.paginate, which shapes the returned dict).
+    """
     query = db.query(Test)
     if filters.get("search"):
         search = f"%{filters.get('search')}%"
         query = query.filter(Test.test_name.ilike(search))
-    total = query.count()
-    tests = query.offset((filters.get("page")-1)*filters.get("page_size")).limit(filters.get("page_size")).all()
-    return total, tests
+    sort_by = filters.get("sort_by") or "id"
+    order_by = [Test.id] if sort_by == "id" else [getattr(Test, sort_by), Test.id]
+    return paginate(
+        db, query, order_by,
+        page=filters.get("page"), page_size=filters.get("page_size"),
+        cursor=filters.get("cursor"), count=filters.get("count") or "exact"
+    )
 
 from ..utils.email import send_assignment_email
 
-import requests
 import base64
+import hashlib
 import os
+import threading
 import time
-from typing import Dict, Any
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..config.database import BackgroundSessionLocal
+from ..utils.github_client import GITHUB_API_URL, get_github_client
+from .repo_pool_service import REPO_POOL_ENABLED, get_repo_pool
+
+SKIPPED_PROJECT_FILES = ['bug_hints.json', 'bug_manifest.json', 'manifest.json']
+GITHUB_UPLOAD_CONCURRENCY = int(os.getenv("GITHUB_UPLOAD_CONCURRENCY", "8"))
+
+# files_dir -> (stat signature, [(repo_path, mode, blob_sha, base64 content)])
+# Every user of an exercise uploads the same project, so it is read and hashed once.
+_project_blob_cache: Dict[str, Tuple[tuple, List[Tuple[str, str, str, str]]]] = {}
+_project_blob_cache_lock = threading.Lock()
+
+
+def _git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def load_project_blobs(files_dir: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Returns (repo_path, mode, blob_sha, base64 content) for every uploadable file in files_dir.
+    Cached per directory and re-read only when a file's size or mtime changes.
+    """
+    file_paths = []
+    for root, dirs, files in os.walk(files_dir):
+        for file in files:
+            if file.endswith('.orig') or file in SKIPPED_PROJECT_FILES:
+                continue
+            file_path = os.path.join(root, file)
+            if os.path.isfile(file_path):
+                file_paths.append(file_path)
+    file_paths.sort()
+    signature = tuple((path, os.path.getmtime(path), os.path.getsize(path)) for path in file_paths)
+
+    with _project_blob_cache_lock:
+        cached = _project_blob_cache.get(files_dir)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    blobs = []
+    for file_path in file_paths:
+        with open(file_path, "rb") as f:
+            data = f.read()
+        # Convert Windows paths to Unix paths for GitHub
+        repo_path = os.path.relpath(file_path, files_dir).replace(os.sep, '/')
+        mode = "100755" if os.access(file_path, os.X_OK) and os.name != "nt" else "100644"
+        blobs.append((repo_path, mode, _git_blob_sha(data), base64.b64encode(data).decode()))
+
+    with _project_blob_cache_lock:
+        _project_blob_cache[files_dir] = (signature, blobs)
+    return blobs
 
-def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str, 
+
+def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
                         commit_message: str = "Initial bugged code commit") -> Dict[str, Any]:
     """
-    Push all files from files_dir to the root of the repo using GitHub API.
+    Push all files from files_dir to the root of the repo as a single commit using the
+    Git Data API (blobs -> tree -> commit -> ref update). Blobs are created concurrently
+    and identical contents are uploaded once. Falls back to push_files_per_file when the
+    repository has no branch to commit onto yet.
     Returns a dictionary with success status and details.
     """
     if not os.path.exists(files_dir):
         return {"success": False, "error": f"Directory {files_dir} does not exist"}
+
+    if not github_token:
+        return {"success": False, "error": "GitHub token is empty"}
+
+    api = f"{GITHUB_API_URL}/repos/{repo_full_name}"
+    client = get_github_client(github_token)
+
+    try:
+        blobs = load_project_blobs(files_dir)
+    except Exception as e:
+        return {"success": False, "error": f"Failed to read files from {files_dir}: {str(e)}"}
+
+    repo_check = client.get(api)
+    if repo_check.status_code != 200:
+        return {"success": False, "error": f"Repository {repo_full_name} not accessible: {repo_check.status_code}"}
+    branch = repo_check.json().get("default_branch", "main")
+
+    ref_resp = client.get(f"{api}/git/ref/heads/{branch}")
+    if ref_resp.status_code in (404, 409):
+        # Git Data API is unavailable on an empty repository
+        print(f"[DEBUG] {repo_full_name} has no '{branch}' branch yet, falling back to per-file upload")
+        return push_files_per_file(repo_full_name, files_dir, github_token, commit_message)
+    if ref_resp.status_code != 200:
+        return {"success": False, "error": f"Failed to read ref heads/{branch}: {ref_resp.status_code} - {ref_resp.text}"}
+    parent_sha = ref_resp.json()["object"]["sha"]
+
+    def create_blob(item):
+        repo_path, _, blob_sha, content = item
+        resp = client.post(f"{api}/git/blobs", json={"content": content, "encoding": "base64"})
+        if resp.status_code != 201:
+            return blob_sha, f"Failed to create blob for {repo_path}: {resp.status_code} - {resp.text}"
+        if resp.json().get("sha") != blob_sha:
+            return blob_sha, f"Blob SHA mismatch for {repo_path}"
+        return blob_sha, None
+
+    unique_blobs = list({blob[2]: blob for blob in blobs}.values())
+    with ThreadPoolExecutor(max_workers=GITHUB_UPLOAD_CONCURRENCY) as executor:
+        blob_errors = {sha: err for sha, err in executor.map(create_blob, unique_blobs) if err}
+
+    failed_files = [
+        {"file": repo_path, "error": blob_errors[blob_sha]}
+        for repo_path, _, blob_sha, _ in blobs if blob_sha in blob_errors
+    ]
+    if failed_files:
+        return {
+            "success": False,
+            "uploaded_files": [],
+            "failed_files": failed_files,
+            "total_uploaded": 0,
+            "total_failed": len(failed_files)
+        }
+
+    parent_resp = client.get(f"{api}/git/commits/{parent_sha}")
+    if parent_resp.status_code != 200:
+        return {"success": False, "error": f"Failed to read commit {parent_sha}: {parent_resp.status_code} - {parent_resp.text}"}
+    base_tree = parent_resp.json()["tree"]["sha"]
+    tree_resp = client.post(f"{api}/git/trees", json={
+        "base_tree": base_tree,
+        "tree": [
+            {"path": repo_path, "mode": mode, "type": "blob", "sha": blob_sha}
+            for repo_path, mode, blob_sha, _ in blobs
+        ]
+    })
+    if tree_resp.status_code != 201:
+        return {"success": False, "error": f"Failed to create tree: {tree_resp.status_code} - {tree_resp.text}"}
+
+    commit_resp = client.post(f"{api}/git/commits", json={
+        "message": commit_message,
+        "tree": tree_resp.json()["sha"],
+        "parents": [parent_sha]
+    })
+    if commit_resp.status_code != 201:
+        return {"success": False, "error": f"Failed to create commit: {commit_resp.status_code} - {commit_resp.text}"}
+    commit_sha = commit_resp.json()["sha"]
+
+    update_resp = client.patch(f"{api}/git/refs/heads/{branch}", json={"sha": commit_sha})
+    if update_resp.status_code != 200:
+        return {"success": False, "error": f"Failed to update ref: {update_resp.status_code} - {update_resp.text}"}
+
+    uploaded_files = [repo_path for repo_path, _, _, _ in blobs]
+    print(f"[SUCCESS] Committed {len(uploaded_files)} files to {repo_full_name}@{branch} as {commit_sha[:8]}")
+    return {
+        "success": True,
+        "commit_sha": commit_sha,
+        "uploaded_files": uploaded_files,
+        "failed_files": [],
+        "total_uploaded": len(uploaded_files),
+        "total_failed": 0
+    }
+
+
+def push_files_per_file(repo_full_name: str, files_dir: str, github_token: str,
+                        commit_message: str = "Initial bugged code commit") -> Dict[str, Any]:
+    """
+    Push all files from files_dir to the root of the repo using the contents API,
+    one commit per file. Returns a dictionary with success status and details.
+    """
+    if not os.path.exists(files_dir):
+        return {"success": False, "error": f"Directory {files_dir} does not exist"}
     
     if not github_token:
         return {"success": False, "error": "GitHub token is empty"}
     
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json",
-        "User-Agent": "Python-Script"  # GitHub requires a User-Agent
-    }
+    client = get_github_client(github_token)
     
     # Test authentication first
-    auth_test = requests.get("https://api.github.com/user", headers=headers)
+    auth_test = client.get(f"{GITHUB_API_URL}/user")
     if auth_test.status_code != 200:
         return {"success": False, "error": f"Authentication failed: {auth_test.status_code} - {auth_test.text}"}
     
     print(f"[DEBUG] Authenticated as: {auth_test.json().get('login', 'Unknown')}")
     
     # Check if repo exists
-    repo_check = requests.get(f"https://api.github.com/repos/{repo_full_name}", headers=headers)
+    repo_check = client.get(f"{GITHUB_API_URL}/repos/{repo_full_name}")
     if repo_check.status_code != 200:
         return {"success": False, "error": f"Repository {repo_full_name} not accessible: {repo_check.status_code}"}
     
@@ -63,7 +228,7 @@ def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
         
         for file in files:
             # Skip unwanted files
-            if file.endswith('.orig') or file in ['bug_hints.json', 'bug_manifest.json', 'manifest.json']:
+            if file.endswith('.orig') or file in SKIPPED_PROJECT_FILES:
                 print(f"[DEBUG] Skipping file: {file}")
                 continue
             
@@ -92,13 +257,13 @@ def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
             print(f"[DEBUG] Repo path will be: {repo_path}")
             
             # GitHub API URL
-            url = f"https://api.github.com/repos/{repo_full_name}/contents/{repo_path}"
+            url = f"{GITHUB_API_URL}/repos/{repo_full_name}/contents/{repo_path}"
             print(f"[DEBUG] GitHub API URL: {url}")
             
             # Check if file exists to get its sha
             sha = None
             try:
-                get_resp = requests.get(url, headers=headers)
+                get_resp = client.get(url)
                 if get_resp.status_code == 200:
                     file_info = get_resp.json()
                     if isinstance(file_info, dict) and "sha" in file_info:
@@ -123,7 +288,7 @@ def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
             
             # Upload the file
             try:
-                response = requests.put(url, headers=headers, json=data)
+                response = client.put(url, json=data)
                 print(f"[DEBUG] Upload response status: {response.status_code}")
                 
                 if response.status_code in [201, 200]:
@@ -134,9 +299,6 @@ def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
                     print(f"[ERROR] {error_msg}")
                     failed_files.append({"file": repo_path, "error": error_msg})
                 
-                # Rate limiting protection
-                time.sleep(0.1)  # Small delay between requests
-                
             except Exception as e:
                 error_msg = f"Exception during upload of {repo_path}: {str(e)}"
                 print(f"[ERROR] {error_msg}")
@@ -151,128 +313,470 @@ def push_files_to_github(repo_full_name: str, files_dir: str, github_token: str,
     }
 
 
+# "upload" pushes the exercise files into every user's repo, "template" builds one
+# template repo per exercise and generates each user's repo from it.
+GITHUB_PROVISIONING_MODE = os.getenv("GITHUB_PROVISIONING_MODE", "upload")
+
+_template_repos = set()
+# One lock per template, so provisioning one exercise's template does not hold up the others
+_template_repo_locks: Dict[str, threading.Lock] = {}
+_template_repos_lock = threading.Lock()
+
+
+def _template_repo_lock(template_name: str) -> threading.Lock:
+    with _template_repos_lock:
+        if template_name not in _template_repo_locks:
+            _template_repo_locks[template_name] = threading.Lock()
+        return _template_repo_locks[template_name]
+
+
+def _template_repo_ready(template_name: str) -> bool:
+    with _template_repos_lock:
+        return template_name in _template_repos
+
+
+def _mark_template_repo_ready(template_name: str):
+    with _template_repos_lock:
+        _template_repos.add(template_name)
+
+
+def ensure_template_repo(kind: str, path_id: str, code_dir: str, github_token: str):
+    """
+    Returns the name of the template repo for an exercise, creating, populating and
+    flagging it as a template the first time the exercise is assigned. None on failure.
+    """
+    from ..Agents.GithubRepoCreatorAgent import create_repo_api, GitHubRepoCreator
+
+    template_name = f"template-{kind}-{path_id}"
+    if _template_repo_ready(template_name):
+        return template_name
+
+    with _template_repo_lock(template_name):
+        # Another assignment may have provisioned it while this one waited
+        if _template_repo_ready(template_name):
+            return template_name
+
+        github_creator = GitHubRepoCreator(github_token)
+        existing = github_creator.get_repository(template_name)
+        if existing["success"] and existing["data"].get("is_template"):
+            _mark_template_repo_ready(template_name)
+            return template_name
+
+        if not existing["success"]:
+            repo_result = create_repo_api(template_name, description=f"Template for {kind} exercise {path_id}")
+            if not repo_result.get("success"):
+                print(f"[ERROR] Template repo creation failed: {repo_result.get('error')}")
+                return None
+        push_result = push_files_to_github(f"Deloitte-US/{template_name}", code_dir, github_token)
+        if not push_result["success"]:
+            print(f"[ERROR] Failed to upload files to template {template_name}: {push_result.get('failed_files') or push_result.get('error')}")
+            return None
+        template_result = github_creator.mark_as_template(template_name)
+        if not template_result["success"]:
+            print(f"[ERROR] Failed to mark {template_name} as template: {template_result['message']}")
+            return None
+
+        print(f"[SUCCESS] Provisioned template repo {template_name}")
+        _mark_template_repo_ready(template_name)
+        return template_name
+
+
+def provision_exercise_repo(kind: str, path_id: str, code_dir: str, repo_name: str, repo_desc: str,
+                            github_username: str, github_token: str) -> Dict[str, Any]:
+    """
+    Creates the user's exercise repo, adds the user as collaborator and fills it with the
+    exercise files (or generates it from the exercise template).
+    Returns the repo URL and which of the created/invited/pushed steps succeeded.
+    """
+    from ..Agents.GithubRepoCreatorAgent import create_repo_api, create_repo_from_template_api, GitHubRepoCreator
+
+    result = {"repository_url": None, "created": False, "invited": False, "pushed": False}
+
+    template_name = None
+    if GITHUB_PROVISIONING_MODE == "template":
+        template_name = ensure_template_repo(kind, path_id, code_dir, github_token)
+
+    if template_name:
+        repo_result = create_repo_from_template_api(template_name, repo_name, description=repo_desc)
+    else:
+        repo_result = None
+        if REPO_POOL_ENABLED:
+            repo_result = get_repo_pool().acquire(repo_name, description=repo_desc)
+        if repo_result is None:
+            repo_result = create_repo_api(repo_name, description=repo_desc)
+    if not repo_result.get("success"):
+        print(f"[ERROR] {kind} repo creation failed: {repo_result.get('error')}")
+        return result
+    result["created"] = True
+    result["repository_url"] = repo_result.get("repository_url")
+
+    github_creator = GitHubRepoCreator(github_token)
+    collab_result = github_creator.add_collaborator(repo_name, github_username)
+    if collab_result["success"]:
+        print(f"[SUCCESS] Added collaborator '{github_username}' to repo '{repo_name}'")
+        result["invited"] = True
+    else:
+        print(f"[ERROR] Failed to add collaborator '{github_username}': {collab_result['message']}")
+
+    if template_name:
+        result["pushed"] = True
+    else:
+        repo_full_name = f"Deloitte-US/{repo_name}"
+        push_result = push_files_to_github(repo_full_name, code_dir, github_token)
+        if push_result["success"]:
+            print(f"[SUCCESS] Uploaded files for {kind} assignment to {repo_full_name}")
+            result["pushed"] = True
+        else:
+            print(f"[ERROR] Failed to upload files for {kind} assignment: {push_result.get('failed_files') or push_result.get('error')}")
+
+    return result
+
+
+def get_test_exercises(db: Session, test_id: int) -> Dict[str, Tuple[str, str]]:
+    """Maps "debug"/"handson" to (path_id, project dir) for the exercises of a test that exist on disk."""
+    test_obj = db.query(Test).filter(Test.id == test_id).first()
+    exercises = {}
+
+    debug_test_id = getattr(test_obj, "debug_test_id", None)
+    if debug_test_id:
+        debug_ex = db.query(DebugExercise).filter(DebugExercise.id == debug_test_id).first()
+        debug_path_id = getattr(debug_ex, "path_id", None)
+        bugged_code_dir = os.path.join(os.getcwd(), "BugInjectedProject", debug_path_id, "project")
+        if os.path.exists(bugged_code_dir):
+            exercises["debug"] = (debug_path_id, bugged_code_dir)
+        else:
+            print(f"[ERROR] BugInjectedProject directory not found for path_id {debug_path_id}")
+
+    handson_id = getattr(test_obj, "handson_id", None)
+    if handson_id:
+        handson_ex = db.query(HandsOn).filter(HandsOn.id == handson_id).first()
+        handson_path_id = getattr(handson_ex, "path_id", None)
+        handson_code_dir = os.path.join(os.getcwd(), "GeneratedHandsON", handson_path_id, "project")
+        if os.path.exists(handson_code_dir):
+            exercises["handson"] = (handson_path_id, handson_code_dir)
+        else:
+            print(f"[ERROR] GeneratedHandsON directory not found for path_id {handson_path_id}")
+
+    return exercises
+
+
+def provision_user_repos(request: AssignTestRequest, employee: Employee, exercises: Dict[str, Tuple[str, str]],
+                         github_token: str, state: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """
+    Provisions the exercise repos of one user and returns their URLs by exercise kind.
+    The created/invited/pushed flags and the first step that did not succeed go to state.
+    """
+    user_id = employee.user_id
+    github_username = employee.email.split('.')[0].replace('@', '_')
+
+    descriptions = {"debug": "Debug exercise", "handson": "Hands-on exercise"}
+    repo_urls = {}
+    for kind, (path_id, code_dir) in exercises.items():
+        state["step"] = f"provision_{kind}"
+        repo_result = provision_exercise_repo(
+            kind, path_id, code_dir,
+            repo_name=f"{kind}-{path_id}-{user_id}",
+            repo_desc=f"{descriptions[kind]} for test {request.test_id} assigned to {employee.name}",
+            github_username=github_username,
+            github_token=github_token
+        )
+        repo_urls[kind] = repo_result["repository_url"]
+        state[f"{kind}_github_url"] = repo_result["repository_url"]
+        for flag in ("created", "invited", "pushed"):
+            state[flag] = state.get(flag) is not False and repo_result[flag]
+            if not repo_result[flag] and not state.get("failed_step"):
+                state["failed_step"] = f"{kind}_{flag}"
+    return repo_urls
+
+
+def get_assigned_user_ids(db: Session, test_id: int, user_ids: List[int]) -> set:
+    """The users among user_ids that already have test_id assigned."""
+    rows = db.query(TestAssign.user_id).filter(TestAssign.test_id == test_id, TestAssign.user_id.in_(user_ids))
+    return {row.user_id for row in rows}
+
+
+def insert_test_assignments(db: Session, request: AssignTestRequest, assigned_by: int,
+                            repo_urls_by_user: Dict[int, Dict[str, Optional[str]]]) -> List[TestAssign]:
+    """
+    Inserts the TestAssign rows of all users in one INSERT ... ON CONFLICT DO NOTHING
+    RETURNING statement (without committing). Users that already have the test assigned
+    (uniq_user_test_assign) are left out of the returned assignments.
+    """
+    if not repo_urls_by_user:
+        return []
+    rows = [
+        {
+            "user_id": user_id,
+            "test_id": request.test_id,
+            "status": StatusType.assigned,
+            "due_date": request.due_date,
+            "mail_sent": MailStatus.Not_sent,
+            "assigned_by": assigned_by,
+            "debug_github_url": repo_urls.get("debug"),
+            "handson_github_url": repo_urls.get("handson"),
+        }
+        for user_id, repo_urls in repo_urls_by_user.items()
+    ]
+    statement = (
+        pg_insert(TestAssign)
+        .on_conflict_do_nothing(constraint="uniq_user_test_assign")
+        .returning(TestAssign)
+    )
+    return db.scalars(statement, rows).all()
+
+
+def record_mail_status(db: Session, email_sent_by_assignment: Dict[int, bool]):
+    """Stores whether the notification email went out, one UPDATE per outcome (without committing)."""
+    for sent in (True, False):
+        assign_ids = [assign_id for assign_id, email_sent in email_sent_by_assignment.items() if email_sent is sent]
+        if assign_ids:
+            db.execute(
+                update(TestAssign)
+                .where(TestAssign.assign_id.in_(assign_ids))
+                .values(mail_sent=MailStatus.Sent if sent else MailStatus.Failed)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def assign_test_to_user(db: Session, request: AssignTestRequest, assigned_by: int, user_id: int,
+                        exercises: Dict[str, Tuple[str, str]], github_token: str,
+                        state: Optional[Dict[str, Any]] = None):
+    """
+    Provisions the exercise repos of one user, stores the TestAssign row and sends the
+    notification email. Progress is recorded in state: the current "step", the
+    created/invited/pushed/emailed flags and the first step that did not succeed.
+    Returns the assignment, or None if the user was skipped.
+    """
+    state = state if state is not None else {}
+    state["step"] = "load_employee"
+    employee = db.query(Employee).filter(Employee.user_id == user_id).first()
+    if not getattr(employee, "name", None):
+        print(f"No name found for user {user_id}, skipping repo creation.")
+        state["status"] = "skipped"
+        return None
+    if get_assigned_user_ids(db, request.test_id, [user_id]):
+        print(f"Test {request.test_id} is already assigned to user {user_id}, skipping.")
+        state["status"] = "skipped"
+        return None
+
+    repo_urls = provision_user_repos(request, employee, exercises, github_token, state)
+
+    # Only after all repo/collaborator/file operations, create the assignment record
+    state["step"] = "save_assignment"
+    assignments = insert_test_assignments(db, request, assigned_by, {user_id: repo_urls})
+    if not assignments:
+        # Assigned concurrently since the check above
+        db.rollback()
+        state["status"] = "skipped"
+        return None
+    assignment = assignments[0]
+    assign_id = assignment.assign_id
+    db.commit()
+    state["assignment_id"] = assign_id
+
+    # Only send mail after assignment is saved
+    state["step"] = "send_email"
+    email_sent = send_assignment_email(
+        db,
+        user_id,
+        request.test_id,
+        request.due_date,
+        debug_github_url=repo_urls.get("debug"),
+        handson_github_url=repo_urls.get("handson")
+    )
+    state["emailed"] = email_sent
+    if not email_sent and not state.get("failed_step"):
+        state["failed_step"] = "emailed"
+    record_mail_status(db, {assign_id: email_sent})
+    db.commit()
+    return assignment
+
+
 def assign_test(db: Session, request: AssignTestRequest, assigned_by: int):
     """
     Assigns a test to users, creates GitHub repos for debug/hands-on assignments,
     pushes files, adds collaborators, stores repo URLs, and sends notification email.
+    Runs synchronously, one user after the other; see start_assign_test_job for the
+    concurrent variant. The database work is batched over all users: the assignments
+    are inserted in one statement and the mail outcomes stored in at most two.
     """
     assignments = []
-    from ..Agents.GithubRepoCreatorAgent import create_repo_api, GitHubRepoCreator
 
     github_token = os.getenv("GITHUB_TOKEN")
     if not github_token:
         print("GITHUB_TOKEN not set in environment.")
         return assignments
 
-    # Fetch the test object to check debug_test_id and handson_id
-    test_obj = db.query(Test).filter(Test.id == request.test_id).first()
-    debug_test_id = getattr(test_obj, "debug_test_id", None)
-    handson_id = getattr(test_obj, "handson_id", None)
+    exercises = get_test_exercises(db, request.test_id)
+    user_ids = list(dict.fromkeys(request.user_ids))
+    employees = {employee.user_id: employee for employee in db.query(Employee).filter(Employee.user_id.in_(user_ids))}
+    already_assigned = get_assigned_user_ids(db, request.test_id, user_ids)
 
-    for user_id in request.user_ids:
-        employee = db.query(Employee).filter(Employee.user_id == user_id).first()
-        user_name = getattr(employee, "name", None)
-        github_username = employee.email.split('.')[0].replace('@', '_')
-        if not user_name:
+    repo_urls_by_user = {}
+    for user_id in user_ids:
+        employee = employees.get(user_id)
+        if not getattr(employee, "name", None):
             print(f"No name found for user {user_id}, skipping repo creation.")
             continue
+        if user_id in already_assigned:
+            print(f"Test {request.test_id} is already assigned to user {user_id}, skipping.")
+            continue
+        repo_urls_by_user[user_id] = provision_user_repos(request, employee, exercises, github_token, state={})
 
-        debug_github_url = None
-        handson_github_url = None
-
-        # Handle debug assignment
-        if debug_test_id:
-            debug_ex = db.query(DebugExercise).filter(DebugExercise.id == debug_test_id).first()
-            debug_path_id = getattr(debug_ex, "path_id", None)
-            bugged_code_dir = os.path.join(
-                os.getcwd(),
-                "BugInjectedProject",
-                debug_path_id,
-                "project"
-            )
-            if os.path.exists(bugged_code_dir):
-                repo_name = f"debug-{debug_path_id}-{user_id}"
-                repo_desc = f"Debug exercise for test {request.test_id} assigned to {user_name}"
-                repo_result = create_repo_api(repo_name, description=repo_desc)
-                if repo_result.get("success"):
-                    debug_github_url = repo_result.get("repository_url")
-                    github_creator = GitHubRepoCreator(github_token)
-                    collab_result = github_creator.add_collaborator(repo_name, github_username)
-                    if collab_result["success"]:
-                        print(f"[SUCCESS] Added collaborator '{github_username}' to repo '{repo_name}'")
-                    else:
-                        print(f"[ERROR] Failed to add collaborator '{github_username}': {collab_result['message']}")
-                    repo_full_name = f"Deloitte-US/{repo_name}"
-                    push_result = push_files_to_github(repo_full_name, bugged_code_dir, github_token)
-                    if push_result["success"]:
-                        print(f"[SUCCESS] Uploaded files for debug assignment to {repo_full_name}")
-                    else:
-                        print(f"[ERROR] Failed to upload files for debug assignment: {push_result['failed_files']}")
-                else:
-                    print(f"[ERROR] Debug repo creation failed: {repo_result.get('error')}")
-            else:
-                print(f"[ERROR] BugInjectedProject directory not found for path_id {debug_path_id}")
-
-        # Handle hands-on assignment
-        if handson_id:
-            handson_ex = db.query(HandsOn).filter(HandsOn.id == handson_id).first()
-            handson_path_id = getattr(handson_ex, "path_id", None)
-            handson_code_dir = os.path.join(
-                os.getcwd(),
-                "GeneratedHandsON",
-                handson_path_id,
-                "project"
-            )
-            if os.path.exists(handson_code_dir):
-                repo_name = f"handson-{handson_path_id}-{user_id}"
-                repo_desc = f"Hands-on exercise for test {request.test_id} assigned to {user_name}"
-                repo_result = create_repo_api(repo_name, description=repo_desc)
-                if repo_result.get("success"):
-                    handson_github_url = repo_result.get("repository_url")
-                    github_creator = GitHubRepoCreator(github_token)
-                    collab_result = github_creator.add_collaborator(repo_name, github_username)
-                    if collab_result["success"]:
-                        print(f"[SUCCESS] Added collaborator '{github_username}' to repo '{repo_name}'")
-                    else:
-                        print(f"[ERROR] Failed to add collaborator '{github_username}': {collab_result['message']}")
-                    repo_full_name = f"Deloitte-US/{repo_name}"
-                    push_result = push_files_to_github(repo_full_name, handson_code_dir, github_token)
-                    if push_result["success"]:
-                        print(f"[SUCCESS] Uploaded files for hands-on assignment to {repo_full_name}")
-                    else:
-                        print(f"[ERROR] Failed to upload files for hands-on assignment: {push_result['failed_files']}")
-                else:
-                    print(f"[ERROR] Hands-on repo creation failed: {repo_result.get('error')}")
-            else:
-                print(f"[ERROR] GeneratedHandsON directory not found for path_id {handson_path_id}")
-
-        # Only after all repo/collaborator/file operations, create the assignment record
-        assignment = TestAssign(
-            user_id=user_id,
-            test_id=request.test_id,
-            status = StatusType.assigned,
-            due_date=request.due_date,
-            mail_sent="Not_sent",
-            assigned_by=assigned_by,
-            debug_github_url=debug_github_url,
-            handson_github_url=handson_github_url
-        )
-        db.add(assignment)
-        db.commit()
-        db.refresh(assignment)
+    # Only after all repo/collaborator/file operations, create the assignment records
+    assigned_users = [
+        (assignment.assign_id, assignment.user_id)
+        for assignment in insert_test_assignments(db, request, assigned_by, repo_urls_by_user)
+    ]
+    db.commit()
+    if not assigned_users:
+        return assignments
 
-        # Only send mail after assignment is saved
-        email_sent = send_assignment_email(
+    # Only send mail after the assignments are saved. The commit expired the employees
+    # and the test; one query each loads them back for all the emails.
+    db.query(Employee).filter(Employee.user_id.in_([user_id for _, user_id in assigned_users])).all()
+    test = db.query(Test).filter(Test.id == request.test_id).first()
+    email_sent_by_assignment = {}
+    for assign_id, user_id in assigned_users:
+        repo_urls = repo_urls_by_user[user_id]
+        email_sent_by_assignment[assign_id] = send_assignment_email(
             db,
             user_id,
             request.test_id,
             request.due_date,
-            debug_github_url=debug_github_url,
-            handson_github_url=handson_github_url
+            debug_github_url=repo_urls.get("debug"),
+            handson_github_url=repo_urls.get("handson"),
+            employee=employees[user_id],
+            test=test
         )
-        assignment.mail_sent = "Sent" if email_sent else "Failed"
-        db.commit()
-        db.refresh(assignment)
-        assignments.append(assignment)
+    record_mail_status(db, email_sent_by_assignment)
+    db.commit()
 
-    return assignments
+    assignments = db.query(TestAssign).filter(TestAssign.assign_id.in_(email_sent_by_assignment)).all()
+    order = {user_id: position for position, user_id in enumerate(user_ids)}
+    return sorted(assignments, key=lambda assignment: order[assignment.user_id])
+
+
+ASSIGN_TEST_CONCURRENCY = int(os.getenv("ASSIGN_TEST_CONCURRENCY", "8"))
+ASSIGN_TEST_JOB_TTL_SECONDS = 24 * 3600
+
+# job_id -> job record, see start_assign_test_job
+assign_test_jobs: Dict[str, Dict[str, Any]] = {}
+_assign_test_jobs_lock = threading.Lock()
+
+
+def start_assign_test_job(request: AssignTestRequest, assigned_by: int) -> str:
+    """
+    Registers an assignment job and returns its id. The job itself runs in
+    run_assign_test_job, which the caller schedules in the background.
+    """
+    job_id = str(uuid.uuid4())
+    now = time.time()
+    user_ids = list(dict.fromkeys(request.user_ids))
+    job = {
+        "job_id": job_id,
+        "test_id": request.test_id,
+        "status": "pending",
+        "created_at": now,
+        "finished_at": None,
+        "users": {
+            user_id: {
+                "user_id": user_id,
+                "status": "pending",
+                "step": None,
+                "created": None,
+                "invited": None,
+                "pushed": None,
+                "emailed": None,
+                "failed_step": None,
+                "error": None,
+                "assignment_id": None,
+                "debug_github_url": None,
+                "handson_github_url": None,
+            }
+            for user_id in user_ids
+        }
+    }
+    with _assign_test_jobs_lock:
+        for old_id, old_job in list(assign_test_jobs.items()):
+            if old_job["finished_at"] and now - old_job["finished_at"] > ASSIGN_TEST_JOB_TTL_SECONDS:
+                del assign_test_jobs[old_id]
+        assign_test_jobs[job_id] = job
+    return job_id
+
+
+def run_assign_test_job(job_id: str, request: AssignTestRequest, assigned_by: int):
+    """
+    Provisions all users of a job with bounded concurrency. Every user gets its own DB
+    session and its own status, so one failing user never stops the others.
+    """
+    job = assign_test_jobs[job_id]
+    job["status"] = "running"
+
+    github_token = os.getenv("GITHUB_TOKEN")
+    if not github_token:
+        print("GITHUB_TOKEN not set in environment.")
+        for state in job["users"].values():
+            state.update(status="failed", failed_step="github_token", error="GITHUB_TOKEN not set")
+        job["status"] = "completed"
+        job["finished_at"] = time.time()
+        return
+
+    step = "load_exercises"
+    try:
+        db = BackgroundSessionLocal()
+        try:
+            exercises = get_test_exercises(db, request.test_id)
+        finally:
+            db.close()
+
+        if REPO_POOL_ENABLED and exercises and GITHUB_PROVISIONING_MODE != "template":
+            step = "request_repo_capacity"
+            get_repo_pool().request_capacity(len(job["users"]) * len(exercises))
+
+        def run_for_user(state):
+            state["status"] = "running"
+            user_db = BackgroundSessionLocal()
+            try:
+                assign_test_to_user(user_db, request, assigned_by, state["user_id"], exercises, github_token, state=state)
+                if state["status"] != "skipped":
+                    state["status"] = "failed" if state["failed_step"] else "done"
+            except Exception as e:
+                user_db.rollback()
+                print(f"[ERROR] Assignment failed for user {state['user_id']} at {state['step']}: {e}")
+                state.update(status="failed", failed_step=state["step"], error=str(e))
+            finally:
+                user_db.close()
+
+        step = "provision_users"
+        with ThreadPoolExecutor(max_workers=ASSIGN_TEST_CONCURRENCY) as executor:
+            list(executor.map(run_for_user, job["users"].values()))
+        job["status"] = "completed"
+    except Exception as e:
+        print(f"[ERROR] Assignment job {job_id} failed at {step}: {e}")
+        for state in job["users"].values():
+            if state["status"] in ("pending", "running"):
+                state.update(status="failed", failed_step=state["step"] or step, error=str(e))
+        job["status"] = "failed"
+    finally:
+        # Also what lets the job be pruned, so it is set however the job ended
+        job["finished_at"] = time.time()
+
+
+def get_assign_test_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Returns a snapshot of a job with per-status counts, or None if unknown."""
+    job = assign_test_jobs.get(job_id)
+    if job is None:
+        return None
+    users = [dict(state) for state in list(job["users"].values())]
+    counts = {}
+    for state in users:
+        counts[state["status"]] = counts.get(state["status"], 0) + 1
+    return {
+        "job_id": job["job_id"],
+        "test_id": job["test_id"],
+        "status": job["status"],
+        "total": len(users),
+        "counts": counts,
+        "users": users
+    }
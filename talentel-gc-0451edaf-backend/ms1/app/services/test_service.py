@@ -1,24 +1,23 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import Integer, cast, func, select, tuple_, union
 from sqlalchemy.orm import Session
 
 from ..schemas.test_schema import TestCreate
 # from app.models.models import Test, Quiz, HandsonData, DebugExercise
-from ..models.models import Employee, Test, Quiz, DebugExercise
+from ..models.models import Employee, Test, Quiz, DebugExercise, QuizResult, DebugResult, HandsOnResult
 from fastapi import HTTPException
 
-def create_test(db: Session, user_payload, test_data:TestCreate):
+def create_test(db: Session, principal, test_data:TestCreate):
     # Ensure test name is unique
     if db.query(Test).filter_by(test_name=test_data.test_name).first():
         raise HTTPException(status_code=400, detail="Test name already exists.")
     
-    print(user_payload)
-    user = db.query(Employee).filter(Employee.email == user_payload['sub']).first()
-    print("user data in service",user)
-
     test = Test(
         test_name=test_data.test_name,
         description=test_data.description,
         duration=test_data.duration,
-        created_by=user.user_id,
+        created_by=principal.user_id,
         quiz_id=test_data.quiz_id,
         debug_test_id=test_data.debug_test_id,
         handson_id = test_data.handson_test_id
@@ -31,7 +30,7 @@ def create_test(db: Session, user_payload, test_data:TestCreate):
     db.refresh(test)
     return test
 
-def update_test(db: Session, test_id: int, user_payload, test_data):
+def update_test(db: Session, test_id: int, principal, test_data):
     test = db.query(Test).filter_by(test_id=test_id).first()
     if not test:
         raise HTTPException(status_code=404, detail="Test not found.")
@@ -72,3 +71,62 @@ def update_test(db: Session, test_id: int, user_payload, test_data):
     db.commit()
     db.refresh(test)
     return test
+
+
+ATTEMPT_SORT_COLUMNS = ("quiz_marks", "debug_marks", "handson_marks", "name", "user_id")
+
+
+def _latest_attempts(model, key_column, key):
+    """The newest result per employee for one exercise."""
+    ranked = select(
+        model.user_id,
+        model.result_id,
+        model.score,
+        func.row_number().over(partition_by=model.user_id, order_by=model.result_id.desc()).label("rank"),
+    ).where(key_column == key).subquery()
+    return select(ranked.c.user_id, ranked.c.result_id, ranked.c.score).where(ranked.c.rank == 1).subquery()
+
+
+def test_attempts_query(test, sort_by: str, order: str, after: Optional[Sequence] = None):
+    """
+    The employees who attempted test (anything with quiz_id, debug_test_id and handson_id)
+    with their latest result id and score per component, the total count and a sort_key,
+    ordered by (sort_key, user_id) and starting after the keyset position after.
+    None when the test has no components at all.
+    """
+    components = {
+        name: _latest_attempts(model, key_column, key)
+        for name, model, key_column, key in (
+            ("quiz", QuizResult, QuizResult.quiz_id, test.quiz_id),
+            ("debug", DebugResult, DebugResult.debug_id, test.debug_test_id),
+            ("handson", HandsOnResult, HandsOnResult.handson_id, test.handson_id),
+        )
+        if key is not None
+    }
+    if not components:
+        return None
+
+    attempted = union(*(select(sub.c.user_id) for sub in components.values())).subquery()
+    columns = [Employee.user_id, Employee.name]
+    joined = attempted.join(Employee, Employee.user_id == attempted.c.user_id)
+    for name in ("quiz", "debug", "handson"):
+        sub = components.get(name)
+        if sub is None:
+            # Cast, or Postgres resolves the bare NULLs to text and the score sort cannot coalesce them
+            columns += [cast(None, Integer).label(f"{name}_result_id"), cast(None, Integer).label(f"{name}_marks")]
+            continue
+        joined = joined.outerjoin(sub, sub.c.user_id == attempted.c.user_id)
+        columns += [sub.c.result_id.label(f"{name}_result_id"), sub.c.score.label(f"{name}_marks")]
+    # The count is taken over all attempts before the cursor narrows them down
+    rows = select(*columns, func.count().over().label("total")).select_from(joined).subquery()
+
+    sort_column = rows.c[sort_by]
+    sort_key = (sort_column if sort_by in ("name", "user_id") else func.coalesce(sort_column, -1)).label("sort_key")
+    descending = order == "desc"
+    query = select(rows, sort_key)
+    if after is not None:
+        position = tuple_(sort_key, rows.c.user_id)
+        query = query.where(position < tuple_(*after) if descending else position > tuple_(*after))
+    return query.order_by(
+        *((sort_key.desc(), rows.c.user_id.desc()) if descending else (sort_key, rows.c.user_id))
+    )
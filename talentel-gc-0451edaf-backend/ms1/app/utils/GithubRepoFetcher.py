@@ -1,18 +1,25 @@
 import os
 import stat
+import tarfile
 import time
 
-import requests
 import shutil
 import tempfile
 from git import Repo
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
+
+from .github_client import get_github_client
+from .repo_mirror_cache import get_mirror_cache
+from .workspace_manager import get_workspace_manager
+
+# "full" keeps the original clone-everything behaviour, "shallow" fetches only the
+# target commit at depth 1, "tarball" streams the commit archive from the API and
+# "mirror" checks out a worktree from the local bare-mirror cache.
+FETCH_MODES = ("full", "shallow", "tarball", "mirror")
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", "50"))
 
 def get_project_temp_dir():
-    project_root = os.getcwd()
-    temp_dir = os.path.join(project_root, "temp_repos")
-    os.makedirs(temp_dir, exist_ok=True)
-    return temp_dir
+    return get_workspace_manager().root
 
 def on_rm_error(func, path, exc_info):
     try:
@@ -39,13 +46,14 @@ def safe_cleanup(target_dir):
 
 
 class GitHubRepoFetcher:
-    def __init__(self, github_token: str, api_base_url: Optional[str] = None, owner: Optional[str] = None):
+    def __init__(self, github_token: str, api_base_url: Optional[str] = None, owner: Optional[str] = None,
+                 fetch_mode: Optional[str] = None):
         self.github_token = github_token
         self.api_base_url = api_base_url or "https://api.github.com/"
-        self.headers = {
-            "Authorization": f"token {github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        self.fetch_mode = fetch_mode or os.getenv("GITHUB_FETCH_MODE", "full")
+        if self.fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode '{self.fetch_mode}', expected one of {FETCH_MODES}")
+        self.client = get_github_client(github_token)
 
     def get_latest_commit_before(self, repo_full_name: str, branch: str, timestamp: str) -> Dict[str, str]:
         url = f"{self.api_base_url}/repos/{repo_full_name}/commits"
@@ -56,7 +64,7 @@ class GitHubRepoFetcher:
         }
         try:
             print(f"[DEBUG] Fetching latest commit before {timestamp} on branch '{branch}' for repo '{repo_full_name}'")
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.client.get(url, params=params)
             print("[DEBUG] GitHub API response status:", response.status_code)
             response.raise_for_status()
             commits = response.json()
@@ -73,6 +81,69 @@ class GitHubRepoFetcher:
             print(f"[ERROR] Failed to fetch commit: {str(e)}")
             raise
 
+    def _resolve_commits_graphql(self, batch: List[Tuple[str, str, str]]) -> List[Optional[Dict[str, str]]]:
+        """
+        Resolves one batch with a single GraphQL query, one aliased repository lookup per entry.
+        Entries GraphQL could not resolve come back as None.
+        """
+        declarations = []
+        selections = []
+        variables = {}
+        for i, (repo_full_name, branch, timestamp) in enumerate(batch):
+            owner, name = repo_full_name.split("/", 1)
+            declarations.append(f"$o{i}: String!, $n{i}: String!, $b{i}: String!, $t{i}: GitTimestamp!")
+            selections.append(
+                f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ref(qualifiedName: $b{i}) {{ target {{ "
+                f"... on Commit {{ history(first: 1, until: $t{i}) {{ nodes {{ oid committedDate message }} }} }} }} }} }}"
+            )
+            variables.update({f"o{i}": owner, f"n{i}": name, f"b{i}": f"refs/heads/{branch}", f"t{i}": timestamp})
+        query = f"query({', '.join(declarations)}) {{ {' '.join(selections)} }}"
+
+        response = self.client.post(f"{self.api_base_url.rstrip('/')}/graphql", json={"query": query, "variables": variables})
+        response.raise_for_status()
+        data = response.json().get("data") or {}
+
+        results = []
+        for i in range(len(batch)):
+            node = data.get(f"r{i}")
+            for key in ("ref", "target", "history"):
+                node = (node or {}).get(key)
+            nodes = (node or {}).get("nodes") or []
+            if nodes:
+                results.append({
+                    "sha": nodes[0]["oid"],
+                    "date": nodes[0]["committedDate"],
+                    "message": nodes[0]["message"]
+                })
+            else:
+                results.append(None)
+        return results
+
+    def get_latest_commits_before_batch(self, targets: List[Tuple[str, str, str]]) -> List[Optional[Dict[str, str]]]:
+        """
+        Resolves the latest commit before each deadline for a list of (repo_full_name, branch, timestamp),
+        GITHUB_GRAPHQL_BATCH_SIZE repos per GraphQL query. Entries the query could not resolve, or whole
+        batches that failed, fall back to get_latest_commit_before. Returns commit info dicts in input
+        order, None where even the fallback failed.
+        """
+        results: List[Optional[Dict[str, str]]] = []
+        for start in range(0, len(targets), GITHUB_GRAPHQL_BATCH_SIZE):
+            batch = targets[start:start + GITHUB_GRAPHQL_BATCH_SIZE]
+            try:
+                print(f"[DEBUG] Resolving {len(batch)} commits with one GraphQL query")
+                batch_results = self._resolve_commits_graphql(batch)
+            except Exception as e:
+                print(f"[WARN] GraphQL commit resolution failed, falling back to REST: {str(e)}")
+                batch_results = [None] * len(batch)
+            for (repo_full_name, branch, timestamp), commit_info in zip(batch, batch_results):
+                if commit_info is None:
+                    try:
+                        commit_info = self.get_latest_commit_before(repo_full_name, branch, timestamp)
+                    except Exception:
+                        commit_info = None
+                results.append(commit_info)
+        return results
+
     def get_safe_target_dir(self, repo_full_name: str, assign_id: str) -> str:
         temp_dir = get_project_temp_dir()
         safe_name = repo_full_name.replace('/', '_')
@@ -83,11 +154,7 @@ class GitHubRepoFetcher:
             # Clean up target directory if it exists
             safe_cleanup(target_dir)
             print(f"[DEBUG] Cloning repo '{repo_url}' into '{target_dir}'")
-            # For private repos, embed token in URL for authentication (avoid printing token)
-            safe_repo_url = repo_url
-            if self.github_token and "github.com" in repo_url:
-                safe_repo_url = repo_url.replace("https://", f"https://{self.github_token}@")
-            repo = Repo.clone_from(safe_repo_url, target_dir)
+            repo = Repo.clone_from(self._authenticated_url(repo_url), target_dir)
             repo.git.checkout(commit_sha)
             print(f"[DEBUG] Checked out commit {commit_sha}")
             return target_dir
@@ -95,15 +162,148 @@ class GitHubRepoFetcher:
             print(f"[ERROR] Failed to clone repo: {str(e)}")
             raise
 
-    def fetch_repo_at_commit(self, repo_url: str, repo_full_name: str, branch: str, timestamp: str, assign_id: str) -> Dict[str, str]:
+    def _authenticated_url(self, repo_url: str) -> str:
+        # For private repos, embed token in URL for authentication (avoid printing token)
+        if self.github_token and "github.com" in repo_url:
+            return repo_url.replace("https://", f"https://{self.github_token}@")
+        return repo_url
+
+    def _mirror_token(self, repo_url: str) -> Optional[str]:
+        # Passed per git command; the long-lived mirrors must not keep it in their config
+        if self.github_token and "github.com" in repo_url:
+            return self.github_token
+        return None
+
+    def shallow_fetch_at_commit(self, repo_url: str, commit_sha: str, target_dir: str,
+                                paths: Optional[List[str]] = None) -> str:
+        """
+        Initializes an empty repo and fetches only commit_sha at depth 1.
+        If paths is given, only those paths are materialised via sparse checkout.
+        """
+        try:
+            safe_cleanup(target_dir)
+            os.makedirs(target_dir, exist_ok=True)
+            print(f"[DEBUG] Shallow fetching commit {commit_sha} of '{repo_url}' into '{target_dir}'")
+            repo = Repo.init(target_dir)
+            repo.git.remote("add", "origin", self._authenticated_url(repo_url))
+            fetch_args = ["--depth", "1", "--no-tags"]
+            if paths:
+                # Blobs outside the sparse set are never downloaded
+                fetch_args.append("--filter=blob:none")
+                repo.git.sparse_checkout("init", "--no-cone")
+                repo.git.sparse_checkout("set", "--no-cone", *[f"/{p.lstrip('/')}" for p in paths])
+            repo.git.fetch(*fetch_args, "origin", commit_sha)
+            repo.git.checkout("--detach", "FETCH_HEAD")
+            print(f"[DEBUG] Checked out commit {commit_sha} (shallow)")
+            return target_dir
+        except Exception as e:
+            print(f"[ERROR] Failed to shallow fetch repo: {str(e)}")
+            raise
+
+    def download_tarball_at_commit(self, repo_full_name: str, commit_sha: str, target_dir: str) -> str:
+        """
+        Streams the tarball of commit_sha from the GitHub API and extracts it into target_dir,
+        dropping the "<owner>-<repo>-<sha>/" prefix GitHub puts on every entry.
+        """
+        url = f"{self.api_base_url}/repos/{repo_full_name}/tarball/{commit_sha}"
+        try:
+            safe_cleanup(target_dir)
+            os.makedirs(target_dir, exist_ok=True)
+            root = os.path.realpath(target_dir)
+            print(f"[DEBUG] Streaming tarball of '{repo_full_name}' at {commit_sha} into '{target_dir}'")
+            with self.client.get(url, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                    for member in archive:
+                        parts = member.name.split("/", 1)
+                        if len(parts) < 2 or not parts[1]:
+                            continue
+                        if not (member.isfile() or member.isdir()):
+                            continue
+                        dest = os.path.realpath(os.path.join(root, parts[1]))
+                        if not dest.startswith(root + os.sep):
+                            print(f"[WARNING] Skipping unsafe tarball entry: {member.name}")
+                            continue
+                        if member.isdir():
+                            os.makedirs(dest, exist_ok=True)
+                            continue
+                        os.makedirs(os.path.dirname(dest), exist_ok=True)
+                        with archive.extractfile(member) as src, open(dest, "wb") as out:
+                            shutil.copyfileobj(src, out)
+                        os.chmod(dest, member.mode & 0o755 | stat.S_IWUSR)
+            print(f"[DEBUG] Extracted commit {commit_sha} (tarball)")
+            return target_dir
+        except Exception as e:
+            print(f"[ERROR] Failed to download tarball: {str(e)}")
+            raise
+
+    def download_paths_at_commit(self, repo_full_name: str, commit_sha: str, target_dir: str,
+                                 paths: List[str]) -> str:
+        """
+        Downloads only the given file paths at commit_sha through the contents API.
+        Paths missing at that commit are skipped, so the evaluator sees them as absent.
+        """
+        headers = {"Accept": "application/vnd.github.raw"}
+        try:
+            safe_cleanup(target_dir)
+            os.makedirs(target_dir, exist_ok=True)
+            for path in paths:
+                url = f"{self.api_base_url}/repos/{repo_full_name}/contents/{path.lstrip('/')}"
+                response = self.client.get(url, headers=headers, params={"ref": commit_sha})
+                if response.status_code == 404:
+                    print(f"[WARN] '{path}' not found at {commit_sha} in '{repo_full_name}'")
+                    continue
+                response.raise_for_status()
+                dest = os.path.join(target_dir, *path.lstrip('/').split("/"))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as f:
+                    f.write(response.content)
+            print(f"[DEBUG] Downloaded {len(paths)} paths at {commit_sha} into '{target_dir}'")
+            return target_dir
+        except Exception as e:
+            print(f"[ERROR] Failed to download paths: {str(e)}")
+            raise
+
+    def checkout_commit(self, repo_url: str, repo_full_name: str, commit_sha: str, target_dir: str,
+                        paths: Optional[List[str]] = None) -> str:
+        """
+        Materialises commit_sha into target_dir using the configured fetch mode.
+        When paths is given only those files are retrieved: sparse checkout in shallow
+        mode, blobs read from the mirror in mirror mode, per-path API downloads otherwise.
+        """
+        if self.fetch_mode == "shallow":
+            return self.shallow_fetch_at_commit(repo_url, commit_sha, target_dir, paths=paths)
+        if paths and self.fetch_mode == "mirror":
+            safe_cleanup(target_dir)
+            return get_mirror_cache().export_paths(repo_url, repo_full_name, commit_sha, target_dir, paths,
+                                                   token=self._mirror_token(repo_url))
+        if paths:
+            return self.download_paths_at_commit(repo_full_name, commit_sha, target_dir, paths)
+        if self.fetch_mode == "tarball":
+            return self.download_tarball_at_commit(repo_full_name, commit_sha, target_dir)
+        if self.fetch_mode == "mirror":
+            return get_mirror_cache().checkout(repo_url, repo_full_name, commit_sha, target_dir,
+                                               token=self._mirror_token(repo_url))
+        return self.clone_repo_at_commit(repo_url, commit_sha, target_dir)
+
+    def fetch_repo_at_commit(self, repo_url: str, repo_full_name: str, branch: str, timestamp: str, assign_id: str,
+                             paths: Optional[List[str]] = None, commit_info: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """
-        Orchestrates the fetch: gets latest commit before timestamp, clones repo at that commit.
+        Orchestrates the fetch: gets latest commit before timestamp, materialises the repo at that commit.
+        If paths is given only those files are fetched (see checkout_commit). A commit_info already
+        resolved by get_latest_commits_before_batch skips the per-repo commit lookup.
+        The local path is a workspace leased from the workspace manager; whoever consumes it
+        must hand it back with get_workspace_manager().release(local_path).
         Returns info dict with local path and commit info.
         """
+        workspaces = get_workspace_manager()
+        target_dir = None
         try:
-            commit_info = self.get_latest_commit_before(repo_full_name, branch, timestamp)
-            target_dir = self.get_safe_target_dir(repo_full_name, assign_id)
-            self.clone_repo_at_commit(repo_url, commit_info["sha"], target_dir)
+            if commit_info is None:
+                commit_info = self.get_latest_commit_before(repo_full_name, branch, timestamp)
+            target_dir = workspaces.acquire(os.path.basename(self.get_safe_target_dir(repo_full_name, assign_id)))
+            self.checkout_commit(repo_url, repo_full_name, commit_info["sha"], target_dir, paths=paths)
             return {
                 "success": True,
                 "local_path": target_dir,
@@ -112,6 +312,8 @@ class GitHubRepoFetcher:
                 "commit_message": commit_info["message"]
             }
         except Exception as e:
+            if target_dir is not None:
+                workspaces.release(target_dir)
             return {
                 "success": False,
                 "error": str(e)
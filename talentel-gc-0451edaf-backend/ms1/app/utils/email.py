@@ -5,9 +5,13 @@ from email.mime.text import MIMEText
 from ..models.models import Employee, Test, TechStack, RoleEnum
 
 
-def send_assignment_email(db, user_id, test_id, due_date, debug_github_url=None, handson_github_url=None):
-    employee = db.query(Employee).filter_by(user_id=user_id).first()
-    test = db.query(Test).filter_by(id=test_id).first()
+def send_assignment_email(db, user_id, test_id, due_date, debug_github_url=None, handson_github_url=None,
+                          employee=None, test=None):
+    # Callers that already hold the employee and the test pass them in to skip the lookups
+    if employee is None:
+        employee = db.query(Employee).filter_by(user_id=user_id).first()
+    if test is None:
+        test = db.query(Test).filter_by(id=test_id).first()
     test_types = []
     if getattr(test, "debug_test_id", None):
         test_types.append("Debug Exercise")
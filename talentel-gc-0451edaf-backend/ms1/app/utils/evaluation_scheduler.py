@@ -4,8 +4,8 @@ from datetime import timedelta, datetime
 
 from ..models.models import DebugExercise, DebugResult, TestAssign, HandsOn, HandsOnResult, Test
 from .GithubRepoFetcher import GitHubRepoFetcher
-from ..services.evaluator_service import evaluate_debug, evaluate_handson
-from ..config.database import get_db
+from ..services.evaluator_service import evaluate_debug, evaluate_handson, get_debug_manifest_paths
+from ..config.database import BackgroundSessionLocal, BackgroundAsyncSessionLocal
 
 def get_unevaluated_debug_assignments(db):
     # Only get assignments where due date has passed
@@ -48,33 +48,57 @@ def get_unevaluated_handson_assignments(db):
     ]
     return unevaluated
 
+def resolve_due_commits(fetcher, assignments, get_repo_url, get_duration):
+    """
+    Computes the deadline and repo of every assignment that has one and resolves the
+    latest commit before each deadline in batches.
+    Returns (assign, test, exercise, repo_url, repo_full_name, timestamp, commit_info) tuples.
+    """
+    due = []
+    for assign, test, exercise in assignments:
+        repo_url = get_repo_url(assign)
+        if repo_url and assign.assigned_date and get_duration(exercise):
+            timestamp_dt = assign.assigned_date + timedelta(minutes=get_duration(exercise))
+            timestamp = timestamp_dt.isoformat() + "Z"
+            repo_full_name = repo_url.split("github.com/")[1].replace(".git", "")
+            due.append((assign, test, exercise, repo_url, repo_full_name, timestamp))
+    commits = fetcher.get_latest_commits_before_batch(
+        [(repo_full_name, "main", timestamp) for _, _, _, _, repo_full_name, timestamp in due]
+    )
+    return [entry + (commit_info,) for entry, commit_info in zip(due, commits)]
+
 async def evaluate_unevaluated_debug_assignments(github_token=os.getenv("GITHUB_TOKEN"), repo_owner="Deloitte-US"):
     db = None
     try:
-        db = next(get_db())
+        db = BackgroundSessionLocal()
         print("Started debug evaluation ..........")
         fetcher = GitHubRepoFetcher(github_token, owner=repo_owner)
         unevaluated = get_unevaluated_debug_assignments(db)
-        for assign, test, debug_test in unevaluated:
-            if assign.debug_github_url and assign.assigned_date and debug_test.duration:
-                timestamp_dt = assign.assigned_date + timedelta(minutes=debug_test.duration)
-                timestamp = timestamp_dt.isoformat() + "Z"
-                repo_url = assign.debug_github_url
-                repo_path = repo_url.split("github.com/")[1].replace(".git", "")
-                repo_full_name = repo_path
-                branch = "main"
-                target_dir = f"/tmp/{repo_full_name.replace('/', '_')}_{assign.assign_id}"
-                fetch_result = fetcher.fetch_repo_at_commit(
-                    repo_url=repo_url,
-                    repo_full_name=repo_full_name,
-                    branch=branch,
-                    timestamp=timestamp,
-                    assign_id=assign.assign_id,
+        due = resolve_due_commits(
+            fetcher, unevaluated,
+            get_repo_url=lambda assign: assign.debug_github_url,
+            get_duration=lambda debug_test: debug_test.duration,
+        )
+        for assign, test, debug_test, repo_url, repo_full_name, timestamp, commit_info in due:
+            if commit_info is None:
+                print(f"[ERROR] Could not resolve commit before {timestamp} for {repo_full_name}")
+                continue
+            fetch_result = fetcher.fetch_repo_at_commit(
+                repo_url=repo_url,
+                repo_full_name=repo_full_name,
+                branch="main",
+                timestamp=timestamp,
+                assign_id=assign.assign_id,
+                paths=get_debug_manifest_paths(debug_test.path_id),
+                commit_info=commit_info,
+            )
+            if fetch_result.get("success"):
+                await evaluate_debug(
+                    fetch_result["local_path"], debug_test.path_id, user_id=assign.user_id,
+                    session_factory=BackgroundAsyncSessionLocal,
                 )
-                if fetch_result.get("success"):
-                    await evaluate_debug(fetch_result["local_path"], debug_test.path_id, user_id=assign.user_id)
-                else:
-                    print(f"[ERROR] GitHub fetch failed: {fetch_result.get('error')}")
+            else:
+                print(f"[ERROR] GitHub fetch failed: {fetch_result.get('error')}")
     except Exception as e:
         print("Unable to perform scheduled debug evaluator:", e)
     finally:
@@ -84,30 +108,34 @@ async def evaluate_unevaluated_debug_assignments(github_token=os.getenv("GITHUB_
 async def evaluate_unevaluated_handson_assignments(github_token=os.getenv("GITHUB_TOKEN"), repo_owner="Deloitte-US"):
     db = None
     try:
-        db = next(get_db())
+        db = BackgroundSessionLocal()
         print("Evaluating handson assignments ..........")
         fetcher = GitHubRepoFetcher(github_token, owner=repo_owner)
         unevaluated = get_unevaluated_handson_assignments(db)
-        for assign, test, handson_test in unevaluated:
-            if assign.handson_github_url and assign.assigned_date and handson_test.duration:
-                timestamp_dt = assign.assigned_date + timedelta(minutes=handson_test.duration)
-                timestamp = timestamp_dt.isoformat() + "Z"
-                repo_url = assign.handson_github_url
-                repo_path = repo_url.split("github.com/")[1].replace(".git", "")
-                repo_full_name = repo_path
-                branch = "main"
-                target_dir = f"/tmp/{repo_full_name.replace('/', '_')}_{assign.assign_id}"
-                fetch_result = fetcher.fetch_repo_at_commit(
-                    repo_url=repo_url,
-                    repo_full_name=repo_full_name,
-                    branch=branch,
-                    timestamp=timestamp,
-                    assign_id=assign.assign_id,
+        due = resolve_due_commits(
+            fetcher, unevaluated,
+            get_repo_url=lambda assign: assign.handson_github_url,
+            get_duration=lambda handson_test: handson_test.duration,
+        )
+        for assign, test, handson_test, repo_url, repo_full_name, timestamp, commit_info in due:
+            if commit_info is None:
+                print(f"[ERROR] Could not resolve commit before {timestamp} for {repo_full_name}")
+                continue
+            fetch_result = fetcher.fetch_repo_at_commit(
+                repo_url=repo_url,
+                repo_full_name=repo_full_name,
+                branch="main",
+                timestamp=timestamp,
+                assign_id=assign.assign_id,
+                commit_info=commit_info,
+            )
+            if fetch_result.get("success"):
+                await evaluate_handson(
+                    fetch_result["local_path"], handson_test.path_id, user_id=assign.user_id,
+                    session_factory=BackgroundAsyncSessionLocal,
                 )
-                if fetch_result.get("success"):
-                    await evaluate_handson(fetch_result["local_path"], handson_test.path_id, user_id=assign.user_id)
-                else:
-                    print(f"[ERROR] GitHub fetch failed: {fetch_result.get('error')}")
+            else:
+                print(f"[ERROR] GitHub fetch failed: {fetch_result.get('error')}")
     except Exception as e:
         print("Unable to perform scheduled hands-on evaluator:", e)
     finally:
@@ -0,0 +1,229 @@
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "32"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "4"))
+# Below this many remaining calls, requests are spread evenly over the rest of the window
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "100"))
+GITHUB_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_MAX_WAIT_SECONDS", "60"))
+ETAG_CACHE_SIZE = 512
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+def _endpoint_key(method: str, url: str) -> str:
+    """Collapses owner/repo names, SHAs and file paths so metrics group by endpoint."""
+    parts = urlparse(url).path.strip("/").split("/")
+    normalized = []
+    i = 0
+    while i < len(parts):
+        part = parts[i]
+        if part in ("repos", "orgs", "users") and i + 1 < len(parts):
+            normalized.append(part)
+            if part == "repos" and i + 2 < len(parts):
+                normalized.append("{owner}/{repo}")
+                i += 3
+            else:
+                normalized.append("{owner}")
+                i += 2
+            continue
+        if part in ("contents", "collaborators", "ref", "refs") and i + 1 < len(parts):
+            normalized.append(f"{part}/{{path}}")
+            break
+        normalized.append("{sha}" if _SHA_RE.match(part) else part)
+        i += 1
+    return f"{method.upper()} /" + "/".join(normalized)
+
+
+class GitHubClient:
+    """
+    Shared GitHub REST client: one pooled session per token, ETag/If-None-Match caching
+    for GETs, pacing from the X-RateLimit-* headers, retries with jittered backoff on
+    rate limits and transient errors, and per-endpoint call counts and latencies.
+    """
+
+    def __init__(self, github_token: str):
+        self.github_token = github_token
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=GITHUB_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"token {github_token}",
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "Python-Script"  # GitHub requires a User-Agent
+        })
+        self._etag_cache: "OrderedDict[str, requests.Response]" = OrderedDict()
+        self._rate_limit = {"remaining": None, "reset": None}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+        accept = (headers or {}).get("Accept", self.session.headers["Accept"])
+        query = urlencode(sorted((params or {}).items()))
+        return f"{accept} {url}?{query}"
+
+    def _pace(self):
+        with self._lock:
+            remaining = self._rate_limit["remaining"]
+            reset = self._rate_limit["reset"]
+        if remaining is None or reset is None or remaining >= GITHUB_RATE_LIMIT_RESERVE:
+            return
+        window = max(reset - time.time(), 0)
+        delay = window / (remaining + 1) if remaining > 0 else window
+        if delay > 0:
+            print(f"[DEBUG] GitHub rate limit low ({remaining} left), pacing for {delay:.2f}s")
+            time.sleep(min(delay, GITHUB_MAX_WAIT_SECONDS))
+
+    def _record(self, endpoint: str, elapsed: float, status_code: Optional[int]):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                "calls": 0, "errors": 0, "not_modified": 0, "retries": 0,
+                "total_seconds": 0.0, "max_seconds": 0.0
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if status_code is None or status_code >= 400:
+                stats["errors"] += 1
+            elif status_code == 304:
+                stats["not_modified"] += 1
+
+    def _update_rate_limit(self, response: requests.Response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            with self._lock:
+                self._rate_limit["remaining"] = int(remaining)
+                self._rate_limit["reset"] = int(reset)
+
+    @staticmethod
+    def _retry_delay(method: str, response: Optional[requests.Response], attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if the response should not be retried.
+        Rate-limited requests were never processed and are always retried; server and
+        connection errors are only retried for idempotent methods.
+        """
+        backoff = min(2 ** attempt, 30) * (0.5 + random.random())
+        if response is None or response.status_code >= 500:
+            return backoff if method.upper() != "POST" else None
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                return float(retry_after) + random.random()
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                reset = int(response.headers.get("X-RateLimit-Reset", "0"))
+                return max(reset - time.time(), 0) + random.random()
+            if "rate limit" in response.text.lower():
+                return backoff
+        return None
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                headers: Optional[Dict[str, str]] = None, stream: bool = False, **kwargs) -> requests.Response:
+        if not url.startswith("http"):
+            url = f"{GITHUB_API_URL.rstrip('/')}/{url.lstrip('/')}"
+        endpoint = _endpoint_key(method, url)
+        headers = dict(headers or {})
+
+        cache_key = None
+        cached = None
+        if method.upper() == "GET" and not stream:
+            cache_key = self._cache_key(url, params, headers)
+            with self._lock:
+                cached = self._etag_cache.get(cache_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached.headers["ETag"]
+
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            self._pace()
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, params=params, headers=headers, stream=stream, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if attempt == GITHUB_MAX_RETRIES or method.upper() == "POST":
+                    self._record(endpoint, time.monotonic() - started, None)
+                    raise
+                print(f"[WARN] GitHub connection error on {endpoint}: {e}")
+            else:
+                self._update_rate_limit(response)
+            self._record(endpoint, time.monotonic() - started, response.status_code if response is not None else None)
+
+            delay = self._retry_delay(method, response, attempt) if attempt < GITHUB_MAX_RETRIES else None
+            if delay is None:
+                break
+            with self._lock:
+                self._stats[endpoint]["retries"] += 1
+            print(f"[WARN] Retrying {endpoint} in {delay:.2f}s (attempt {attempt + 1})")
+            time.sleep(min(delay, GITHUB_MAX_WAIT_SECONDS))
+
+        if cache_key is not None:
+            if response.status_code == 304 and cached is not None:
+                return cached
+            if response.status_code == 200 and response.headers.get("ETag"):
+                with self._lock:
+                    self._etag_cache[cache_key] = response
+                    self._etag_cache.move_to_end(cache_key)
+                    while len(self._etag_cache) > ETAG_CACHE_SIZE:
+                        self._etag_cache.popitem(last=False)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                endpoint: dict(stats, avg_seconds=stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0)
+                for endpoint, stats in self._stats.items()
+            }
+            return {"rate_limit": dict(self._rate_limit), "endpoints": endpoints}
+
+
+_clients: Dict[str, GitHubClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_github_client(github_token: Optional[str] = None) -> GitHubClient:
+    """Returns the shared client for github_token (defaults to GITHUB_TOKEN)."""
+    token = github_token if github_token is not None else os.getenv("GITHUB_TOKEN", "")
+    with _clients_lock:
+        if token not in _clients:
+            _clients[token] = GitHubClient(token)
+        return _clients[token]
+
+
+def get_github_stats() -> Dict[str, Any]:
+    """Per-endpoint metrics of every shared client, without exposing tokens."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    merged = {"rate_limits": [], "endpoints": {}}
+    for client in clients:
+        stats = client.get_stats()
+        merged["rate_limits"].append(stats["rate_limit"])
+        for endpoint, values in stats["endpoints"].items():
+            total = merged["endpoints"].setdefault(endpoint, dict.fromkeys(values, 0))
+            for key, value in values.items():
+                total[key] = max(total[key], value) if key == "max_seconds" else total[key] + value
+    for total in merged["endpoints"].values():
+        total["avg_seconds"] = total["total_seconds"] / total["calls"] if total["calls"] else 0.0
+    return merged
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def strong_etag(*parts: Any) -> str:
+    """Quoted strong ETag over the canonical JSON of parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header names etag (weak validators compare by their opaque tag)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str = "private, no-cache") -> Optional[Response]:
+    """
+    Sets the validator headers on response and returns the 304 to send instead when the
+    client's If-None-Match already names etag; None when the full body is needed.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
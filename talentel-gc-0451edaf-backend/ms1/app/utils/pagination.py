@@ -0,0 +1,111 @@
+import base64
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# Below this many estimated rows an approximate count is replaced by the exact one
+APPROX_COUNT_THRESHOLD = int(os.getenv("APPROX_COUNT_THRESHOLD", "10000"))
+COUNT_MODES = ["exact", "approx", "none"]
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque keyset cursor holding the sort key of the last row of a page."""
+    payload = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """The sort key in cursor (None without one); 400 if it is malformed or not size values long."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, compiled together with its bound parameters."""
+
+    inherit_cache = True
+    _traverse_internals = [("statement", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def explain_plan(connection: Connection, statement) -> Dict[str, Any]:
+    """The root node of the PostgreSQL plan of statement, with its bound parameters."""
+    plan = connection.execute(_Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def count_rows(db: Session, query: Query, mode: str = "exact"):
+    """
+    (total, is_estimate) of query. "approx" uses the planner's row estimate on PostgreSQL
+    when it is at least APPROX_COUNT_THRESHOLD; "none" skips counting (total is None).
+    """
+    if mode == "none":
+        return None, False
+    if mode == "approx" and db.get_bind().dialect.name == "postgresql":
+        estimate = int(explain_plan(db.connection(), query.statement)["Plan Rows"])
+        if estimate >= APPROX_COUNT_THRESHOLD:
+            return estimate, True
+    return query.count(), False
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    order_by: Sequence,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    descending: bool = False,
+) -> Dict[str, Any]:
+    """
+    One page of query ordered by the columns in order_by, the last of which must be
+    unique (the id). With a cursor the page starts after the row it encodes (keyset
+    pagination, page is ignored); without one page/page_size select it by offset.
+    Returns items, total (see count_rows), total_is_estimate and next_cursor, which is
+    None on the last page.
+    """
+    total, total_is_estimate = count_rows(db, query, count)
+    after = decode_cursor(cursor, len(order_by))
+    if after is not None:
+        position = tuple_(*order_by)
+        query = query.filter(position < tuple_(*after) if descending else position > tuple_(*after))
+    query = query.order_by(*[column.desc() if descending else column for column in order_by])
+    if after is None and page > 1:
+        query = query.offset((page - 1) * page_size)
+    items = query.limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in order_by])
+    return {
+        "items": items,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,183 @@
+import base64
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+from git import Repo
+from git.exc import GitCommandError
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _auth_env(token: Optional[str]) -> Dict[str, str]:
+    """
+    Git environment that sends token as an HTTP Authorization header for one command
+    (GIT_CONFIG_* needs git 2.31+), keeping it out of the mirror's config and the argv.
+    """
+    if not token:
+        return {}
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraheader",
+        "GIT_CONFIG_VALUE_0": f"AUTHORIZATION: basic {credentials}",
+    }
+
+
+class RepoMirrorCache:
+    """
+    Keeps one bare mirror per assignment repo under cache_dir.
+    Mirrors are updated with incremental fetches and evaluations get detached
+    `git worktree` checkouts, so re-evaluating a repo never re-downloads it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv("REPO_MIRROR_CACHE_DIR", os.path.join(os.getcwd(), "repo_mirrors"))
+        self.max_size_bytes = int(max_size_mb or os.getenv("REPO_MIRROR_CACHE_MAX_MB", "2048")) * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def mirror_path(self, repo_full_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{repo_full_name.replace('/', '_')}.git")
+
+    def _lock_for(self, mirror_path: str) -> threading.Lock:
+        with self._locks_guard:
+            if mirror_path not in self._locks:
+                self._locks[mirror_path] = threading.Lock()
+            return self._locks[mirror_path]
+
+    @staticmethod
+    def _has_commit(repo: Repo, commit_sha: str) -> bool:
+        try:
+            repo.git.cat_file("-e", f"{commit_sha}^{{commit}}")
+            return True
+        except GitCommandError:
+            return False
+
+    def _ensure_mirror_locked(self, repo_url: str, repo_full_name: str, commit_sha: Optional[str],
+                              token: Optional[str]) -> Repo:
+        path = self.mirror_path(repo_full_name)
+        env = _auth_env(token)
+        if not os.path.exists(path):
+            print(f"[DEBUG] Creating mirror for '{repo_full_name}' at '{path}'")
+            repo = Repo.clone_from(repo_url, path, mirror=True, env=env)
+        else:
+            repo = Repo(path)
+            # Also scrubs credentials that older mirrors kept in their origin URL
+            repo.git.remote("set-url", "origin", repo_url)
+            if commit_sha is None or not self._has_commit(repo, commit_sha):
+                print(f"[DEBUG] Fetching updates into mirror '{path}'")
+                with repo.git.custom_environment(**env):
+                    repo.git.fetch("--prune", "origin")
+        repo.git.worktree("prune")
+        os.utime(path, None)
+        return repo
+
+    def ensure_mirror(self, repo_url: str, repo_full_name: str, commit_sha: Optional[str] = None,
+                      token: Optional[str] = None) -> Repo:
+        """
+        Creates the mirror on first use, otherwise fetches only when commit_sha is missing.
+        Callers for the same repo serialise on the mirror lock, so a fetch done by one
+        evaluation is reused by every evaluation waiting behind it. repo_url must not
+        carry credentials: token is handed to each git command and never stored.
+        """
+        with self._lock_for(self.mirror_path(repo_full_name)):
+            return self._ensure_mirror_locked(repo_url, repo_full_name, commit_sha, token)
+
+    def checkout(self, repo_url: str, repo_full_name: str, commit_sha: str, target_dir: str,
+                 token: Optional[str] = None) -> str:
+        """Adds a detached worktree of commit_sha at target_dir, backed by the mirror's object store."""
+        # One critical section, so evict cannot drop the mirror before it has the worktree
+        with self._lock_for(self.mirror_path(repo_full_name)):
+            repo = self._ensure_mirror_locked(repo_url, repo_full_name, commit_sha, token)
+            if os.path.exists(target_dir):
+                shutil.rmtree(target_dir, ignore_errors=True)
+                repo.git.worktree("prune")
+            repo.git.worktree("add", "--detach", "--force", target_dir, commit_sha)
+        print(f"[DEBUG] Checked out commit {commit_sha} into worktree '{target_dir}'")
+        self.evict()
+        return target_dir
+
+    def export_paths(self, repo_url: str, repo_full_name: str, commit_sha: str, target_dir: str,
+                     paths: List[str], token: Optional[str] = None) -> str:
+        """Writes only the given paths at commit_sha into target_dir, read straight from the mirror."""
+        os.makedirs(target_dir, exist_ok=True)
+        # The blobs are read under the mirror lock, so evict cannot delete it mid-export
+        with self._lock_for(self.mirror_path(repo_full_name)):
+            repo = self._ensure_mirror_locked(repo_url, repo_full_name, commit_sha, token)
+            for path in paths:
+                try:
+                    # GitPython strips a trailing newline from command output unless told not to
+                    content = repo.git.cat_file("blob", f"{commit_sha}:{path}", stdout_as_string=False,
+                                                strip_newline_in_stdout=False)
+                except GitCommandError:
+                    print(f"[WARN] '{path}' not found at {commit_sha} in mirror of '{repo_full_name}'")
+                    continue
+                dest = os.path.join(target_dir, *path.split("/"))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as f:
+                    f.write(content)
+        print(f"[DEBUG] Exported {len(paths)} paths at {commit_sha} into '{target_dir}'")
+        return target_dir
+
+    def release(self, repo_full_name: str, target_dir: str):
+        """Removes a worktree created by checkout()."""
+        path = self.mirror_path(repo_full_name)
+        if not os.path.exists(path):
+            return
+        with self._lock_for(path):
+            try:
+                Repo(path).git.worktree("remove", "--force", target_dir)
+            except GitCommandError as e:
+                print(f"[WARN] Could not remove worktree {target_dir}: {e}")
+
+    def evict(self):
+        """Drops least recently used mirrors until the cache fits in max_size_bytes."""
+        mirrors = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), path, _dir_size(path)))
+        total = sum(size for _, _, size in mirrors)
+        for _, path, size in sorted(mirrors):
+            if total <= self.max_size_bytes:
+                break
+            lock = self._lock_for(path)
+            # Skip mirrors that are being fetched or checked out right now
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                # Worktrees already deleted by safe_cleanup only leave stale metadata behind
+                Repo(path).git.worktree("prune")
+                worktrees = os.path.join(path, "worktrees")
+                if os.path.exists(worktrees) and os.listdir(worktrees):
+                    continue
+                print(f"[INFO] Evicting mirror '{path}' ({size} bytes, last used {time.ctime(os.path.getmtime(path))})")
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+            finally:
+                lock.release()
+
+
+_mirror_cache: Optional[RepoMirrorCache] = None
+_mirror_cache_guard = threading.Lock()
+
+
+def get_mirror_cache() -> RepoMirrorCache:
+    global _mirror_cache
+    with _mirror_cache_guard:
+        if _mirror_cache is None:
+            _mirror_cache = RepoMirrorCache()
+        return _mirror_cache
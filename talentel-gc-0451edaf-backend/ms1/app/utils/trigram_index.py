@@ -0,0 +1,110 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+# pg_trgm splits text into words on anything that is not alphanumeric
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Share of the query's trigrams a text must contain to match fuzzily (pg_trgm's default
+# word_similarity_threshold)
+FUZZY_THRESHOLD = 0.6
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of text as pg_trgm extracts them: per lowercase word padded as '  word '."""
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _prefix_trigrams(query: str) -> Set[str]:
+    """Trigrams every word starting with query contains (the query padded only in front)."""
+    grams = set()
+    for word in _WORD_RE.findall(query.lower()):
+        padded = f"  {word}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _inner_trigrams(query: str) -> Set[str]:
+    """Trigrams every text containing query as a substring contains (no padding)."""
+    query = query.lower()
+    return {query[i:i + 3] for i in range(len(query) - 2) if _WORD_RE.fullmatch(query[i:i + 3])}
+
+
+class TrigramIndex:
+    """
+    In-process stand-in for pg_trgm GIN indexes over a few text fields per document, for
+    databases without the extension. Matches and ranks like the SQL typeahead: substring
+    or fuzzy trigram matches (prefix-only below three characters), ordered by prefix tier
+    plus the share of the query's trigrams found.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[Any, Dict[str, str]]]):
+        self.documents: Dict[Any, Dict[str, str]] = {}
+        self.postings: Dict[str, Set[Any]] = {}
+        # doc_id -> [(lowercase value, its trigrams)], so searches do no per-document parsing
+        self._values: Dict[Any, List[Tuple[str, Set[str]]]] = {}
+        for doc_id, fields in documents:
+            self.documents[doc_id] = fields
+            values = []
+            for value in fields.values():
+                grams = trigrams(value)
+                values.append(((value or "").lower(), grams))
+                for gram in grams:
+                    self.postings.setdefault(gram, set()).add(doc_id)
+            self._values[doc_id] = values
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _all_of(self, grams: Set[str]) -> Set[Any]:
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        if not postings:
+            return set()
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+        return result
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, Any]]:
+        """(score, doc_id) of the best matches, best first."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        if len(query) < 3:
+            candidates = self._all_of(_prefix_trigrams(query))
+        else:
+            inner = _inner_trigrams(query)
+            candidates = self._all_of(inner) if inner else set(self.documents)
+            needed = math.ceil(FUZZY_THRESHOLD * len(query_grams))
+            hits = Counter(doc_id for gram in query_grams for doc_id in self.postings.get(gram, ()))
+            candidates |= {doc_id for doc_id, count in hits.items() if count >= needed}
+
+        scored = []
+        word_start = f" {query}"
+        for doc_id in candidates:
+            values = self._values[doc_id]
+            tier = 0
+            similarity = 0.0
+            contains = False
+            for value, grams in values:
+                if value.startswith(query):
+                    tier = 2
+                elif tier == 0 and word_start in value:
+                    tier = 1
+                contains = contains or query in value
+                if query_grams:
+                    similarity = max(similarity, len(query_grams & grams) / len(query_grams))
+            if len(query) < 3:
+                matched = tier > 0
+            else:
+                matched = contains or similarity >= FUZZY_THRESHOLD
+            if matched:
+                scored.append((-(tier + similarity), values[0][0], doc_id))
+        return [(-score, doc_id) for score, _, doc_id in heapq.nsmallest(limit, scored)]
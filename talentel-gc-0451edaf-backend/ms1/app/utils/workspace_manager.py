@@ -0,0 +1,283 @@
+import os
+import shutil
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+LEASE_DIR = ".leases"
+# Leases of other processes older than this are orphans even if their pid cannot be checked
+ORPHAN_MAX_AGE_SECONDS = 24 * 3600
+
+
+def _on_rm_error(func, path, exc_info):
+    try:
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    except Exception as e:
+        print(f"[ERROR] Could not forcibly remove {path}: {e}")
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _process_start(pid: int) -> Optional[str]:
+    """Start time of pid in clock ticks since boot (Linux), which tells a reused pid apart."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Field 22; the command name in field 2 may itself contain spaces
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def _pid_alive(pid: int, start: Optional[str] = None) -> Optional[bool]:
+    """
+    Whether the process that wrote a lease still runs: pid must exist and, when the lease
+    recorded one, still have the same start time. None when that cannot be checked.
+    """
+    current_start = _process_start(pid)
+    if start and current_start:
+        return start == current_start
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _default_root() -> str:
+    root = os.getenv("EVAL_WORKSPACE_ROOT")
+    if root:
+        return root
+    if os.getenv("EVAL_WORKSPACE_TMPFS", "false").lower() == "true" and os.path.isdir("/dev/shm"):
+        return "/dev/shm/talentel-eval"
+    return os.path.join(os.getcwd(), "temp_repos")
+
+
+class WorkspaceManager:
+    """
+    Hands out evaluation directories under one root (EVAL_WORKSPACE_ROOT, or tmpfs with
+    EVAL_WORKSPACE_TMPFS=true). Every lease is charged at least reserve_mb until its
+    directory grows past that, and admission waits while the charged total would exceed
+    the size quota. Released directories are always reclaimed (failed deletions are
+    retried on every admission), and sweep_orphans removes directories left behind by
+    crashed runs.
+    """
+
+    def __init__(self, root: Optional[str] = None, quota_mb: Optional[int] = None,
+                 admission_timeout: Optional[float] = None, reserve_mb: Optional[int] = None):
+        self.root = root or _default_root()
+        self.quota_bytes = int(quota_mb or os.getenv("EVAL_WORKSPACE_QUOTA_MB", "4096")) * 1024 * 1024
+        self.admission_timeout = float(admission_timeout or os.getenv("EVAL_WORKSPACE_ADMISSION_TIMEOUT", "900"))
+        # Expected size of one evaluation workspace, held for a lease while its clone is still smaller
+        self.reserve_bytes = int(reserve_mb or os.getenv("EVAL_WORKSPACE_RESERVE_MB", "256")) * 1024 * 1024
+        os.makedirs(os.path.join(self.root, LEASE_DIR), exist_ok=True)
+        # Only the lease table and the removal sets are guarded by _cond; disk scans and
+        # deletions run unlocked, kept apart by holding a path in _leases or _removing
+        self._leases: Dict[str, float] = {}
+        self._pending_removal = set()
+        self._removing = set()
+        self._cond = threading.Condition()
+
+    def _lease_file(self, path: str) -> str:
+        return os.path.join(self.root, LEASE_DIR, os.path.basename(path))
+
+    def _remove(self, path: str) -> bool:
+        for attempt in range(3):
+            if not os.path.exists(path):
+                return True
+            shutil.rmtree(path, onerror=_on_rm_error)
+            if not os.path.exists(path):
+                return True
+            time.sleep(0.5 * (attempt + 1))
+        return not os.path.exists(path)
+
+    def _reclaim_pending(self):
+        with self._cond:
+            paths = self._pending_removal - self._removing
+            self._removing |= paths
+        if not paths:
+            return
+        reclaimed = {path for path in paths if self._remove(path)}
+        with self._cond:
+            self._removing -= paths
+            self._pending_removal -= reclaimed
+            self._cond.notify_all()
+        for path in reclaimed:
+            print(f"[INFO] Reclaimed workspace {path}")
+
+    def _disk_sizes(self) -> Dict[str, int]:
+        """Bytes on disk of every directory under the root; walks the tree, so never called under _cond."""
+        return {
+            os.path.join(self.root, name): _dir_size(os.path.join(self.root, name))
+            for name in os.listdir(self.root) if name != LEASE_DIR
+        }
+
+    def _charge(self, sizes: Dict[str, int]) -> int:
+        """Charged bytes for measured sizes; leases not on disk yet still count their reservation. Needs _cond."""
+        charged = sum(size for path, size in sizes.items() if path not in self._leases)
+        return charged + sum(max(sizes.get(path, 0), self.reserve_bytes) for path in self._leases)
+
+    def usage_bytes(self) -> int:
+        return sum(self._disk_sizes().values())
+
+    def charged_bytes(self) -> int:
+        """Bytes on disk plus what the leased directories are still expected to grow by."""
+        sizes = self._disk_sizes()
+        with self._cond:
+            return self._charge(sizes)
+
+    def acquire(self, name: str) -> str:
+        """
+        Returns an empty directory root/name leased to the caller, waiting up to
+        admission_timeout seconds until its reservation fits in the quota. A lone lease
+        is admitted as long as the root is under quota, whatever the reservation.
+        """
+        path = os.path.join(self.root, name)
+        deadline = time.monotonic() + self.admission_timeout
+        while True:
+            self._reclaim_pending()
+            sizes = self._disk_sizes()
+            with self._cond:
+                if path in self._leases:
+                    raise RuntimeError(f"Workspace {path} is already in use")
+                usage = self._charge(sizes)
+                fits = usage + self.reserve_bytes <= self.quota_bytes or (not self._leases and usage < self.quota_bytes)
+                if fits and path not in self._removing:
+                    # Claimed before the lock is dropped, so concurrent admissions charge its reservation
+                    self._leases[path] = time.time()
+                    self._pending_removal.discard(path)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(f"Evaluation workspace quota exceeded ({usage} of {self.quota_bytes} bytes charged)")
+                if not fits:
+                    print(f"[INFO] Workspace quota is taken ({usage} bytes charged), waiting for space")
+                self._cond.wait(timeout=min(remaining, 5))
+
+        # The lease keeps every other caller off path, so clearing and creating it runs unlocked
+        try:
+            if not self._remove(path):
+                raise RuntimeError(f"Workspace {path} is already in use")
+            os.makedirs(path)
+            with open(self._lease_file(path), "w") as f:
+                f.write(f"{os.getpid()} {_process_start(os.getpid()) or ''}".strip())
+        except BaseException:
+            with self._cond:
+                self._leases.pop(path, None)
+                self._pending_removal.add(path)
+                self._cond.notify_all()
+            raise
+        return path
+
+    def release(self, path: str):
+        """Deletes a leased directory. If deletion fails it is retried on later admissions."""
+        # Still leased while it is deleted, so nobody can acquire the same path meanwhile
+        removed = self._remove(path)
+        if removed:
+            print(f"[INFO] Successfully cleaned up: {path}")
+        else:
+            print(f"[WARN] Could not clean up {path}, will retry")
+        try:
+            os.remove(self._lease_file(path))
+        except FileNotFoundError:
+            pass
+        with self._cond:
+            self._leases.pop(path, None)
+            if not removed:
+                self._pending_removal.add(path)
+            self._cond.notify_all()
+
+    @contextmanager
+    def workspace(self, name: str):
+        path = self.acquire(name)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def _lease_alive(self, lease_file: str, now: float) -> bool:
+        """Whether the lease was written by a process that still runs (never by this one, see sweep_orphans)."""
+        try:
+            with open(lease_file) as f:
+                fields = f.read().split()
+            pid, start = int(fields[0]), (fields[1] if len(fields) > 1 else None)
+        except (OSError, ValueError, IndexError):
+            return False
+        if pid == os.getpid():
+            return False
+        alive = _pid_alive(pid, start)
+        if alive is None:
+            try:
+                return now - os.path.getmtime(lease_file) < ORPHAN_MAX_AGE_SECONDS
+            except OSError:
+                return False
+        return alive
+
+    def sweep_orphans(self):
+        """
+        Removes directories under the root that no live process holds a lease on. This
+        process' own leases are all in memory, so one of its pid that is not is left over
+        by an earlier run that had the same pid (e.g. after a container restart).
+        """
+        now = time.time()
+        with self._cond:
+            orphans = []
+            for name in os.listdir(self.root):
+                if name == LEASE_DIR:
+                    continue
+                path = os.path.join(self.root, name)
+                if path in self._leases or path in self._removing:
+                    continue
+                lease_file = self._lease_file(path)
+                if os.path.exists(lease_file) and self._lease_alive(lease_file, now):
+                    continue
+                orphans.append(path)
+            self._removing.update(orphans)
+
+        failed = []
+        for path in orphans:
+            print(f"[INFO] Removing orphaned workspace {path}")
+            if not self._remove(path):
+                failed.append(path)
+            try:
+                os.remove(self._lease_file(path))
+            except FileNotFoundError:
+                pass
+
+        with self._cond:
+            self._removing.difference_update(orphans)
+            self._pending_removal.update(failed)
+            for name in os.listdir(os.path.join(self.root, LEASE_DIR)):
+                if not os.path.exists(os.path.join(self.root, name)):
+                    lease_file = os.path.join(self.root, LEASE_DIR, name)
+                    if os.path.join(self.root, name) not in self._leases and not self._lease_alive(lease_file, now):
+                        os.remove(lease_file)
+            self._cond.notify_all()
+
+
+_workspace_manager: Optional[WorkspaceManager] = None
+_workspace_manager_guard = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    global _workspace_manager
+    with _workspace_manager_guard:
+        if _workspace_manager is None:
+            _workspace_manager = WorkspaceManager()
+        return _workspace_manager
@@ -0,0 +1,48 @@
+"""hot path indexes
+
+Secondary indexes for the lookups behind the dashboards, evaluations and permission
+checks. They are built concurrently so upgrading a live database does not block writes;
+scripts/check_query_plans.py verifies the planner uses them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 17:18:19.713661
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_test_assign_test_id', 'test_assign', ['test_id']),
+    ('ix_quiz_results_user_quiz', 'quiz_results', ['user_id', 'quiz_id']),
+    ('ix_debug_results_debug_user', 'debug_results', ['debug_id', 'user_id']),
+    ('ix_hands_on_results_handson_user', 'hands_on_results', ['handson_id', 'user_id']),
+    ('ix_collaborators_collaborator_id', 'collaborators', ['collaborator_id']),
+    ('ix_topics_tech_stack_id', 'topics', ['tech_stack_id']),
+    ('ix_tests_created_by', 'tests', ['created_by']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,35 @@
+"""quiz results by quiz
+
+Serves the per-test attempts listing, which reads every result of one quiz; the
+existing (user_id, quiz_id) index cannot be used without a user_id.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 19:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_quiz_results_quiz_user', 'quiz_results', ['quiz_id', 'user_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_quiz_results_quiz_user', table_name='quiz_results',
+                      postgresql_concurrently=True, if_exists=True)
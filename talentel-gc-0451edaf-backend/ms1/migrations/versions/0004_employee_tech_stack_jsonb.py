@@ -0,0 +1,42 @@
+"""employee tech stack jsonb
+
+Turns employees.tech_stack into JSONB with a GIN index so the employee skill filters
+run as indexed containment queries instead of substring scans of every row. The type
+change rewrites the table under an exclusive lock; the index is built concurrently.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 19:41:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('employees', 'tech_stack', type_=postgresql.JSONB(astext_type=sa.Text()),
+                    existing_type=sa.JSON(), existing_nullable=True, postgresql_using='tech_stack::jsonb')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_employees_tech_stack', 'employees', ['tech_stack'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_employees_tech_stack', table_name='employees',
+                      postgresql_concurrently=True, if_exists=True)
+    op.alter_column('employees', 'tech_stack', type_=sa.JSON(),
+                    existing_type=postgresql.JSONB(astext_type=sa.Text()), existing_nullable=True,
+                    postgresql_using='tech_stack::json')
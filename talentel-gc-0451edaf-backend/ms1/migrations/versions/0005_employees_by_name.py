@@ -0,0 +1,35 @@
+"""employees by name
+
+Lets keyset pages of the employee listing sorted by name start from an index range
+instead of sorting every matching employee.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 20:16:05.337941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_employees_name_user_id', 'employees', ['name', 'user_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_employees_name_user_id', table_name='employees',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,57 @@
+"""typeahead trigram indexes
+
+Installs pg_trgm and indexes employee names and emails and test names with GIN trigram
+indexes for the typeahead search; the existing ILIKE '%q%' searches use them too.
+Where the extension cannot be installed the indexes are skipped and the typeahead
+falls back to its in-process index.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 21:02:41.118306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_employees_name_trgm', 'employees', 'name'),
+    ('ix_employees_email_trgm', 'employees', 'email'),
+    ('ix_tests_test_name_trgm', 'tests', 'test_name'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().as_sql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    else:
+        bind = op.get_bind()
+        try:
+            with bind.begin_nested():
+                bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except sa.exc.DBAPIError as e:
+            print(f"[WARN] pg_trgm is not available, skipping the trigram indexes: {e.orig}")
+            return
+
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension stays installed; other schemas may depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
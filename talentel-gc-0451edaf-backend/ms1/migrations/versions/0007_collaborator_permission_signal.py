@@ -0,0 +1,52 @@
+"""collaborator permission signal
+
+Notifies the collaborator_permissions channel with the affected user_id whenever a
+collaborators row changes, so every worker drops its cached permissions of that user.
+A trigger rather than the application signals changes from any writer, including
+ON DELETE CASCADE from tech_stack and manual SQL. Notifications are delivered on commit.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 22:14:37.502118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_collaborator_permissions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM pg_notify('collaborator_permissions', OLD.collaborator_id::text);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM pg_notify('collaborator_permissions', NEW.collaborator_id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS collaborators_notify_permissions ON collaborators")
+    op.execute("""
+        CREATE TRIGGER collaborators_notify_permissions
+        AFTER INSERT OR UPDATE OR DELETE ON collaborators
+        FOR EACH ROW EXECUTE FUNCTION notify_collaborator_permissions()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS collaborators_notify_permissions ON collaborators")
+    op.execute("DROP FUNCTION IF EXISTS notify_collaborator_permissions()")
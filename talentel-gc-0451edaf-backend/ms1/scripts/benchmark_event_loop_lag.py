@@ -0,0 +1,124 @@
+"""
+Measures event-loop lag while skill-upgrade database work runs concurrently.
+
+A heartbeat task sleeps HEARTBEAT_MS at a time on the event loop and records how late
+it wakes up. Meanwhile --concurrency coroutines each run --requests rounds of the
+skill-upgrade request's lookups (employee by email, tech stack by name) and the
+generation's topic load, behind a pg_sleep of --query-ms that stands in for a busy
+database. Both modes run the same work:
+
+  before  sync Sessions called straight from the coroutines, as the handlers did
+  after   AsyncSession for the request queries and asyncio.to_thread for the sync
+          generation work, as the handlers and skill_upgrade_service do now
+
+Prints the heartbeat lag percentiles and the wall time per mode. Needs a database at
+DATABASE_URL with at least one employee and one tech stack.
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/benchmark_event_loop_lag.py --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select, text
+
+from app.config.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.models import Employee, TechStack
+from app.services.skill_upgrade_service import _load_upgrade_topics
+
+HEARTBEAT_MS = 5
+SLOW_QUERY = text("SELECT pg_sleep(:seconds)")
+
+
+def _request_sync(email: str, tech_stack: str, seconds: float):
+    db = SessionLocal()
+    try:
+        db.execute(SLOW_QUERY, {"seconds": seconds})
+        db.query(Employee).filter(Employee.email == email).first()
+        db.query(TechStack).filter(TechStack.name == tech_stack).first()
+        _load_upgrade_topics(db, tech_stack)
+    finally:
+        db.close()
+
+
+async def request_before(email: str, tech_stack: str, seconds: float):
+    _request_sync(email, tech_stack, seconds)
+
+
+async def request_after(email: str, tech_stack: str, seconds: float):
+    async with AsyncSessionLocal() as db:
+        await db.execute(SLOW_QUERY, {"seconds": seconds})
+        await db.scalar(select(Employee).where(Employee.email == email))
+        await db.scalar(select(TechStack).where(TechStack.name == tech_stack))
+    db = SessionLocal()
+    try:
+        await asyncio.to_thread(_load_upgrade_topics, db, tech_stack)
+    finally:
+        await asyncio.to_thread(db.close)
+
+
+async def heartbeat(lags: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(HEARTBEAT_MS / 1000)
+        lags.append((loop.time() - started) * 1000 - HEARTBEAT_MS)
+
+
+async def run_mode(request, email: str, tech_stack: str, args) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+
+    async def worker():
+        for _ in range(args.requests):
+            await request(email, tech_stack, args.query_ms / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    # Pooled asyncpg connections belong to this loop
+    await async_engine.dispose()
+    lags.sort()
+    return {
+        "p50": statistics.median(lags),
+        "p99": lags[int(len(lags) * 0.99) - 1] if len(lags) >= 100 else lags[-1],
+        "max": lags[-1],
+        "beats": len(lags),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent requests")
+    parser.add_argument("--requests", type=int, default=5, help="requests per concurrent worker")
+    parser.add_argument("--query-ms", type=int, default=50, help="simulated database latency per request")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        email = db.scalar(select(Employee.email).order_by(Employee.user_id).limit(1))
+        tech_stack = db.scalar(select(TechStack.name).order_by(TechStack.id).limit(1))
+    finally:
+        db.close()
+    if email is None or tech_stack is None:
+        sys.exit("Needs at least one employee and one tech stack in the database")
+
+    print(f"[INFO] {args.concurrency} workers x {args.requests} requests, {args.query_ms}ms of database time each")
+    print(f"{'mode':<8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'beats':>6} {'wall s':>7}")
+    for mode, request in (("before", request_before), ("after", request_after)):
+        result = asyncio.run(run_mode(request, email, tech_stack, args))
+        print(f"{mode:<8} {result['p50']:>8.1f} {result['p99']:>8.1f} {result['max']:>8.1f} "
+              f"{result['beats']:>6} {result['seconds']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
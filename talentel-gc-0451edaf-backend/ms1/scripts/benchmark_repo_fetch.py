@@ -0,0 +1,163 @@
+"""
+Times every GitHubRepoFetcher fetch mode against today's full clone.
+
+Builds a local bare repository with a long history and large binaries churned along
+the way (or uses --repo), then materialises one commit in the middle of the history
+with each fetch mode. Git modes fetch over file://; the tarball mode downloads from a
+local HTTP server that answers like GitHub's tarball endpoint. Mirror mode is timed
+cold (mirror created by the fetch) and warm (mirror already holds the commit).
+Prints the median wall time and the on-disk size of the fetched directory per mode.
+
+    python scripts/benchmark_repo_fetch.py --commits 1000 --binary-mb 2 --runs 5
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils import repo_mirror_cache
+from app.utils.GithubRepoFetcher import GitHubRepoFetcher
+
+REPO = "bench/exercise"
+
+
+def git(cwd, *args) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def build_repo(base: str, commits: int, binary_mb: int) -> str:
+    """A bare repo of commits commits on main; every tenth commit replaces a binary_mb random file."""
+    work = os.path.join(base, "work")
+    os.makedirs(os.path.join(work, "src"))
+    git(work, "init", "-q", "-b", "main")
+    git(work, "config", "user.email", "bench@example.com")
+    git(work, "config", "user.name", "Bench")
+    for i in range(commits):
+        with open(os.path.join(work, "src", f"module_{i % 50}.py"), "w") as f:
+            f.write(f"VALUE = {i}\n" * 200)
+        if binary_mb and i % 10 == 0:
+            with open(os.path.join(work, "assets.bin"), "wb") as f:
+                f.write(os.urandom(binary_mb * 1024 * 1024))
+        git(work, "add", "-A")
+        git(work, "commit", "-q", "-m", f"commit {i}")
+    bare = os.path.join(base, "exercise.git")
+    git(base, "clone", "-q", "--bare", work, bare)
+    shutil.rmtree(work)
+    return bare
+
+
+def serve_tarballs(bare: str) -> ThreadingHTTPServer:
+    """Answers GET /repos/<owner>/<repo>/tarball/<sha> with git archive output, prefixed like GitHub's."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = re.fullmatch(rf"/repos/{REPO}/tarball/([0-9a-f]{{40}})", self.path)
+            if not match:
+                self.send_error(404)
+                return
+            sha = match.group(1)
+            archive = subprocess.Popen(
+                ["git", "archive", "--format=tar.gz", f"--prefix=bench-exercise-{sha[:7]}/", sha],
+                cwd=bare, stdout=subprocess.PIPE
+            )
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-gzip")
+            self.end_headers()
+            shutil.copyfileobj(archive.stdout, self.wfile)
+            archive.wait()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    # HTTP/1.0 responses end with the connection, so no Content-Length is needed
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
+
+
+def time_mode(mode: str, repo_url: str, api_url: str, sha: str, scratch: str, runs: int):
+    """(median seconds, bytes on disk) of runs fetches of sha in mode."""
+    timings = []
+    size = 0
+    warm_cache = repo_mirror_cache.RepoMirrorCache(cache_dir=os.path.join(scratch, "mirrors-warm"))
+    for run in range(runs + (mode == "mirror-warm")):
+        target_dir = os.path.join(scratch, f"{mode}-{run}")
+        if mode == "mirror-cold":
+            repo_mirror_cache._mirror_cache = repo_mirror_cache.RepoMirrorCache(
+                cache_dir=os.path.join(scratch, f"mirrors-cold-{run}")
+            )
+        elif mode == "mirror-warm":
+            repo_mirror_cache._mirror_cache = warm_cache
+        fetcher = GitHubRepoFetcher("", api_base_url=api_url, fetch_mode=mode.split("-")[0])
+        started = time.perf_counter()
+        fetcher.checkout_commit(repo_url, REPO, sha, target_dir)
+        elapsed = time.perf_counter() - started
+        # The first warm run only creates the mirror
+        if mode != "mirror-warm" or run > 0:
+            timings.append(elapsed)
+        size = dir_size(target_dir)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repo", help="bare repository to fetch from instead of a generated one")
+    parser.add_argument("--commit", help="commit to fetch (default: the middle of main's history)")
+    parser.add_argument("--commits", type=int, default=500, help="commits in the generated repository")
+    parser.add_argument("--binary-mb", type=int, default=1, help="size of the churned binary in the generated repository")
+    parser.add_argument("--runs", type=int, default=3, help="fetches per mode")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="fetch-bench-")
+    try:
+        if args.repo:
+            bare = os.path.abspath(args.repo)
+        else:
+            print(f"[INFO] Building a repository with {args.commits} commits and a {args.binary_mb}MB binary")
+            bare = build_repo(scratch, args.commits, args.binary_mb)
+        history = git(bare, "rev-list", "main").splitlines()
+        sha = args.commit or history[len(history) // 2]
+        print(f"[INFO] Fetching {sha} of {len(history)} commits from {bare} ({dir_size(bare) / 1e6:.1f}MB)")
+
+        server = serve_tarballs(bare)
+        api_url = f"http://127.0.0.1:{server.server_address[1]}"
+        results = {}
+        # Messages of the fetcher itself would drown the table
+        stdout = sys.stdout
+        for mode in ("full", "shallow", "tarball", "mirror-cold", "mirror-warm"):
+            sys.stdout = open(os.devnull, "w")
+            try:
+                results[mode] = time_mode(mode, f"file://{bare}", api_url, sha, scratch, args.runs)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+        server.shutdown()
+
+        baseline = results["full"][0]
+        print(f"{'mode':<12} {'median s':>9} {'vs full':>8} {'disk MB':>8}")
+        for mode, (seconds, size) in results.items():
+            print(f"{mode:<12} {seconds:>9.3f} {baseline / seconds:>7.1f}x {size / 1e6:>8.1f}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Asserts that the hot lookup queries are served by their indexes.
+
+Migrates the database at DATABASE_URL to head, seeds it with a large synthetic
+dataset, runs ANALYZE and checks the EXPLAIN plan of every query in HOT_QUERIES.
+It also runs the test attempts listing for every sort column on tests that lack
+some of their components. Seeding needs an empty scratch database; use --skip-seed
+to check a database that already holds realistic data. Exits with status 1 if any
+query misses its index or fails.
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/check_query_plans.py --scale 5  # 100k employees
+"""
+import argparse
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.exc import DBAPIError
+
+from app.config.database import engine
+from app.models.models import (
+    Collaborator, DebugResult, Employee, HandsOnResult, QuizResult, TestAssign, Test, Topic
+)
+from app.services.employee_service import skill_filters
+from app.services.test_service import ATTEMPT_SORT_COLUMNS, test_attempts_query
+from app.utils.pagination import explain_plan
+
+# (description, statement, index the plan must use, or a tuple of acceptable ones)
+HOT_QUERIES = [
+    ("assignments of a user", select(TestAssign).where(TestAssign.user_id == 42), "uniq_user_test_assign"),
+    ("assignments of a test", select(TestAssign).where(TestAssign.test_id == 42), "ix_test_assign_test_id"),
+    ("quiz results of a user for a quiz",
+     select(QuizResult).where(QuizResult.user_id == 42, QuizResult.quiz_id == 7),
+     ("ix_quiz_results_user_quiz", "ix_quiz_results_quiz_user")),
+    ("quiz results of a user", select(QuizResult).where(QuizResult.user_id == 42), "ix_quiz_results_user_quiz"),
+    ("quiz results of a quiz", select(QuizResult).where(QuizResult.quiz_id == 7), "ix_quiz_results_quiz_user"),
+    ("debug results of a user for an exercise",
+     select(DebugResult).where(DebugResult.debug_id == 7, DebugResult.user_id == 42), "ix_debug_results_debug_user"),
+    ("hands-on results of a user for an exercise",
+     select(HandsOnResult).where(HandsOnResult.handson_id == 7, HandsOnResult.user_id == 42),
+     "ix_hands_on_results_handson_user"),
+    ("collaborations of an employee",
+     select(Collaborator).where(Collaborator.collaborator_id == 42), "ix_collaborators_collaborator_id"),
+    ("topics of a tech stack", select(Topic).where(Topic.tech_stack_id == 7), "ix_topics_tech_stack_id"),
+    ("tests created by an employee", select(Test).where(Test.created_by == 42), "ix_tests_created_by"),
+    ("employee page after a cursor, by name",
+     select(Employee).where(tuple_(Employee.name, Employee.user_id) > tuple_("Employee 5", 5))
+     .order_by(Employee.name, Employee.user_id).limit(11), "ix_employees_name_user_id"),
+    ("test page after a cursor, by name",
+     select(Test).where(tuple_(Test.test_name, Test.id) > tuple_("Test 5", 5))
+     .order_by(Test.test_name, Test.id).limit(11), "tests_test_name_key"),
+    ("employees with a skill", select(Employee).where(*skill_filters(skills="rust")), "ix_employees_tech_stack"),
+    ("employees with a skill at a level",
+     select(Employee).where(*skill_filters(skill_name="rust", skill_level="expert")), "ix_employees_tech_stack"),
+    ("employees with any skill at a level",
+     select(Employee).where(*skill_filters(skill_level="expert")), "ix_employees_tech_stack"),
+]
+
+# Component ids of the tests whose attempts listing must sort by every column; the
+# placeholders of a missing component have to coalesce like real scores
+ATTEMPT_TEST_SHAPES = [
+    ("all components", SimpleNamespace(quiz_id=1, debug_test_id=1, handson_id=1)),
+    ("quiz only", SimpleNamespace(quiz_id=1, debug_test_id=None, handson_id=None)),
+    ("debug only", SimpleNamespace(quiz_id=None, debug_test_id=1, handson_id=None)),
+    ("hands-on only", SimpleNamespace(quiz_id=None, debug_test_id=None, handson_id=1)),
+]
+
+SEED_SQL = """
+INSERT INTO employees (user_id, name, email, hashed_password, role, band, tech_stack)
+SELECT g, 'Employee ' || g, 'employee' || g || '@example.com', 'x',
+       (CASE WHEN g % 100 = 0 THEN 'CapabilityLeader' ELSE 'Employee' END)::roleenum, 'B2'::bandtype,
+       jsonb_build_object('skill' || g % 40, (ARRAY['basic', 'intermediate', 'advanced'])[1 + g % 3],
+                          'skill' || (g * 7) % 40, 'basic')
+       || (CASE WHEN g % 200 = 0 THEN '{"rust": "expert"}' ELSE '{}' END)::jsonb
+FROM generate_series(1, :employees) g;
+
+INSERT INTO tech_stack (id, name, created_by)
+SELECT g, 'Stack ' || g, 100 FROM generate_series(1, :stacks) g;
+
+INSERT INTO topics (topic_id, name, difficulty, tech_stack_id)
+SELECT g, 'Topic ' || g, 'beginner'::difficultylevel, 1 + g % :stacks FROM generate_series(1, :topics) g;
+
+INSERT INTO quizzes (id, tech_stack_id, topic_ids, num_questions, duration, questions)
+SELECT g, 1 + g % :stacks, ARRAY[g], 10, 15, '[]'::json FROM generate_series(1, :exercises) g;
+
+INSERT INTO debug_exercises (id, tech_stack_id, topic_ids, duration)
+SELECT g, 1 + g % :stacks, ARRAY[g], 30 FROM generate_series(1, :exercises) g;
+
+INSERT INTO hands_on (id, tech_stack_id, topic_ids, duration)
+SELECT g, 1 + g % :stacks, ARRAY[g], 60 FROM generate_series(1, :exercises) g;
+
+INSERT INTO tests (id, test_name, duration, created_by, quiz_id, debug_test_id, handson_id)
+SELECT g, 'Test ' || g, 105, 100 * (1 + g % (:employees / 100)),
+       1 + g % :exercises, 1 + g % :exercises, 1 + g % :exercises
+FROM generate_series(1, :tests) g;
+
+INSERT INTO test_assign (user_id, test_id, status, mail_sent, assigned_by)
+SELECT 1 + (g - 1) % :employees, 1 + ((g - 1) / :employees + (g - 1) * 7) % :tests,
+       'assigned'::statustype, 'Sent'::mailstatus, 100
+FROM generate_series(1, :assignments) g
+ON CONFLICT ON CONSTRAINT uniq_user_test_assign DO NOTHING;
+
+INSERT INTO quiz_results (user_id, quiz_id, score, start_time, answers)
+SELECT 1 + g % :employees, 1 + g % :exercises, g % 100, now(), '{}'::json FROM generate_series(1, :results) g;
+
+INSERT INTO debug_results (user_id, debug_id, score)
+SELECT 1 + g % :employees, 1 + g % :exercises, g % 100 FROM generate_series(1, :results) g;
+
+INSERT INTO hands_on_results (user_id, handson_id, score)
+SELECT 1 + g % :employees, 1 + g % :exercises, g % 100 FROM generate_series(1, :results) g;
+
+INSERT INTO collaborators (cl_id, tech_stack_id, collaborator_id)
+SELECT 100, 1 + g % :stacks, 1 + g % :employees FROM generate_series(1, :collaborators) g;
+"""
+
+
+def seed(conn, scale: int):
+    if conn.execute(text("SELECT EXISTS (SELECT 1 FROM employees)")).scalar():
+        sys.exit("Refusing to seed: employees is not empty. Use a scratch database or --skip-seed.")
+    params = {
+        "employees": 20000 * scale, "stacks": 100, "topics": 20000 * scale, "exercises": 2000 * scale,
+        "tests": 5000 * scale, "assignments": 200000 * scale, "results": 200000 * scale,
+        "collaborators": 5000 * scale,
+    }
+    print(f"[INFO] Seeding {params}")
+    for statement in SEED_SQL.split(";"):
+        if statement.strip():
+            conn.execute(text(statement), params)
+    # Explicit ids bypass the sequences, so move them past the seeded rows
+    for table, column in (("employees", "user_id"), ("tech_stack", "id"), ("topics", "topic_id"),
+                          ("quizzes", "id"), ("debug_exercises", "id"), ("hands_on", "id"), ("tests", "id")):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), (SELECT max({column}) FROM {table}))"
+        ))
+
+
+def plan_indexes(node):
+    """Names of every index used anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    found = set()
+    if "Index Name" in node:
+        found.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+def check_attempt_sorts(conn) -> int:
+    """Runs a first and a follow-up attempts page per test shape, sort column and order; returns the failures."""
+    failures = 0
+    for description, test in ATTEMPT_TEST_SHAPES:
+        for sort_by in ATTEMPT_SORT_COLUMNS:
+            for order in ("asc", "desc"):
+                try:
+                    with conn.begin_nested():
+                        page = conn.execute(test_attempts_query(test, sort_by, order).limit(10)).all()
+                        if page:
+                            after = [page[-1].sort_key, page[-1].user_id]
+                            conn.execute(test_attempts_query(test, sort_by, order, after).limit(10)).all()
+                except DBAPIError as e:
+                    failures += 1
+                    print(f"[FAIL] attempts of a {description} test by {sort_by} {order}: {e.orig}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for the seeded row counts")
+    parser.add_argument("--skip-seed", action="store_true", help="check plans against the existing data")
+    args = parser.parse_args()
+
+    command.upgrade(Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini")), "head")
+
+    failures = 0
+    with engine.begin() as conn:
+        if not args.skip_seed:
+            seed(conn, args.scale)
+        conn.execute(text("ANALYZE"))
+        for description, statement, expected in HOT_QUERIES:
+            root = explain_plan(conn, statement)
+            used = plan_indexes(root)
+            ok = bool(used.intersection((expected,) if isinstance(expected, str) else expected))
+            failures += not ok
+            print(f"[{'OK' if ok else 'FAIL'}] {description}: {root['Node Type']}, "
+                  f"indexes {sorted(used) or 'none'} (expected {expected})")
+        sort_failures = check_attempt_sorts(conn)
+    if failures:
+        print(f"[ERROR] {failures} of {len(HOT_QUERIES)} hot queries do not use their index")
+    if sort_failures:
+        print(f"[ERROR] {sort_failures} test attempts sorts failed")
+    if failures or sort_failures:
+        sys.exit(1)
+    print(f"[INFO] All {len(HOT_QUERIES)} hot queries use their index and every test attempts sort runs")
+
+
+if __name__ == "__main__":
+    main()
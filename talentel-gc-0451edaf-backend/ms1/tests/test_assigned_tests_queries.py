@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.controllers.employee_dashboard_controller import get_assigned_tests
+from app.models.models import StatusType
+
+USER_ID = 1
+
+SEED_SQL = """
+INSERT INTO employees (user_id, name, email, hashed_password, role, band)
+VALUES (1, 'Employee 1', 'employee1@example.com', 'x', 'Employee', 'B2'),
+       (2, 'Leader 2', 'leader2@example.com', 'x', 'CapabilityLeader', 'B2');
+
+INSERT INTO tech_stack (id, name, created_by) VALUES (1, 'Python', 2);
+
+INSERT INTO quizzes (id, tech_stack_id, topic_ids, num_questions, duration, questions)
+SELECT g, 1, ARRAY[g], 10, 15, '[]'::json FROM generate_series(1, :assignments) g;
+
+INSERT INTO tests (id, test_name, duration, created_by, quiz_id)
+SELECT g, 'Test ' || g, 15, 2, g FROM generate_series(1, :assignments) g;
+
+INSERT INTO test_assign (user_id, test_id, status, mail_sent, assigned_by, due_date)
+SELECT 1, g, (CASE WHEN g % 2 = 0 THEN 'completed' ELSE 'assigned' END)::statustype,
+       'Sent'::mailstatus, 2, now() + interval '7 days'
+FROM generate_series(1, :assignments) g;
+
+INSERT INTO quiz_results (user_id, quiz_id, score, start_time, answers)
+SELECT 1, g, 80, now(), '{}'::json FROM generate_series(2, :assignments, 2) g;
+"""
+
+
+@pytest.fixture
+def engine(migrated_database):
+    engine = create_engine(migrated_database, poolclass=NullPool)
+    yield engine
+    engine.dispose()
+
+
+def _seed(engine, assignments):
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE employees, tech_stack RESTART IDENTITY CASCADE"))
+        for statement in SEED_SQL.split(";"):
+            if statement.strip():
+                conn.execute(text(statement), {"assignments": assignments})
+
+
+def _count_statements(engine, **params):
+    """Rows returned by get_assigned_tests and the number of statements it sent."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            rows = get_assigned_tests(db=db, principal=SimpleNamespace(user_id=USER_ID), **params)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return rows, len(statements)
+
+
+@pytest.mark.parametrize("params", [
+    {"status": None, "page": 1, "page_size": None},
+    {"status": None, "page": 2, "page_size": 3},
+    {"status": StatusType.completed, "page": 1, "page_size": None},
+], ids=["all", "paginated", "by_status"])
+def test_query_count_does_not_grow_with_assignments(engine, params):
+    counts = {}
+    for assignments in (1, 10, 40):
+        _seed(engine, assignments)
+        rows, counts[assignments] = _count_statements(engine, **params)
+        if params["page_size"] is None and params["status"] is None:
+            assert len(rows) == assignments
+            assert [row.attempted for row in rows] == [test_id % 2 == 0 for test_id in range(1, assignments + 1)]
+
+    assert counts[1] == counts[10] == counts[40], counts
+    assert counts[1] == 1, counts
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import MetaData, create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+from app.config.database import Base
+import app.models.models  # noqa: F401  registers every table on Base.metadata
+
+HEAD = "0007"
+# Indexes added by the revisions after the baseline, which upgrade head must leave in place
+EXPECTED_INDEXES = {
+    "test_assign": {"ix_test_assign_test_id"},
+    "quiz_results": {"ix_quiz_results_user_quiz", "ix_quiz_results_quiz_user"},
+    "employees": {"ix_employees_tech_stack", "ix_employees_name_user_id"},
+    "topics": {"ix_topics_tech_stack_id"},
+    "tests": {"ix_tests_created_by"},
+}
+
+
+def _create_all(url):
+    """The schema as the app's create_all builds it, minus the pg_trgm indexes (see migration 0006)."""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for index in [index for index in copy.indexes if index.name.endswith("_trgm")]:
+            copy.indexes.discard(index)
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        metadata.create_all(engine)
+    finally:
+        engine.dispose()
+
+
+def _drop_alembic_version(url):
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+    finally:
+        engine.dispose()
+
+
+def _schema(url):
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            inspector = inspect(conn)
+            indexes = {table: {index["name"] for index in inspector.get_indexes(table)} for table in EXPECTED_INDEXES}
+            tech_stack_type = next(
+                column["type"] for column in inspector.get_columns("employees") if column["name"] == "tech_stack"
+            )
+    finally:
+        engine.dispose()
+    return version, indexes, tech_stack_type.__class__.__name__
+
+
+def test_upgrade_builds_an_empty_database(scratch_database, migrate):
+    migrate(scratch_database)
+
+    version, indexes, tech_stack_type = _schema(scratch_database)
+    assert version == HEAD
+    assert tech_stack_type == "JSONB"
+    for table, expected in EXPECTED_INDEXES.items():
+        assert expected <= indexes[table]
+
+
+@pytest.mark.parametrize("build", ["pre_migration_create_all", "current_create_all"])
+def test_upgrade_adopts_a_schema_built_by_create_all(scratch_database, migrate, build):
+    if build == "pre_migration_create_all":
+        # The baseline revision is the schema create_all built before migrations existed
+        migrate(scratch_database, "0001")
+        _drop_alembic_version(scratch_database)
+    else:
+        _create_all(scratch_database)
+
+    migrate(scratch_database)
+
+    version, indexes, tech_stack_type = _schema(scratch_database)
+    assert version == HEAD
+    assert tech_stack_type == "JSONB"
+    for table, expected in EXPECTED_INDEXES.items():
+        assert expected <= indexes[table]
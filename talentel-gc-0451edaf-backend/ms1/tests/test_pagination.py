@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.models.models import Employee
+from app.services.employee_service import skill_filters
+from app.utils import pagination
+from app.utils.pagination import count_rows, explain_plan
+
+SEED_SQL = """
+INSERT INTO employees (user_id, name, email, hashed_password, role, band)
+SELECT g, 'Employee ' || g, 'employee' || g || '@example.com', 'x', 'Employee', 'B2'
+FROM generate_series(1, 20) g;
+ANALYZE employees;
+"""
+
+
+@pytest.fixture
+def engine(migrated_database):
+    engine = create_engine(migrated_database, poolclass=NullPool)
+    with engine.begin() as conn:
+        conn.execute(text(SEED_SQL))
+    yield engine
+    engine.dispose()
+
+
+def test_explain_plan_binds_the_statement_parameters(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    query = Session(engine).query(Employee).filter(
+        Employee.user_id > 5, *skill_filters(skill_name="python", skill_level="expert"),
+    )
+
+    with engine.connect() as conn:
+        plan = explain_plan(conn, query.statement)
+        rows = conn.execute(query.statement).all()
+
+    assert plan["Node Type"]
+    assert rows == []
+    # Only the explained statement is rewritten, the query itself runs as written
+    assert statements[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert statements[1].startswith("SELECT")
+
+
+def test_approx_count_uses_the_planner_estimate(engine, monkeypatch):
+    monkeypatch.setattr(pagination, "APPROX_COUNT_THRESHOLD", 1)
+    with Session(engine) as db:
+        query = db.query(Employee)
+        assert count_rows(db, query, "approx") == (20, True)
+        assert count_rows(db, query.filter(Employee.user_id <= 3), "exact") == (3, False)
@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import test_assign
+
+REPO = "acme/exercise"
+HEAD_SHA = "a" * 40
+BASE_TREE_SHA = "b" * 40
+NEW_TREE_SHA = "c" * 40
+NEW_COMMIT_SHA = "d" * 40
+
+
+class FakeGitHub:
+    """
+    Just enough of the GitHub REST API for one repository: the repo, its default branch
+    ref, the Git Data API (blobs, trees, commits, refs) and the contents API. Every call
+    is recorded as (method, path, json body).
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.ref_status = 200
+        self.parent_commit_status = 200
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def requests(self, method, suffix=""):
+        return [call for call in self.calls if call[0] == method and call[1].endswith(suffix)]
+
+    def respond(self, method, path, body):
+        repo = f"/repos/{REPO}"
+        if method == "GET" and path == "/user":
+            return 200, {"login": "fake-user"}
+        if method == "GET" and path == repo:
+            return 200, {"full_name": REPO, "default_branch": "main"}
+        if method == "GET" and path == f"{repo}/git/ref/heads/main":
+            if self.ref_status != 200:
+                return self.ref_status, {"message": "Git Repository is empty."}
+            return 200, {"object": {"sha": HEAD_SHA}}
+        if method == "POST" and path == f"{repo}/git/blobs":
+            data = base64.b64decode(body["content"])
+            return 201, {"sha": hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()}
+        if method == "GET" and path == f"{repo}/git/commits/{HEAD_SHA}":
+            if self.parent_commit_status != 200:
+                return self.parent_commit_status, {"message": "Not Found"}
+            return 200, {"sha": HEAD_SHA, "tree": {"sha": BASE_TREE_SHA}}
+        if method == "POST" and path == f"{repo}/git/trees":
+            return 201, {"sha": NEW_TREE_SHA}
+        if method == "POST" and path == f"{repo}/git/commits":
+            return 201, {"sha": NEW_COMMIT_SHA}
+        if method == "PATCH" and path == f"{repo}/git/refs/heads/main":
+            return 200, {"object": {"sha": body["sha"]}}
+        if path.startswith(f"{repo}/contents/"):
+            return (404, {"message": "Not Found"}) if method == "GET" else (201, {"content": {}})
+        return 404, {"message": f"Unexpected {method} {path}"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with fake._lock:
+                    fake.calls.append((self.command, self.path, body))
+                status, payload = fake.respond(self.command, self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fake = FakeGitHub()
+    fake.start()
+    monkeypatch.setattr(test_assign, "GITHUB_API_URL", fake.url)
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def token():
+    # Clients are shared per token, so a fresh one keeps ETag caches apart between tests
+    return f"token-{uuid.uuid4().hex}"
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "README.md").write_text("# Exercise\n")
+    (tmp_path / "src" / "__init__.py").write_text("")
+    (tmp_path / "src" / "empty.py").write_text("")
+    (tmp_path / "src" / "app.py").write_text("print('hello')\n")
+    (tmp_path / "bug_manifest.json").write_text("{}")
+    return str(tmp_path)
+
+
+def test_identical_contents_are_uploaded_once(github, token, project):
+    result = test_assign.push_files_to_github(REPO, project, token)
+
+    assert result["success"] is True
+    assert result["total_uploaded"] == 4
+    # README, app.py and one blob shared by the two empty files
+    assert len(github.requests("POST", "/git/blobs")) == 3
+    tree = github.requests("POST", "/git/trees")[0][2]["tree"]
+    shas = {entry["path"]: entry["sha"] for entry in tree}
+    assert set(shas) == {"README.md", "src/__init__.py", "src/empty.py", "src/app.py"}
+    assert shas["src/__init__.py"] == shas["src/empty.py"]
+
+
+def test_single_commit_goes_through_tree_commit_and_ref(github, token, project):
+    result = test_assign.push_files_to_github(REPO, project, token, commit_message="Seed exercise")
+
+    assert result["success"] is True
+    assert result["commit_sha"] == NEW_COMMIT_SHA
+    sequence = [(method, path) for method, path, _ in github.calls if not path.endswith("/git/blobs")]
+    assert sequence == [
+        ("GET", f"/repos/{REPO}"),
+        ("GET", f"/repos/{REPO}/git/ref/heads/main"),
+        ("GET", f"/repos/{REPO}/git/commits/{HEAD_SHA}"),
+        ("POST", f"/repos/{REPO}/git/trees"),
+        ("POST", f"/repos/{REPO}/git/commits"),
+        ("PATCH", f"/repos/{REPO}/git/refs/heads/main"),
+    ]
+    # Every blob exists before the tree that references it is built
+    tree_index = github.calls.index(github.requests("POST", "/git/trees")[0])
+    assert all(github.calls.index(call) < tree_index for call in github.requests("POST", "/git/blobs"))
+    assert github.requests("POST", "/git/trees")[0][2]["base_tree"] == BASE_TREE_SHA
+    assert github.requests("POST", "/git/commits")[0][2] == {
+        "message": "Seed exercise", "tree": NEW_TREE_SHA, "parents": [HEAD_SHA]
+    }
+    assert github.requests("PATCH")[0][2] == {"sha": NEW_COMMIT_SHA}
+    assert not github.requests("PUT")
+
+
+@pytest.mark.parametrize("ref_status", [404, 409])
+def test_repository_without_branch_falls_back_to_per_file(github, token, project, ref_status):
+    github.ref_status = ref_status
+
+    result = test_assign.push_files_to_github(REPO, project, token)
+
+    assert result["success"] is True
+    assert sorted(result["uploaded_files"]) == ["README.md", "src/__init__.py", "src/app.py", "src/empty.py"]
+    assert len(github.requests("PUT")) == 4
+    assert not github.requests("POST")
+    assert not github.requests("PATCH")
+
+
+def test_unreadable_parent_commit_is_reported(github, token, project):
+    github.parent_commit_status = 404
+
+    result = test_assign.push_files_to_github(REPO, project, token)
+
+    assert result["success"] is False
+    assert result["error"].startswith(f"Failed to read commit {HEAD_SHA}: 404")
+    assert not github.requests("POST", "/git/trees")
+    assert not github.requests("PATCH")
@@ -0,0 +1,180 @@
+import os
+import re
+import subprocess
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils import repo_mirror_cache
+from app.utils.GithubRepoFetcher import GitHubRepoFetcher
+
+REPO = "acme/exercise"
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def tree_files(root):
+    """Relative path -> (bytes, executable bit) of every file under root outside .git."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ".git"]
+        # A worktree's .git is a file pointing at the mirror
+        for filename in (f for f in filenames if f != ".git"):
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = (f.read(), os.access(path, os.X_OK))
+    return files
+
+
+class TarballServer:
+    """Serves GET /repos/<owner>/<repo>/tarball/<sha> from a bare repo the way GitHub does."""
+
+    def __init__(self, bare_path):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                match = re.fullmatch(rf"/repos/{REPO}/tarball/([0-9a-f]{{40}})", self.path)
+                if not match:
+                    self.send_error(404)
+                    return
+                sha = match.group(1)
+                data = subprocess.run(
+                    ["git", "archive", "--format=tar.gz", f"--prefix=acme-exercise-{sha[:7]}/", sha],
+                    cwd=bare_path, check=True, capture_output=True
+                ).stdout
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-gzip")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture(scope="module")
+def origin(tmp_path_factory):
+    """
+    A bare repo with history on both sides of the evaluated commit: a nested tree, an
+    executable script and a binary file at the target, and later commits that change
+    and delete files so a checkout of the wrong commit shows up.
+    """
+    base = tmp_path_factory.mktemp("origin")
+    work = base / "work"
+    work.mkdir()
+    git(work, "init", "-q", "-b", "main")
+    git(work, "config", "user.email", "dev@example.com")
+    git(work, "config", "user.name", "Dev")
+    (work / "README.md").write_text("v1\n")
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "first")
+    (work / "src" / "pkg").mkdir(parents=True)
+    (work / "src" / "pkg" / "app.py").write_text("print('target')\n")
+    (work / "run.sh").write_text("#!/bin/sh\necho run\n")
+    (work / "run.sh").chmod(0o755)
+    (work / "assets.bin").write_bytes(os.urandom(64 * 1024))
+    (work / "bug_manifest.json").write_text('{"bugs": []}\n')
+    (work / "README.md").write_text("v2\n")
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "target")
+    target = git(work, "rev-parse", "HEAD")
+    (work / "src" / "pkg" / "app.py").write_text("print('later')\n")
+    (work / "assets.bin").unlink()
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "later")
+    bare = base / "exercise.git"
+    git(base, "clone", "-q", "--bare", str(work), str(bare))
+    return {"url": f"file://{bare}", "path": str(bare), "target": target}
+
+
+@pytest.fixture
+def fetcher():
+    # A fresh token per test keeps the shared GitHub clients apart
+    def make(mode, api_base_url=None):
+        return GitHubRepoFetcher(f"token-{uuid.uuid4().hex}", api_base_url=api_base_url, fetch_mode=mode)
+    return make
+
+
+@pytest.fixture
+def mirror_cache(tmp_path, monkeypatch):
+    cache = repo_mirror_cache.RepoMirrorCache(cache_dir=str(tmp_path / "mirrors"))
+    monkeypatch.setattr(repo_mirror_cache, "_mirror_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def full_clone(origin, fetcher, tmp_path):
+    target_dir = str(tmp_path / "full")
+    fetcher("full").checkout_commit(origin["url"], REPO, origin["target"], target_dir)
+    return target_dir
+
+
+def test_full_clone_checks_out_the_target_commit(origin, full_clone):
+    assert git(full_clone, "rev-parse", "HEAD") == origin["target"]
+    files = tree_files(full_clone)
+    assert files["src/pkg/app.py"] == (b"print('target')\n", False)
+    assert files["run.sh"][1] is True
+    assert len(files["assets.bin"][0]) == 64 * 1024
+
+
+@pytest.mark.parametrize("mode", ["shallow", "mirror"])
+def test_git_modes_match_the_full_clone(origin, fetcher, mirror_cache, full_clone, tmp_path, mode):
+    target_dir = str(tmp_path / mode)
+
+    fetcher(mode).checkout_commit(origin["url"], REPO, origin["target"], target_dir)
+
+    assert git(target_dir, "rev-parse", "HEAD") == origin["target"]
+    assert tree_files(target_dir) == tree_files(full_clone)
+
+
+def test_shallow_fetch_has_only_the_target_commit(origin, fetcher, tmp_path):
+    target_dir = str(tmp_path / "shallow")
+
+    fetcher("shallow").checkout_commit(origin["url"], REPO, origin["target"], target_dir)
+
+    assert git(target_dir, "rev-list", "--all") == origin["target"]
+    assert git(target_dir, "rev-parse", "--is-shallow-repository") == "true"
+
+
+def test_tarball_matches_the_full_clone(origin, fetcher, full_clone, tmp_path):
+    target_dir = str(tmp_path / "tarball")
+
+    with TarballServer(origin["path"]) as server:
+        fetcher("tarball", api_base_url=server.url).checkout_commit(origin["url"], REPO, origin["target"], target_dir)
+
+    assert server.requests == [f"/repos/{REPO}/tarball/{origin['target']}"]
+    assert not os.path.exists(os.path.join(target_dir, ".git"))
+    assert tree_files(target_dir) == tree_files(full_clone)
+
+
+@pytest.mark.parametrize("mode", ["shallow", "mirror"])
+def test_path_subsets_match_the_full_clone(origin, fetcher, mirror_cache, full_clone, tmp_path, mode):
+    target_dir = str(tmp_path / mode)
+    paths = ["bug_manifest.json", "src/pkg/app.py"]
+
+    fetcher(mode).checkout_commit(origin["url"], REPO, origin["target"], target_dir, paths=paths)
+
+    full = tree_files(full_clone)
+    assert tree_files(target_dir) == {path: full[path] for path in paths}
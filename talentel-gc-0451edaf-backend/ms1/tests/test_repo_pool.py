@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.Agents.GithubRepoCreatorAgent import GitHubRepoCreator
+from app.services import repo_pool_service
+from app.services.repo_pool_service import RepoPool
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSearchClient:
+    """Answers the repository search with pages built from names."""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, dict(params)))
+        start = (params["page"] - 1) * params["per_page"]
+        items = [{"name": name} for name in self.names[start:start + params["per_page"]]]
+        return FakeResponse({"total_count": len(self.names), "incomplete_results": False, "items": items})
+
+
+class FakeCreator:
+    def __init__(self, results):
+        self.results = list(results)
+        self.loads = 0
+
+    def list_repository_names(self, prefix=""):
+        self.loads += 1
+        return self.results.pop(0)
+
+
+def test_listing_searches_the_org_by_name_prefix():
+    creator = GitHubRepoCreator("token")
+    # The search matches words, so it also returns names that only contain the prefix
+    names = [f"pool-{i:03d}" for i in range(150)] + ["team-pool-notes"]
+    creator.client = FakeSearchClient(names)
+
+    result = creator.list_repository_names(prefix="pool-")
+
+    assert result == {"success": True, "data": names[:150]}
+    assert [params["page"] for _, params in creator.client.calls] == [1, 2]
+    url, params = creator.client.calls[0]
+    assert url.endswith("/search/repositories")
+    assert params["q"] == "org:Deloitte-US pool in:name"
+
+
+def test_failed_load_is_retried_after_a_backoff(monkeypatch):
+    creator = FakeCreator([
+        {"success": False, "message": "502 Bad Gateway"},
+        {"success": True, "data": ["pool-a", "pool-b"]},
+    ])
+    pool = RepoPool()
+    monkeypatch.setattr(pool, "_creator", lambda: creator)
+    clock = [1000.0]
+    monkeypatch.setattr(repo_pool_service, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    pool._ensure_loaded()
+    assert pool.size() == 0
+    # A refill created a repo of its own while the pool was not loaded
+    pool._available.append("pool-b")
+
+    pool._ensure_loaded()
+    assert creator.loads == 1
+
+    clock[0] += repo_pool_service.REPO_POOL_LOAD_RETRY_SECONDS
+    pool._ensure_loaded()
+    assert creator.loads == 2
+    assert sorted(pool._available) == ["pool-a", "pool-b"]
+
+    pool._ensure_loaded()
+    assert creator.loads == 2
+
+
+@pytest.mark.parametrize("failures, expected_wait", [(1, 30), (2, 60), (3, 120)])
+def test_load_backoff_doubles(monkeypatch, failures, expected_wait):
+    creator = FakeCreator([{"success": False, "message": "timeout"}] * failures)
+    pool = RepoPool()
+    monkeypatch.setattr(pool, "_creator", lambda: creator)
+    pool._load_retry = 30
+    clock = [0.0]
+    monkeypatch.setattr(repo_pool_service, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    for _ in range(failures):
+        clock[0] = pool._next_load_at
+        pool._ensure_loaded()
+
+    assert pool._next_load_at - clock[0] == expected_wait
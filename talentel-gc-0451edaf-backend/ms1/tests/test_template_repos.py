@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.Agents import GithubRepoCreatorAgent
+from app.services import test_assign
+
+
+class FakeCreator:
+    """Stands in for the GitHub calls of ensure_template_repo; pushes to a gated template block."""
+
+    def __init__(self):
+        self.gates = {}
+        self.created = []
+        self.pushed = []
+        self.lock = threading.Lock()
+
+    def gate(self, template_name):
+        self.gates[template_name] = threading.Event()
+        return self.gates[template_name]
+
+    def creator(self, github_token):
+        class Creator:
+            def get_repository(self, name):
+                return {"success": False, "error": "Not Found"}
+
+            def mark_as_template(self, name):
+                return {"success": True}
+
+        return Creator()
+
+    def create_repo_api(self, name, description=None):
+        with self.lock:
+            self.created.append(name)
+        return {"success": True}
+
+    def push_files_to_github(self, repo_full_name, code_dir, github_token):
+        name = repo_full_name.split("/", 1)[1]
+        with self.lock:
+            self.pushed.append(name)
+        gate = self.gates.get(name)
+        if gate is not None:
+            assert gate.wait(5), f"{name} was never released"
+        return {"success": True}
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fake = FakeCreator()
+    monkeypatch.setattr(GithubRepoCreatorAgent, "GitHubRepoCreator", fake.creator)
+    monkeypatch.setattr(GithubRepoCreatorAgent, "create_repo_api", fake.create_repo_api)
+    monkeypatch.setattr(test_assign, "push_files_to_github", fake.push_files_to_github)
+    monkeypatch.setattr(test_assign, "_template_repos", set())
+    monkeypatch.setattr(test_assign, "_template_repo_locks", {})
+    return fake
+
+
+def test_slow_template_does_not_block_other_exercises(github):
+    slow = github.gate("template-debug-slow")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow_result = executor.submit(test_assign.ensure_template_repo, "debug", "slow", "/code", "token")
+        # Provisioned while the slow template is still being pushed
+        fast_result = executor.submit(test_assign.ensure_template_repo, "debug", "fast", "/code", "token")
+        assert fast_result.result(timeout=5) == "template-debug-fast"
+        assert not slow_result.done()
+        slow.set()
+        assert slow_result.result(timeout=5) == "template-debug-slow"
+
+
+def test_concurrent_assignments_create_the_template_once(github):
+    gate = github.gate("template-handson-shared")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = [
+            executor.submit(test_assign.ensure_template_repo, "handson", "shared", "/code", "token")
+            for _ in range(4)
+        ]
+        gate.set()
+        assert [result.result(timeout=5) for result in results] == ["template-handson-shared"] * 4
+    assert github.created == ["template-handson-shared"]
+    assert github.pushed == ["template-handson-shared"]
@@ -0,0 +1,75 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.services import search_service
+from app.utils.trigram_index import TrigramIndex
+
+
+class FakeSession:
+    def rollback(self):
+        pass
+
+
+class FakeSql:
+    """Answers _search_sql, or cancels it like statement_timeout does once timing_out is set."""
+
+    def __init__(self):
+        self.timing_out = False
+
+    def search(self, db, kind, query, limit, remaining_ms):
+        if self.timing_out:
+            raise DBAPIError("SELECT", {}, SimpleNamespace(pgcode="57014"))
+        return [{"user_id": 1, "name": "Ada Lovelace", "score": 1.0}]
+
+
+@pytest.fixture
+def sql(monkeypatch):
+    fake = FakeSql()
+    builds = []
+
+    def build(kind):
+        builds.append(kind)
+        return TrigramIndex([(1, {"name": "Ada Lovelace", "email": "ada@example.com"})])
+
+    monkeypatch.setattr(search_service, "_use_pg_trgm", lambda db: True)
+    monkeypatch.setattr(search_service, "_search_sql", fake.search)
+    monkeypatch.setattr(search_service, "_build_memory_index", build)
+    monkeypatch.setattr(search_service, "_memory_indexes", {})
+    monkeypatch.setattr(search_service, "_memory_refreshing", set())
+    fake.builds = builds
+    return fake
+
+
+def wait_for_index(kind):
+    deadline = time.monotonic() + 5
+    while kind not in search_service._memory_indexes:
+        assert time.monotonic() < deadline, f"the {kind} index was never built"
+        time.sleep(0.01)
+
+
+def test_queries_within_budget_build_no_memory_index(sql):
+    for _ in range(3):
+        result = search_service.typeahead_search(FakeSession(), "ada", ["employees"])
+        assert result["employees"][0]["name"] == "Ada Lovelace"
+        assert result["timed_out"] == []
+
+    assert sql.builds == []
+    assert not search_service._memory_refreshing
+
+
+def test_timed_out_query_builds_the_fallback_index(sql):
+    search_service.typeahead_search(FakeSession(), "ada", ["employees"])
+    sql.timing_out = True
+
+    result = search_service.typeahead_search(FakeSession(), "ada", ["employees"])
+    assert result["employees"] == []
+    assert result["timed_out"] == ["employees"]
+
+    wait_for_index("employees")
+    result = search_service.typeahead_search(FakeSession(), "ada", ["employees"])
+    assert [match["user_id"] for match in result["employees"]] == [1]
+    assert result["timed_out"] == []
+    assert sql.builds == ["employees"]
@@ -0,0 +1,92 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import workspace_manager
+from app.utils.workspace_manager import WorkspaceManager
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return WorkspaceManager(root=str(tmp_path / "workspaces"), quota_mb=3, admission_timeout=0.2, reserve_mb=1)
+
+
+def test_admission_charges_each_lease_its_reservation(manager):
+    paths = [manager.acquire(f"eval-{i}") for i in range(3)]
+
+    assert all(os.path.isdir(path) for path in paths)
+    assert manager.charged_bytes() == 3 * MB
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        manager.acquire("eval-3")
+
+    manager.release(paths[0])
+    assert not os.path.exists(paths[0])
+    assert os.path.isdir(manager.acquire("eval-3"))
+
+
+def test_disk_scan_runs_without_the_lock(manager, monkeypatch):
+    manager.acquire("eval-0")
+    scanning = threading.Event()
+    finish_scan = threading.Event()
+    dir_size = workspace_manager._dir_size
+
+    def slow_dir_size(path):
+        scanning.set()
+        finish_scan.wait(5)
+        return dir_size(path)
+
+    monkeypatch.setattr(workspace_manager, "_dir_size", slow_dir_size)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        admission = executor.submit(manager.acquire, "eval-1")
+        assert scanning.wait(5)
+        # The admission is mid-scan, yet the lease table stays available
+        assert manager._cond.acquire(timeout=1)
+        manager._cond.release()
+        finish_scan.set()
+        assert os.path.isdir(admission.result(timeout=5))
+
+
+def test_release_deletes_outside_the_lock(manager, monkeypatch):
+    slow_path = manager.acquire("eval-slow")
+    deleting = threading.Event()
+    finish_delete = threading.Event()
+    remove = WorkspaceManager._remove
+
+    def slow_remove(self, path):
+        if path == slow_path:
+            deleting.set()
+            finish_delete.wait(5)
+        return remove(self, path)
+
+    monkeypatch.setattr(WorkspaceManager, "_remove", slow_remove)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        release = executor.submit(manager.release, slow_path)
+        assert deleting.wait(5)
+        # Other admissions go ahead, but the path being deleted is still leased
+        assert os.path.isdir(manager.acquire("eval-other"))
+        with pytest.raises(RuntimeError, match="already in use"):
+            manager.acquire("eval-slow")
+        finish_delete.set()
+        release.result(timeout=5)
+    assert not os.path.exists(slow_path)
+    assert os.path.isdir(manager.acquire("eval-slow"))
+
+
+def test_failed_deletions_are_reclaimed_on_a_later_admission(manager, monkeypatch):
+    path = manager.acquire("eval-0")
+    with open(os.path.join(path, "result.txt"), "w") as f:
+        f.write("x")
+    monkeypatch.setattr(WorkspaceManager, "_remove", lambda self, path: False)
+    manager.release(path)
+    assert os.path.exists(path)
+    assert path in manager._pending_removal
+
+    monkeypatch.undo()
+    manager.acquire("eval-1")
+
+    assert not os.path.exists(path)
+    assert not manager._pending_removal